@@ -0,0 +1,9 @@
+from sqlalchemy.orm import sessionmaker
+
+from common.database import create_service_engine
+from config_loader import build_database_url
+
+DATABASE_URL = build_database_url()
+
+engine = create_service_engine("aggregator", DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,215 @@
+"""Python replacement for the Flink SQL job (``flink/flink_sql_job.sql``).
+
+On startup the :class:`AggregateState` is rebuilt from the ``agg_*`` tables
+and the offsets in ``aggregator_offsets`` (on the first run the topic is read
+from the beginning, as the Flink job's ``earliest-offset``). Every change is
+folded into the state and, every ``AGGREGATOR_FLUSH_MS`` or
+``AGGREGATOR_FLUSH_MAX`` messages, the buckets that changed are written to
+``agg_age_group``/``agg_gender``/``agg_hourly`` and
+``agg_daily_profile``/``agg_daily_location`` together with the next offsets,
+in one transaction. After a crash the service resumes from the last committed
+offsets with the counts they produced, so nothing is counted twice.
+
+Run it with ``python -m aggregator.main`` (or the ``aggregator`` compose
+profile) instead of the Flink jobmanager/taskmanager; never run both against
+the same tables.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiokafka import AIOKafkaConsumer, TopicPartition
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.orm import Session
+
+from aggregator.state import DIMENSIONS, AggregateState
+from scripts.db_init import AggAgeGroup, AggDailyLocation, AggDailyProfile, AggGender, AggHourly, AggregatorOffset
+
+logger = logging.getLogger("aggregator")
+
+KAFKA_BOOTSTRAP = os.environ.get("KAFKA_BOOTSTRAP_SERVERS", "kafka:9092")
+KAFKA_TOPIC = os.environ.get("KAFKA_TOPIC", "lost_persons_server.lost_persons_db.persons_lost")
+AGGREGATOR_FLUSH_MS = int(os.environ.get("AGGREGATOR_FLUSH_MS", "500"))
+AGGREGATOR_FLUSH_MAX = int(os.environ.get("AGGREGATOR_FLUSH_MAX", "5000"))
+
+# dimension -> (table, key columns); composite labels are tuples in column order.
+SINKS = {
+    "age_group": (AggAgeGroup.__table__, ("age_group",)),
+    "gender": (AggGender.__table__, ("gender",)),
+    "hour": (AggHourly.__table__, ("hour_of_day",)),
+    "profile": (AggDailyProfile.__table__, ("day", "hour_of_day", "gender", "age_group")),
+    "location": (AggDailyLocation.__table__, ("day", "location")),
+}
+
+
+def _upsert_stmt(dialect_name: str, table, key_columns: Tuple[str, ...], rows: List[dict], value: str = "count"):
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(rows)
+        return stmt.on_duplicate_key_update({value: stmt.inserted[value]})
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(table).values(rows)
+    return stmt.on_conflict_do_update(index_elements=list(key_columns), set_={value: stmt.excluded[value]})
+
+
+def _key_values(label: Any) -> tuple:
+    return label if isinstance(label, tuple) else (label,)
+
+
+def write_aggregates(db: Session, state: AggregateState, full: bool = False) -> int:
+    """Store the changed buckets (every bucket with ``full``) and the offsets; returns how many buckets were written.
+
+    Counts are absolute, so writing the same state twice is harmless. Buckets
+    that drop to zero are removed, as a ``GROUP BY`` would not return them.
+    """
+    dialect_name = db.get_bind().dialect.name
+    keys = {dimension: set(state.counts[dimension]) if full else set() for dimension in DIMENSIONS}
+    if not full:
+        for dimension, label in state.dirty:
+            keys[dimension].add(label)
+    written = 0
+    for dimension, (table, key_columns) in SINKS.items():
+        counts = state.counts[dimension]
+        if full:
+            db.execute(delete(table))
+        rows = [
+            {**dict(zip(key_columns, _key_values(label))), "count": counts[label]}
+            for label in sorted(keys[dimension])
+            if counts.get(label, 0) > 0
+        ]
+        emptied = [_key_values(label) for label in keys[dimension] if counts.get(label, 0) <= 0]
+        if rows:
+            db.execute(_upsert_stmt(dialect_name, table, key_columns, rows))
+        if emptied and not full:
+            columns = tuple_(*(table.c[column] for column in key_columns))
+            db.execute(delete(table).where(columns.in_(emptied)))
+        written += len(rows) + len(emptied)
+    if state.offsets:
+        offsets = [
+            {"topic": state.topic, "kafka_partition": partition, "next_offset": offset}
+            for partition, offset in sorted(state.offsets.items())
+        ]
+        db.execute(
+            _upsert_stmt(
+                dialect_name, AggregatorOffset.__table__, ("topic", "kafka_partition"), offsets, value="next_offset"
+            )
+        )
+    return written
+
+
+def load_state(db: Session, topic: str) -> Optional[AggregateState]:
+    """The state last committed by :func:`write_aggregates`, or ``None`` if ``topic`` was never flushed."""
+    offsets = db.execute(
+        select(AggregatorOffset.kafka_partition, AggregatorOffset.next_offset).where(AggregatorOffset.topic == topic)
+    ).all()
+    if not offsets:
+        return None
+    state = AggregateState(topic)
+    state.offsets = {int(partition): int(offset) for partition, offset in offsets}
+    for dimension, (table, key_columns) in SINKS.items():
+        columns = [table.c[column] for column in key_columns]
+        for *key, count in db.execute(select(*columns, table.c["count"])):
+            state.counts[dimension][key[0] if len(key) == 1 else tuple(key)] = int(count)
+    return state
+
+
+def _load_state() -> Optional[AggregateState]:
+    from aggregator.database import SessionLocal
+
+    with SessionLocal() as db:
+        return load_state(db, KAFKA_TOPIC)
+
+
+def flush(state: AggregateState, full: bool = False) -> None:
+    """Write the changed aggregates and the offsets in one transaction (blocking; run in a thread)."""
+    from aggregator.database import SessionLocal
+
+    with SessionLocal() as db:
+        written = write_aggregates(db, state, full)
+        db.commit()
+    state.dirty.clear()
+    logger.info("Agregados guardados (%s claves); offsets %s", written, state.offsets)
+
+
+async def _assign(consumer: AIOKafkaConsumer, state: AggregateState) -> None:
+    await consumer.topics()  # loads the cluster metadata
+    partitions = [
+        TopicPartition(KAFKA_TOPIC, partition)
+        for partition in sorted(consumer.partitions_for_topic(KAFKA_TOPIC) or ())
+    ]
+    if not partitions:
+        raise RuntimeError(f"el tópico {KAFKA_TOPIC} no existe todavía")
+    consumer.assign(partitions)
+    for tp in partitions:
+        if tp.partition in state.offsets:
+            consumer.seek(tp, state.offsets[tp.partition])
+        else:
+            await consumer.seek_to_beginning(tp)
+
+
+async def run() -> None:
+    state: Optional[AggregateState] = None
+    full = False
+    retry_delay = 5
+    pending, last_flush = 0, time.monotonic()
+    try:
+        while True:
+            # No group: offsets live in MySQL together with the counts they produced.
+            consumer = AIOKafkaConsumer(bootstrap_servers=KAFKA_BOOTSTRAP, group_id=None, enable_auto_commit=False)
+            try:
+                if state is None:
+                    state = await asyncio.to_thread(_load_state)
+                    # Never flushed: the topic is replayed from the start; replace whatever the tables held.
+                    full = state is None
+                    state = state or AggregateState(KAFKA_TOPIC)
+                await consumer.start()
+                await _assign(consumer, state)
+                logger.info("Agregador conectado al tópico %s", KAFKA_TOPIC)
+                while True:
+                    batches: Dict[TopicPartition, list] = await consumer.getmany(
+                        timeout_ms=AGGREGATOR_FLUSH_MS, max_records=AGGREGATOR_FLUSH_MAX
+                    )
+                    for tp, records in batches.items():
+                        for msg in records:
+                            state.apply(msg.value)
+                            state.advance(tp.partition, msg.offset)
+                        pending += len(records)
+                    due = time.monotonic() - last_flush >= AGGREGATOR_FLUSH_MS / 1000
+                    if full or (pending and (due or pending >= AGGREGATOR_FLUSH_MAX)):
+                        await asyncio.to_thread(flush, state, full)
+                        full, pending, last_flush = False, 0, time.monotonic()
+            except Exception as exc:
+                logger.warning("Error en el agregador: %s. Reintentando en %s s...", exc, retry_delay)
+                await asyncio.sleep(retry_delay)
+            finally:
+                with contextlib.suppress(Exception):
+                    await consumer.stop()
+    finally:
+        if pending:
+            flush(state, full)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    async def _serve() -> None:
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, task.cancel)
+        with contextlib.suppress(asyncio.CancelledError):
+            await run()
+
+    asyncio.run(_serve())
+
+
+if __name__ == "__main__":
+    main()
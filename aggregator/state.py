@@ -0,0 +1,100 @@
+"""In-memory aggregates of ``persons_lost``.
+
+:class:`AggregateState` holds the same aggregates the Flink job keeps
+(``agg_age_group``, ``agg_gender``, ``agg_hourly`` and the daily
+``agg_daily_profile``/``agg_daily_location``), with the same buckets (hours
+and days of the stored wall-clock value, see :func:`common.cdc.lost_hour`),
+plus the next Kafka offset per partition. Unlike the all-time Flink queries, which only count ``op = 'c'``,
+every row change is applied: inserts and snapshot reads add the new row, updates
+move it from the buckets of ``before`` to those of ``after`` and deletes
+remove ``before``, so the tables match a ``GROUP BY`` over ``persons_lost``.
+
+There is no separate checkpoint: :mod:`aggregator.main` stores the changed
+buckets and the offsets in one MySQL transaction and rebuilds the state from
+those tables on startup, so a flush costs O(changed buckets), not O(history).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+from common import cdc
+
+logger = logging.getLogger("aggregator")
+
+DIMENSIONS = ("age_group", "gender", "hour", "profile", "location")
+
+Key = Tuple[str, Any]
+
+
+def row_buckets(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bucket of ``row`` per dimension; a missing gender or timestamp leaves its dimensions out.
+
+    A missing or negative age counts as ``cdc.UNKNOWN_AGE_GROUP``, as in the
+    Flink job's ``agg_age_group``. ``profile`` is ``(day, hour, gender,
+    age_group)`` and ``location`` ``(day, normalized location)``, with the same
+    placeholders as the Flink job for a missing gender, age or location.
+    """
+    if not row:
+        return {}
+    age_group = cdc.age_group(row.get("age")) or cdc.UNKNOWN_AGE_GROUP
+    gender = row.get("gender") or None
+    hour = cdc.lost_hour(row.get("lost_timestamp"))
+    day = cdc.lost_day(row.get("lost_timestamp"))
+    buckets = {"age_group": age_group, "gender": gender, "hour": hour}
+    if day is not None and hour is not None:
+        buckets["profile"] = (day, hour, gender or cdc.UNKNOWN_GENDER, age_group)
+        buckets["location"] = (day, cdc.normalize_location(row.get("lost_location")))
+    return {dimension: label for dimension, label in buckets.items() if label is not None}
+
+
+class AggregateState:
+    def __init__(self, topic: str) -> None:
+        self.topic = topic
+        self.counts: Dict[str, Dict[Any, int]] = {dimension: {} for dimension in DIMENSIONS}
+        self.offsets: Dict[int, int] = {}
+        self.dirty: Set[Key] = set()
+        self.applied = 0
+        self.skipped = 0
+
+    def apply(self, raw: Any) -> None:
+        """Fold one raw Kafka message value into the aggregates."""
+        try:
+            change = cdc.decode_change(raw)
+        except cdc.InvalidChangeEvent as exc:
+            logger.warning("Evento CDC no reconocido (%s); se ignora", exc)
+            self.skipped += 1
+            return
+        if change is None:
+            return
+        if change.op in ("c", "r"):
+            self._add(change.after, 1)
+        elif change.op == "u":
+            if change.before is None:
+                # Without the previous image the old buckets are unknown (binlog_row_image != FULL).
+                logger.warning("Actualización sin 'before'; se ignora")
+                self.skipped += 1
+                return
+            self._add(change.before, -1)
+            self._add(change.after, 1)
+        elif change.op == "d":
+            self._add(change.before, -1)
+        else:
+            self.skipped += 1
+            return
+        self.applied += 1
+
+    def advance(self, partition: int, offset: int) -> None:
+        """Record that every message up to ``offset`` in ``partition`` has been applied."""
+        self.offsets[partition] = offset + 1
+
+    def _add(self, row: Optional[Dict[str, Any]], sign: int) -> None:
+        for dimension, label in row_buckets(row).items():
+            counts = self.counts[dimension]
+            count = counts.get(label, 0) + sign
+            if count:
+                counts[label] = count
+            else:
+                # The dirty key still makes the next flush delete the row.
+                counts.pop(label, None)
+            self.dirty.add((dimension, label))
@@ -0,0 +1,157 @@
+import json
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+
+from aggregator.main import load_state, write_aggregates
+from aggregator.state import AggregateState
+from common import cdc
+from scripts.db_init import AggAgeGroup, AggDailyLocation, AggDailyProfile, AggGender, AggHourly, AggregatorOffset, Base
+
+TOPIC = "lost_persons_server.lost_persons_db.persons_lost"
+# 2024-05-01 14:30:00 as Debezium encodes a DATETIME column.
+LOST_AT_MS = 1714573800000
+
+
+def _row(person_id, **overrides):
+    row = {
+        "person_id": person_id,
+        "gender": "F",
+        "age": 27,
+        "lost_timestamp": LOST_AT_MS,
+        "lost_location": " Loja,  Loja",
+        "status": "active",
+    }
+    row.update(overrides)
+    return row
+
+
+def _message(op, before=None, after=None):
+    return json.dumps({"schema": {}, "payload": {"op": op, "before": before, "after": after}}).encode("utf-8")
+
+
+def _table(db, model, key):
+    return dict(db.execute(select(getattr(model, key), model.count)).all())
+
+
+def test_creates_updates_and_deletes_are_all_applied():
+    state = AggregateState(TOPIC)
+    for value in [
+        _message("c", after=_row(1)),
+        _message("r", after=_row(2, gender="M", age=70)),
+        _message("u", before=_row(1), after=_row(1, age=8)),
+        _message("d", before=_row(2, gender="M", age=70)),
+        None,  # tombstone
+        b"not json",
+    ]:
+        state.apply(value)
+
+    # Buckets back at zero are dropped (and stay dirty, so the flush deletes their rows).
+    assert state.counts["age_group"] == {"0-12": 1}
+    assert state.counts["gender"] == {"F": 1}
+    assert state.counts["hour"] == {14: 1}
+    day = date(2024, 5, 1)
+    assert state.counts["profile"] == {(day, 14, "F", "0-12"): 1}
+    assert ("profile", (day, 14, "M", "61+")) in state.dirty
+    assert (state.applied, state.skipped) == (4, 1)
+
+
+def test_state_is_restored_from_the_tables_and_offsets():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    state = AggregateState(TOPIC)
+    for offset, value in enumerate([_message("c", after=_row(1)), _message("c", after=_row(2, gender="M"))]):
+        state.apply(value)
+        state.advance(0, offset)
+    with Session(engine) as db:
+        assert load_state(db, TOPIC) is None  # never flushed: replay the topic
+        db.add(AggGender(gender="X", count=9))  # left behind by a previous job
+        db.commit()
+        write_aggregates(db, state, full=True)
+        db.commit()
+    state.dirty.clear()
+
+    with Session(engine) as db:
+        restored = load_state(db, TOPIC)
+    assert restored.offsets == {0: 2}
+    assert restored.counts == state.counts
+    restored.apply(_message("d", before=_row(2, gender="M")))
+    restored.advance(0, 2)
+    with Session(engine) as db:
+        assert write_aggregates(db, restored) == 5
+        db.commit()
+        # Writing the same state again (a replay after a crash) changes nothing.
+        write_aggregates(db, restored)
+        db.commit()
+
+        assert _table(db, AggGender, "gender") == {"F": 1}
+        assert _table(db, AggAgeGroup, "age_group") == {"19-30": 1}
+        assert _table(db, AggHourly, "hour_of_day") == {14: 1}
+        assert db.execute(select(AggDailyProfile.gender, AggDailyProfile.count)).all() == [("F", 1)]
+        assert db.execute(select(AggDailyLocation.day, AggDailyLocation.location, AggDailyLocation.count)).all() == [
+            (date(2024, 5, 1), "loja, loja", 1)
+        ]
+        assert db.execute(select(AggregatorOffset.kafka_partition, AggregatorOffset.next_offset)).all() == [(0, 3)]
+        assert load_state(db, TOPIC).counts == restored.counts
+
+
+def test_flush_only_writes_the_changed_buckets():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    state = AggregateState(TOPIC)
+    for person_id in range(50):
+        state.apply(_message("c", after=_row(person_id, lost_timestamp=LOST_AT_MS - person_id * 86_400_000)))
+        state.advance(0, person_id)
+    with Session(engine) as db:
+        write_aggregates(db, state, full=True)
+        db.commit()
+        state.dirty.clear()
+
+        state.apply(_message("d", before=_row(0)))
+        state.advance(0, 50)
+        # age group, gender, hour, and the two day buckets of person 0 (now empty).
+        assert write_aggregates(db, state) == 5
+        db.commit()
+
+        assert (date(2024, 5, 1), "loja, loja") not in state.counts["location"]
+        assert db.scalar(select(func.count()).select_from(AggDailyLocation)) == 49
+        assert db.scalar(select(AggregatorOffset.next_offset)) == 51
+
+
+def test_accent_variants_keep_separate_location_rows():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    state = AggregateState(TOPIC)
+    for person_id, location in enumerate(["Bolívar", " bolívar", "Bolivar", "BOLIVAR", "bolivar"]):
+        state.apply(_message("c", after=_row(person_id, lost_location=location)))
+    with Session(engine) as db:
+        write_aggregates(db, state, full=True)
+        db.commit()
+        assert _table(db, AggDailyLocation, "location") == {"bolívar": 2, "bolivar": 3}
+
+    # MySQL's default utf8mb4_0900_ai_ci would fold both into one primary key.
+    ddl = str(CreateTable(AggDailyLocation.__table__).compile(dialect=mysql.dialect()))
+    assert "location VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL" in ddl
+
+
+def test_missing_and_negative_ages_count_as_unknown_like_the_flink_job():
+    state = AggregateState(TOPIC)
+    for person_id, age in enumerate([None, -1, 70]):
+        state.apply(_message("c", after=_row(person_id, age=age)))
+    assert state.counts["age_group"] == {cdc.UNKNOWN_AGE_GROUP: 2, "61+": 1}
+    assert state.counts["profile"] == {
+        (date(2024, 5, 1), 14, "F", cdc.UNKNOWN_AGE_GROUP): 2,
+        (date(2024, 5, 1), 14, "F", "61+"): 1,
+    }
+
+    root = Path(__file__).resolve().parents[2]
+    flink_job = root / "flink-job" / "src" / "main" / "java" / "com" / "lostpersons" / "flink" / "LostPersonsJob.java"
+    for source in (root / "flink" / "flink_sql_job.sql", flink_job):
+        text = source.read_text(encoding="utf-8")
+        # Both CASE expressions (SELECT and GROUP BY) of agg_age_group.
+        assert text.count(f"WHEN payload.after.age IS NULL OR payload.after.age < 0 THEN '{cdc.UNKNOWN_AGE_GROUP}'") == 2, source
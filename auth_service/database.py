@@ -1,11 +1,11 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from common.database import create_service_engine
 from config_loader import build_database_url
 
 DATABASE_URL = build_database_url()
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_service_engine("auth_service", DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
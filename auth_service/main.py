@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 
 from auth_service.database import get_db
 from auth_service import schemas
+from common.database import get_pool_stats
 from scripts.db_init import (
     AuthUser,
     AuthRole,
@@ -132,6 +133,11 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/internal/db-pool")
+def internal_db_pool(_: AuthUser = Depends(require_permission("manage_users"))) -> dict:
+    return get_pool_stats()
+
+
 @app.post("/auth/login", response_model=schemas.Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = get_user_by_username(db, form_data.username)
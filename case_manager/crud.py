@@ -1,16 +1,65 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from sqlalchemy import func, and_, or_, text
 from sqlalchemy.orm import Session
 
+from common import case_stats
+from case_manager import search as case_search
+from common.pagination import before_cursor, encode_cursor
 from scripts.db_init import Case, CaseAction, CaseStatusEnum, CaseResponsibleHistory, PersonLost, ResponsibleContact
 
 
 PENDING_STATUSES = {CaseStatusEnum.NEW, CaseStatusEnum.IN_PROGRESS}
 RESOLVED_STATUSES = {CaseStatusEnum.RESOLVED}
 
+CASE_TOTAL_CACHE_TTL_SECONDS = float(os.getenv("CASE_TOTAL_CACHE_TTL_SECONDS", "30"))
+CASE_TOTAL_CACHE_MAX_ENTRIES = 1024
+
+
+class CasePage(NamedTuple):
+    items: List[Case]
+    total: Optional[int]
+    next_cursor: Optional[str]
+    total_estimated: bool = False
+
+
+class _TotalsCache:
+    """Short-lived totals for search filters, keyed by the normalized filter."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[Optional[str], str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Optional[str], str]) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, key: Tuple[Optional[str], str], total: int) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, total)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+search_totals_cache = _TotalsCache(CASE_TOTAL_CACHE_TTL_SECONDS, CASE_TOTAL_CACHE_MAX_ENTRIES)
+
 
 def get_case(db: Session, case_id: int) -> Optional[Case]:
     return db.query(Case).filter(Case.case_id == case_id).first()
@@ -27,26 +76,72 @@ def list_cases(
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-) -> Tuple[List[Case], int]:
+    cursor: Optional[Tuple[datetime, int]] = None,
+    include_total: bool = True,
+    order: str = "recent",
+) -> CasePage:
+    """Return a page of cases, the filtered total and the cursor of the next page.
+
+    With ``cursor`` the page starts right after that ``(created_at, case_id)``
+    key (keyset pagination) and ``skip`` is ignored. The total is skipped when
+    ``include_total`` is false; see :func:`_count_cases` for how it is served.
+    ``order="relevance"`` sorts search hits by FULLTEXT score; those pages are
+    offset-based, so no cursor is returned.
+    """
     query = db.query(Case).join(PersonLost)
+    enum_status: Optional[CaseStatusEnum] = None
     if status:
         try:
             enum_status = CaseStatusEnum(status)
             query = query.filter(Case.status == enum_status)
         except ValueError:
-            query = query.filter(False)  # invalid status yields empty result
+            return CasePage([], 0, None)  # invalid status yields empty result
+    relevance = None
     if search:
-        pattern = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(PersonLost.first_name).like(pattern),
-                func.lower(PersonLost.last_name).like(pattern),
-                func.lower(PersonLost.lost_location).like(pattern),
-            )
-        )
+        search_filter, relevance = case_search.build_search(db.get_bind().dialect.name, search)
+        if search_filter is not None:
+            query = query.filter(search_filter)
+        else:
+            search = None
+    total, total_estimated = None, False
+    if include_total:
+        total, total_estimated = _count_cases(db, query, enum_status, search)
+    if order == "relevance" and relevance is not None:
+        query = query.order_by(relevance.desc(), Case.created_at.desc(), Case.case_id.desc())
+        results = query.offset(skip).limit(limit).all()
+        return CasePage(results, total, None, total_estimated)
+    query = query.order_by(Case.created_at.desc(), Case.case_id.desc())
+    if cursor is not None:
+        query = query.filter(before_cursor(Case.created_at, Case.case_id, cursor))
+    elif skip:
+        query = query.offset(skip)
+    results = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor(results[-1].created_at, results[-1].case_id)
+    return CasePage(results, total, next_cursor, total_estimated)
+
+
+def _count_cases(db: Session, query, status: Optional[CaseStatusEnum], search: Optional[str]) -> Tuple[int, bool]:
+    """Return ``(total, estimated)`` for a listing filter.
+
+    Unfiltered and status-only totals are exact reads of ``case_counters``.
+    Search totals come from a cache that may lag writes by up to
+    ``CASE_TOTAL_CACHE_TTL_SECONDS``; only a cache miss runs the COUNT.
+    """
+    if not search:
+        counts = case_stats.read_status_counts(db)
+        if counts is not None:
+            return (counts[status] if status else sum(counts.values())), False
+        return query.count(), False
+    key = (status.value if status else None, search.strip().lower())
+    cached = search_totals_cache.get(key)
+    if cached is not None:
+        return cached, True
     total = query.count()
-    results = query.order_by(Case.created_at.desc()).offset(skip).limit(limit).all()
-    return results, total
+    search_totals_cache.put(key, total)
+    return total, False
 
 
 def create_case(db: Session, *, person_id: int, status: str, priority: Optional[str], reported_at: Optional[datetime], is_priority: bool) -> Case:
@@ -79,6 +174,7 @@ def create_case(db: Session, *, person_id: int, status: str, priority: Optional[
         is_priority=is_priority,
     )
     db.add(case)
+    case_stats.record_case_change(db, None, case_stats.case_state(case))
     db.commit()
     db.refresh(case)
     return case
@@ -94,6 +190,10 @@ def update_case(
     resolution_summary: Optional[str] = None,
     is_priority: Optional[bool] = None,
 ) -> Case:
+    # Diff against the committed row, locked until the commit: two concurrent
+    # updates of the same case must not both apply the same transition.
+    db.refresh(case, with_for_update=True)
+    previous_state = case_stats.case_state(case)
     new_status_enum: Optional[CaseStatusEnum] = None
     if status:
         try:
@@ -113,6 +213,7 @@ def update_case(
         case.is_priority = is_priority
     case.updated_at = datetime.utcnow()
     db.add(case)
+    case_stats.record_case_change(db, previous_state, case_stats.case_state(case))
     db.commit()
     db.refresh(case)
     return case
@@ -198,6 +299,10 @@ def list_case_actions(db: Session, *, case_id: int) -> List[CaseAction]:
 
 
 def get_cases_summary(db: Session) -> dict:
+    summary = case_stats.read_case_summary(db)
+    if summary is not None:
+        return summary
+    # Counters not built yet (see scripts/db_init.py --rebuild-counters).
     counts = dict(
         db.query(Case.status, func.count(Case.case_id)).group_by(Case.status).all()
     )
@@ -231,38 +336,5 @@ def get_cases_summary(db: Session) -> dict:
     }
 
 
-def get_time_series(db: Session, *, days: int) -> List[dict]:
-    start_date = datetime.utcnow() - timedelta(days=days)
-    reported_data = (
-        db.query(func.date(Case.reported_at).label("day"), func.count(Case.case_id))
-        .filter(Case.reported_at >= start_date)
-        .group_by(func.date(Case.reported_at))
-        .order_by(func.date(Case.reported_at))
-        .all()
-    )
-    resolved_data = (
-        db.query(func.date(Case.resolved_at).label("day"), func.count(Case.case_id))
-        .filter(Case.resolved_at.isnot(None))
-        .filter(Case.resolved_at >= start_date)
-        .filter(Case.status == CaseStatusEnum.RESOLVED)
-        .group_by(func.date(Case.resolved_at))
-        .order_by(func.date(Case.resolved_at))
-        .all()
-    )
-
-    reported_lookup = {row[0]: row[1] for row in reported_data}
-    resolved_lookup = {row[0]: row[1] for row in resolved_data}
-
-    points = []
-    current = start_date.date()
-    today = datetime.utcnow().date()
-    while current <= today:
-        points.append(
-            {
-                "date": current,
-                "reported": reported_lookup.get(current, 0),
-                "resolved": resolved_lookup.get(current, 0),
-            }
-        )
-        current += timedelta(days=1)
-    return points
+def get_time_series(db: Session, *, start_day: date, end_day: date) -> List[dict]:
+    return case_stats.time_series(db, start_day, end_day)
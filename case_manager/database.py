@@ -1,11 +1,11 @@
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from common.database import create_service_engine
 from config_loader import build_database_url
 
 DATABASE_URL = build_database_url()
 
-engine = create_engine(DATABASE_URL)
+engine = create_service_engine("case_manager", DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
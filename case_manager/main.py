@@ -1,7 +1,7 @@
 from __future__ import annotations
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
 from urllib import request as urllib_request, error as urllib_error
 
@@ -11,6 +11,9 @@ from sqlalchemy.orm import Session
 
 from case_manager import crud, schemas
 from case_manager.database import get_db
+from common import case_stats
+from common.pagination import InvalidCursor, decode_cursor
+from common.database import get_pool_stats
 from common.security import TokenPayload, require_permissions
 # Note: ORM models are imported indirectly through crud module
 
@@ -27,6 +30,7 @@ app.add_middleware(
 
 require_case_manager = require_permissions(["case_manager"])
 require_dashboard = require_permissions(["dashboard"])
+require_admin = require_permissions(["manage_users"])
 
 
 def notify_dashboard_refresh(event: str, case_id: Optional[int] = None) -> None:
@@ -59,23 +63,53 @@ def healthcheck():
     }
 
 
+@app.get("/internal/db-pool")
+def internal_db_pool(_: TokenPayload = Depends(require_admin)) -> dict:
+    return get_pool_stats()
+
+
 @app.get("/cases", response_model=schemas.CaseListResponse)
 def list_cases(
     status: Optional[schemas.CaseStatus] = Query(None),
     search: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor de la página anterior; con cursor se ignora skip (paginación por clave).",
+    ),
+    include_total: bool = Query(
+        True,
+        description="false omite el total (útil al pedir páginas siguientes con cursor).",
+    ),
+    order: str = Query(
+        "recent",
+        pattern="^(recent|relevance)$",
+        description="relevance ordena los resultados de search por puntuación FULLTEXT (paginación con skip).",
+    ),
     db: Session = Depends(get_db),
     _: TokenPayload = Depends(require_case_manager),
 ):
-    cases, total = crud.list_cases(
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = crud.list_cases(
         db,
         status=status.value if status else None,
         search=search,
         skip=skip,
         limit=limit,
+        cursor=position,
+        include_total=include_total,
+        order=order,
+    )
+    return schemas.CaseListResponse(
+        items=page.items,
+        total=page.total,
+        total_estimated=page.total_estimated,
+        next_cursor=page.next_cursor,
     )
-    return schemas.CaseListResponse(items=cases, total=total)
 
 
 @app.get("/cases/{case_id}", response_model=schemas.Case)
@@ -220,17 +254,17 @@ def summary_stats(
 
 @app.get("/cases/stats/time-series", response_model=schemas.TimeSeriesResponse)
 def time_series(
-    range: str = Query("7d", pattern="^(24h|7d|30d)$"),
+    range: str = Query("7d", pattern=case_stats.TIME_RANGE_PATTERN),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
     db: Session = Depends(get_db),
     _: TokenPayload = Depends(require_dashboard),
 ):
-    if range == "24h":
-        days = 1
-    elif range == "7d":
-        days = 7
-    else:
-        days = 30
-    points = crud.get_time_series(db, days=days)
+    try:
+        range, start_day, end_day = case_stats.parse_time_window(range, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid range: {exc}")
+    points = crud.get_time_series(db, start_day=start_day, end_day=end_day)
     return schemas.TimeSeriesResponse(
         range=range,
         points=[
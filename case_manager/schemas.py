@@ -69,7 +69,9 @@ class Case(CaseBase):
 
 class CaseListResponse(BaseModel):
     items: List[Case]
-    total: int
+    total: Optional[int] = None  # None when requested with include_total=false
+    total_estimated: bool = False  # True when served from the short-lived search cache
+    next_cursor: Optional[str] = None
 
 
 class CaseResponsibleBase(BaseModel):
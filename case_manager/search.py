@@ -0,0 +1,74 @@
+"""Indexed search over the person fields shown in the cases UI.
+
+On MySQL the search uses the ``ft_persons_lost_search`` FULLTEXT index
+(``first_name``, ``last_name``, ``lost_location``) in boolean mode: every
+token is required and matched as a prefix (``+quit*``), so "jos qui" finds
+"José ... Quito". The tables use MySQL 8's default ``utf8mb4_0900_ai_ci``
+collation, which makes the index accent- and case-insensitive. ``MATCH`` also
+yields a relevance score used for ``order=relevance``.
+
+InnoDB does not index tokens shorter than ``innodb_ft_min_token_size`` (3 by
+default) nor its default stopwords; those tokens are matched with a
+word-prefix ``LIKE`` on top of the FULLTEXT filter. Other dialects (SQLite in tests and local load runs) fall
+back to the previous ``LIKE '%term%'`` scan.
+"""
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.sql.elements import ColumnElement
+
+from scripts.db_init import PersonLost
+
+SEARCH_MIN_TOKEN_SIZE = int(os.getenv("SEARCH_MIN_TOKEN_SIZE", "3"))
+SEARCH_MAX_TOKENS = 8
+# INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD: never indexed, so a required
+# "+the*" would match nothing.
+INNODB_STOPWORDS = {
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how", "i",
+    "in", "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when",
+    "where", "who", "will", "with", "und", "www",
+}
+# Must list exactly the columns of the FULLTEXT index, in the same order.
+_SEARCH_COLUMNS = (PersonLost.first_name, PersonLost.last_name, PersonLost.lost_location)
+
+
+def normalize(value: str) -> str:
+    """Lower-case ``value`` and strip accents."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(search: str) -> List[str]:
+    return re.findall(r"\w+", normalize(search))[:SEARCH_MAX_TOKENS]
+
+
+def _like_any(*patterns: str) -> ColumnElement:
+    return or_(*(func.lower(column).like(pattern) for column in _SEARCH_COLUMNS for pattern in patterns))
+
+
+def build_search(dialect_name: str, search: str) -> Tuple[Optional[ColumnElement], Optional[ColumnElement]]:
+    """Return ``(filter, relevance)`` for ``search``; both are None for an empty search."""
+    tokens = tokenize(search)
+    if not tokens:
+        return None, None
+    if dialect_name != "mysql":
+        # Same semantics as before the index existed: substring match on the raw text.
+        return _like_any(f"%{search.lower()}%"), None
+
+    indexed = [token for token in tokens if len(token) >= SEARCH_MIN_TOKEN_SIZE and token not in INNODB_STOPWORDS]
+    unindexed = [token for token in tokens if token not in indexed]
+    # Word-prefix match for tokens the index cannot answer; evaluated only on
+    # the rows that already passed the FULLTEXT filter when there is one.
+    clauses = [_like_any(f"{token}%", f"% {token}%") for token in unindexed]
+    relevance = None
+    if indexed:
+        # \w+ tokens never contain boolean-mode operators, so no escaping is needed.
+        relevance = match(*_SEARCH_COLUMNS, against=" ".join(f"+{token}*" for token in indexed)).in_boolean_mode()
+        clauses.insert(0, relevance)
+    return and_(*clauses), relevance
@@ -0,0 +1,164 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from case_manager import crud
+from case_manager.database import get_db
+from case_manager.main import app
+from common import case_stats
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from scripts.db_init import Base, CaseStatusEnum, PersonLost
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        case_stats.rebuild_case_counters(db)
+        db.commit()
+
+    def _get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    crud.search_totals_cache.clear()
+    yield factory
+    app.dependency_overrides.clear()
+    crud.search_totals_cache.clear()
+
+
+@pytest.fixture(name="client")
+def client_fixture(session_factory):
+    token = jwt.encode(
+        {"sub": "1", "username": "tester", "permissions": ["case_manager", "dashboard"]},
+        AUTH_SECRET_KEY,
+        algorithm=AUTH_ALGORITHM,
+    )
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def _seed_cases(session_factory, names):
+    base = datetime(2024, 5, 1, 8, 0, 0)
+    with session_factory() as db:
+        for index, name in enumerate(names):
+            person = PersonLost(
+                first_name=name,
+                last_name="Listado",
+                gender="M",
+                birth_date=date(1985, 1, 1),
+                age=39,
+                lost_timestamp=base + timedelta(minutes=index),
+                lost_location="Loja, Loja",
+                status="active",
+            )
+            db.add(person)
+            db.flush()
+            crud.create_case(
+                db,
+                person_id=person.person_id,
+                status="new",
+                priority=None,
+                reported_at=person.lost_timestamp,
+                is_priority=False,
+            )
+
+
+def test_counters_follow_creates_and_status_changes(session_factory):
+    _seed_cases(session_factory, ["Ana", "Bruno", "Carla"])
+    with session_factory() as db:
+        case = crud.get_case(db, 1)
+        crud.update_case(db, case=case, status="resolved")
+        crud.update_case(db, case=case, status="resolved")  # no-op for the counters
+        counts = case_stats.read_status_counts(db)
+
+    assert counts[CaseStatusEnum.NEW] == 2
+    assert counts[CaseStatusEnum.RESOLVED] == 1
+
+
+def test_listing_totals_by_mode(client, session_factory):
+    _seed_cases(session_factory, ["Ana", "Bruno", "Carla", "Anabel"])
+
+    unfiltered = client.get("/cases", params={"limit": 2}).json()
+    assert unfiltered["total"] == 4
+    assert unfiltered["next_cursor"]
+
+    without_total = client.get("/cases", params={"cursor": unfiltered["next_cursor"], "include_total": "false"}).json()
+    assert without_total["total"] is None
+    assert len(without_total["items"]) == 2
+
+    first = client.get("/cases", params={"search": "ana"}).json()
+    assert first["total"] == 2 and first["total_estimated"] is False
+    cached = client.get("/cases", params={"search": "ANA"}).json()
+    assert cached["total"] == 2 and cached["total_estimated"] is True
+
+    assert client.get("/cases", params={"status": "resolved"}).json()["total"] == 0
+
+
+def test_summary_is_served_from_counters(client, session_factory):
+    _seed_cases(session_factory, ["Ana", "Bruno", "Carla"])
+    with session_factory() as db:
+        first, second = crud.get_case(db, 1), crud.get_case(db, 2)
+        crud.update_case(db, case=first, status="resolved", resolved_at=first.reported_at + timedelta(hours=2))
+        crud.update_case(db, case=second, status="resolved", resolved_at=second.reported_at + timedelta(hours=4))
+        # Reopening a case removes its response time from the running average.
+        crud.update_case(db, case=second, status="in_progress")
+
+    summary = client.get("/cases/stats/summary").json()
+
+    assert summary["total_cases"] == 3
+    assert summary["new_cases"] == 1
+    assert summary["in_progress_cases"] == 1
+    assert summary["resolved_cases"] == 1
+    assert summary["average_response_hours"] == 2.0
+
+
+def test_daily_rollup_matches_a_rebuild_and_serves_custom_ranges(client, session_factory):
+    _seed_cases(session_factory, ["Ana", "Bruno", "Carla"])
+    with session_factory() as db:
+        first, second = crud.get_case(db, 1), crud.get_case(db, 2)
+        crud.update_case(db, case=first, status="resolved", resolved_at=datetime(2024, 5, 3, 9, 0, 0))
+        crud.update_case(db, case=second, status="resolved", resolved_at=datetime(2024, 5, 2, 9, 0, 0))
+        # Reopening takes the resolution back out of its day.
+        crud.update_case(db, case=second, status="in_progress")
+        incremental = case_stats.time_series(db, date(2024, 4, 30), date(2024, 5, 3))
+        case_stats.rebuild_case_counters(db)
+        db.commit()
+        assert case_stats.time_series(db, date(2024, 4, 30), date(2024, 5, 3)) == incremental
+
+    response = client.get("/cases/stats/time-series", params={"start": "2024-04-30", "end": "2024-05-03"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["range"] == "custom"
+    assert [(point["date"][:10], point["reported"], point["resolved"]) for point in body["points"]] == [
+        ("2024-04-30", 0, 0),
+        ("2024-05-01", 3, 0),
+        ("2024-05-02", 0, 0),
+        ("2024-05-03", 0, 1),
+    ]
+
+
+def test_time_window_parsing():
+    today = date(2024, 5, 10)
+    assert case_stats.parse_time_window("24h", today=today) == ("24h", date(2024, 5, 9), today)
+    assert case_stats.parse_time_window("90d", today=today)[1] == date(2024, 2, 10)
+    assert case_stats.parse_time_window("1y", today=today)[1] == date(2023, 5, 11)
+    with pytest.raises(ValueError):
+        case_stats.parse_time_window("0d", today=today)
+    with pytest.raises(ValueError):
+        case_stats.parse_time_window(start=date(2024, 5, 2), end=date(2024, 5, 1), today=today)
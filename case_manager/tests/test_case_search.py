@@ -0,0 +1,37 @@
+from sqlalchemy.dialects import mysql
+
+from case_manager.search import build_search, tokenize
+
+
+def _mysql_sql(clause) -> str:
+    return str(clause.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_tokens_are_accent_and_case_insensitive():
+    assert tokenize("  José  QUITO, Ñandú ") == ["jose", "quito", "nandu"]
+
+
+def test_mysql_search_uses_fulltext_prefix_match():
+    search_filter, relevance = build_search("mysql", "José Quito")
+
+    sql = _mysql_sql(search_filter)
+    assert "MATCH (persons_lost.first_name, persons_lost.last_name, persons_lost.lost_location)" in sql
+    assert "AGAINST ('+jose* +quito*' IN BOOLEAN MODE)" in sql
+    assert "LIKE" not in sql
+    assert relevance is not None
+
+
+def test_short_tokens_and_stopwords_fall_back_to_word_prefix_like():
+    search_filter, _ = build_search("mysql", "Ana de la Torre")
+
+    sql = _mysql_sql(search_filter)
+    assert "AGAINST ('+ana* +torre*' IN BOOLEAN MODE)" in sql
+    assert "LIKE 'de%%'" in sql and "LIKE '%% la%%'" in sql
+
+
+def test_other_dialects_keep_substring_like():
+    search_filter, relevance = build_search("sqlite", "quito")
+
+    assert relevance is None
+    assert search_filter is not None
+    assert build_search("sqlite", "  ,, ") == (None, None)
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from case_manager import crud
+from common import case_stats
+from scripts.db_init import Base, Case, CaseStatusEnum, PersonLost
+
+
+def test_update_diffs_against_the_locked_committed_row(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cases.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        person = PersonLost(first_name="Concurrente", last_name="Patch", gender="F", birth_date=date(1990, 1, 1))
+        db.add(person)
+        db.flush()
+        db.add(Case(person_id=person.person_id, status=CaseStatusEnum.NEW, reported_at=datetime(2024, 5, 1, 8)))
+        db.commit()
+        case_stats.rebuild_case_counters(db)
+        db.commit()
+
+    # Both requests load the case while it is still new; the first one commits its change.
+    first, second = factory(), factory()
+    stale = second.get(Case, 1)
+    crud.update_case(first, case=first.get(Case, 1), status=CaseStatusEnum.IN_PROGRESS.value)
+    crud.update_case(second, case=stale, status=CaseStatusEnum.IN_PROGRESS.value)
+    first.close()
+    second.close()
+
+    with factory() as db:
+        counts = case_stats.read_status_counts(db)
+    assert counts[CaseStatusEnum.NEW] == 0
+    assert counts[CaseStatusEnum.IN_PROGRESS] == 1
+    assert sum(counts.values()) == 1
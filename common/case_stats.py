@@ -0,0 +1,314 @@
+"""Incrementally maintained case counters.
+
+``case_counters`` holds one row per counter (``status:new``,
+``status:resolved``, ...) plus the running ``response:seconds_sum`` /
+``response:count`` of resolved cases. Every code path that inserts a case or
+changes its status or ``resolved_at`` bumps the affected counters inside the
+same transaction, so readers get exact totals and the average response time
+with a primary-key lookup instead of a ``GROUP BY`` / ``AVG(TIMESTAMPDIFF)``
+over ``case_cases``.
+
+The ``meta:initialized`` row is written by :func:`rebuild_case_counters`;
+while it is missing, readers return ``None`` and callers fall back to the
+aggregate query.
+
+``case_daily_rollup`` is maintained the same way: one row per day with the
+cases reported that day and the resolved cases whose ``resolved_at`` falls on
+it, so a time series over any range costs O(days) instead of a
+``GROUP BY DATE(...)`` over every case. Its ``meta:rollup_initialized`` marker
+lives in ``case_counters``; without it :func:`time_series` scans ``case_cases``.
+"""
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from scripts.db_init import Case, CaseCounter, CaseDailyRollup, CaseStatusEnum
+
+INITIALIZED_KEY = "meta:initialized"
+ROLLUP_INITIALIZED_KEY = "meta:rollup_initialized"
+RESPONSE_SUM_KEY = "response:seconds_sum"
+RESPONSE_COUNT_KEY = "response:count"
+
+# Longest time series served (about ten years of daily points).
+MAX_TIME_SERIES_DAYS = 3660
+# Query-string pattern for ``range``; see :func:`parse_time_window`.
+TIME_RANGE_PATTERN = r"^(\d+)([hdwmy])$"
+_RANGE_PATTERN = re.compile(TIME_RANGE_PATTERN)
+_RANGE_UNIT_DAYS = {"d": 1, "w": 7, "m": 30, "y": 365}
+
+
+class CaseState(NamedTuple):
+    """What a case contributes to the counters and the daily rollup."""
+
+    status: CaseStatusEnum
+    response_seconds: Optional[int]
+    reported_day: Optional[date]
+    resolved_day: Optional[date]
+
+
+def status_key(status: CaseStatusEnum) -> str:
+    return f"status:{status.value}"
+
+
+def _increment_stmt(dialect_name: str, table, rows: list, key_columns: Sequence[str], value_columns: Sequence[str]):
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(rows)
+        return stmt.on_duplicate_key_update(
+            {column: table.c[column] + stmt.inserted[column] for column in value_columns}
+        )
+    # SQLite (tests, local load runs) and PostgreSQL share the ON CONFLICT syntax.
+    from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={column: table.c[column] + stmt.excluded[column] for column in value_columns},
+    )
+
+
+def bump(db: Session, deltas: Dict[str, int]) -> None:
+    """Atomically add ``deltas`` to the named counters in the current transaction."""
+    # Sorted so concurrent transactions lock the counter rows in the same order.
+    rows = [{"name": name, "value": delta} for name, delta in sorted(deltas.items()) if delta]
+    if rows:
+        db.execute(_increment_stmt(db.get_bind().dialect.name, CaseCounter.__table__, rows, ["name"], ["value"]))
+
+
+def bump_rollup(db: Session, days: Dict[date, Tuple[int, int]]) -> None:
+    """Atomically add ``(reported, resolved)`` deltas to the daily rollup rows."""
+    rows = [
+        {"day": day, "reported": reported, "resolved": resolved}
+        for day, (reported, resolved) in sorted(days.items())
+        if reported or resolved
+    ]
+    if rows:
+        db.execute(
+            _increment_stmt(
+                db.get_bind().dialect.name,
+                CaseDailyRollup.__table__,
+                rows,
+                ["day"],
+                ["reported", "resolved"],
+            )
+        )
+
+
+def _accumulate(
+    counters: Dict[str, int], rollup: Dict[date, Tuple[int, int]], state: CaseState, sign: int
+) -> None:
+    counters[status_key(state.status)] = counters.get(status_key(state.status), 0) + sign
+    if state.response_seconds is not None:
+        counters[RESPONSE_SUM_KEY] = counters.get(RESPONSE_SUM_KEY, 0) + sign * state.response_seconds
+        counters[RESPONSE_COUNT_KEY] = counters.get(RESPONSE_COUNT_KEY, 0) + sign
+    if state.reported_day is not None:
+        reported, resolved = rollup.get(state.reported_day, (0, 0))
+        rollup[state.reported_day] = (reported + sign, resolved)
+    if state.resolved_day is not None:
+        reported, resolved = rollup.get(state.resolved_day, (0, 0))
+        rollup[state.resolved_day] = (reported, resolved + sign)
+
+
+def record_case_changes(db: Session, changes: Iterable[Tuple[Optional[CaseState], CaseState]]) -> None:
+    """Apply the counter and rollup deltas of ``(before, after)`` pairs (``before=None`` for inserts)."""
+    counters: Dict[str, int] = {}
+    rollup: Dict[date, Tuple[int, int]] = {}
+    for before, after in changes:
+        if before is not None:
+            _accumulate(counters, rollup, before, -1)
+        _accumulate(counters, rollup, after, 1)
+    bump(db, counters)
+    bump_rollup(db, rollup)
+
+
+def record_cases_created(db: Session, states: Iterable[CaseState]) -> None:
+    record_case_changes(db, ((None, state) for state in states))
+
+
+def response_seconds(
+    status: CaseStatusEnum, reported_at: Optional[datetime], resolved_at: Optional[datetime]
+) -> Optional[int]:
+    """Seconds from report to resolution, counted only for resolved cases (as TIMESTAMPDIFF)."""
+    if status != CaseStatusEnum.RESOLVED or reported_at is None or resolved_at is None:
+        return None
+    return int((resolved_at - reported_at).total_seconds())
+
+
+def new_case_state(
+    status: CaseStatusEnum, reported_at: Optional[datetime], resolved_at: Optional[datetime] = None
+) -> CaseState:
+    # reported_at defaults to utcnow() on insert, so a missing value lands today.
+    reported_day = (reported_at or datetime.utcnow()).date()
+    resolved_day = resolved_at.date() if status == CaseStatusEnum.RESOLVED and resolved_at is not None else None
+    return CaseState(status, response_seconds(status, reported_at, resolved_at), reported_day, resolved_day)
+
+
+def case_state(case: Case) -> CaseState:
+    return new_case_state(case.status, case.reported_at, case.resolved_at)
+
+
+def record_case_change(db: Session, before: Optional[CaseState], after: CaseState) -> None:
+    """Apply the counter deltas between two states of a case (``before=None`` for inserts)."""
+    record_case_changes(db, [(before, after)])
+
+
+def counters_initialized(db: Session) -> bool:
+    return db.get(CaseCounter, INITIALIZED_KEY) is not None
+
+
+def rollup_initialized(db: Session) -> bool:
+    return db.get(CaseCounter, ROLLUP_INITIALIZED_KEY) is not None
+
+
+def _read_counters(db: Session) -> Optional[Dict[str, int]]:
+    rows = {name: int(value) for name, value in db.execute(select(CaseCounter.name, CaseCounter.value)).all()}
+    return rows if INITIALIZED_KEY in rows else None
+
+
+def read_status_counts(db: Session) -> Optional[Dict[CaseStatusEnum, int]]:
+    """Return the per-status totals, or ``None`` if the counters were never built."""
+    rows = _read_counters(db)
+    if rows is None:
+        return None
+    return {status: rows.get(status_key(status), 0) for status in CaseStatusEnum}
+
+
+def read_case_summary(db: Session) -> Optional[dict]:
+    """Return the case KPI summary from the counters, or ``None`` if they were never built."""
+    rows = _read_counters(db)
+    if rows is None:
+        return None
+    counts = {status: rows.get(status_key(status), 0) for status in CaseStatusEnum}
+    response_count = rows.get(RESPONSE_COUNT_KEY, 0)
+    avg_seconds = rows.get(RESPONSE_SUM_KEY, 0) / response_count if response_count else None
+    return {
+        "total_cases": sum(counts.values()),
+        "new_cases": counts[CaseStatusEnum.NEW],
+        "in_progress_cases": counts[CaseStatusEnum.IN_PROGRESS],
+        "resolved_cases": counts[CaseStatusEnum.RESOLVED],
+        "cancelled_cases": counts[CaseStatusEnum.CANCELLED],
+        "archived_cases": counts[CaseStatusEnum.ARCHIVED],
+        "average_response_hours": round(avg_seconds / 3600, 2) if avg_seconds else None,
+    }
+
+
+def rebuild_case_counters(db: Session) -> None:
+    """Recompute every counter and the daily rollup from ``case_cases`` (run while writes are paused)."""
+    counters: Dict[str, int] = {status_key(status): 0 for status in CaseStatusEnum}
+    counters[RESPONSE_SUM_KEY] = counters[RESPONSE_COUNT_KEY] = 0
+    rollup: Dict[date, Tuple[int, int]] = {}
+    cases = select(Case.status, Case.reported_at, Case.resolved_at).execution_options(yield_per=5000)
+    for status, reported_at, resolved_at in db.execute(cases):
+        _accumulate(counters, rollup, new_case_state(status, reported_at, resolved_at), 1)
+    counters[INITIALIZED_KEY] = counters[ROLLUP_INITIALIZED_KEY] = 1
+    db.execute(delete(CaseCounter))
+    db.execute(insert(CaseCounter.__table__), [{"name": name, "value": value} for name, value in counters.items()])
+    db.execute(delete(CaseDailyRollup))
+    rollup_rows = [
+        {"day": day, "reported": reported, "resolved": resolved}
+        for day, (reported, resolved) in sorted(rollup.items())
+        if reported or resolved
+    ]
+    if rollup_rows:
+        db.execute(insert(CaseDailyRollup.__table__), rollup_rows)
+
+
+def parse_time_window(
+    range: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    today: Optional[date] = None,
+) -> Tuple[str, date, date]:
+    """Resolve ``range`` (``24h``, ``7d``, ``12w``, ``6m``, ``1y``…) or ``start``/``end`` into days.
+
+    Returns ``(label, start_day, end_day)``, both days included. A range of N
+    days starts N days before today, as the 24h/7d/30d views always did.
+    Raises ``ValueError`` for anything malformed or longer than
+    ``MAX_TIME_SERIES_DAYS``.
+    """
+    today = today or datetime.utcnow().date()
+    if start is not None or end is not None:
+        if start is None:
+            raise ValueError("start is required with end")
+        end = end or today
+        label = "custom"
+    else:
+        label = range or "7d"
+        match = _RANGE_PATTERN.match(label)
+        if not match:
+            raise ValueError(f"invalid range: {label}")
+        amount, unit = int(match.group(1)), match.group(2)
+        days = -(-amount // 24) if unit == "h" else amount * _RANGE_UNIT_DAYS[unit]
+        if days <= 0:
+            raise ValueError(f"invalid range: {label}")
+        if days > MAX_TIME_SERIES_DAYS:
+            raise ValueError(f"range longer than {MAX_TIME_SERIES_DAYS} days")
+        start, end = today - timedelta(days=days), today
+    if start > end:
+        raise ValueError("start must not be after end")
+    if (end - start).days > MAX_TIME_SERIES_DAYS:
+        raise ValueError(f"range longer than {MAX_TIME_SERIES_DAYS} days")
+    return label, start, end
+
+
+def _series(start_day: date, end_day: date, reported: Dict[date, int], resolved: Dict[date, int]) -> List[dict]:
+    points = []
+    current = start_day
+    while current <= end_day:
+        points.append({"date": current, "reported": reported.get(current, 0), "resolved": resolved.get(current, 0)})
+        current += timedelta(days=1)
+    return points
+
+
+def read_time_series(db: Session, start_day: date, end_day: date) -> Optional[List[dict]]:
+    """Daily points from the rollup, or ``None`` if it was never built."""
+    if not rollup_initialized(db):
+        return None
+    rows = db.execute(
+        select(CaseDailyRollup.day, CaseDailyRollup.reported, CaseDailyRollup.resolved)
+        .where(CaseDailyRollup.day >= start_day)
+        .where(CaseDailyRollup.day <= end_day)
+    ).all()
+    reported = {day: int(count) for day, count, _ in rows}
+    resolved = {day: int(count) for day, _, count in rows}
+    return _series(start_day, end_day, reported, resolved)
+
+
+def _as_date(value) -> date:
+    # SQLite's DATE() returns text.
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def time_series(db: Session, start_day: date, end_day: date) -> List[dict]:
+    """Reported/resolved cases per day between both days (included)."""
+    points = read_time_series(db, start_day, end_day)
+    if points is not None:
+        return points
+    since = datetime.combine(start_day, datetime.min.time())
+    until = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+    reported_day, resolved_day = func.date(Case.reported_at), func.date(Case.resolved_at)
+    reported = (
+        db.query(reported_day, func.count(Case.case_id))
+        .filter(Case.reported_at >= since, Case.reported_at < until)
+        .group_by(reported_day)
+        .all()
+    )
+    resolved = (
+        db.query(resolved_day, func.count(Case.case_id))
+        .filter(Case.status == CaseStatusEnum.RESOLVED)
+        .filter(Case.resolved_at >= since, Case.resolved_at < until)
+        .group_by(resolved_day)
+        .all()
+    )
+    return _series(
+        start_day,
+        end_day,
+        {_as_date(day): int(count) for day, count in reported},
+        {_as_date(day): int(count) for day, count in resolved},
+    )
@@ -0,0 +1,165 @@
+"""Decode Debezium change events for ``persons_lost`` into dashboard deltas.
+
+The connector publishes one JSON message per row change, either bare
+(``{"before", "after", "op"}``, ``value.converter.schemas.enable=false``) or
+wrapped in a ``{"schema", "payload"}`` envelope; both are accepted.
+
+A change becomes a list of :class:`Delta` (``age_group``/``gender``/``hour``/
+``status`` label plus ``+1``/``-1``) only when the dashboard can apply it
+locally without disagreeing with what ``/stats/*`` would return:
+
+* inserts (``c``) add one to the buckets of the new row – the Flink job and
+  the SQL fallback both count exactly these, with the hour taken from the
+  stored wall-clock value (:func:`lost_hour`) on all three sides;
+* updates (``u``) that only touch ``status`` move one unit between status
+  buckets; any other update changes a charted bucket and needs a reload;
+* deletes, snapshot reads and rows with missing values cannot be expressed as
+  deltas (the Flink aggregates never decrement), so :func:`change_deltas`
+  returns ``None`` and the caller falls back to a full refresh.
+"""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional
+
+CHARTED_DIMENSIONS = ("age_group", "gender", "hour")
+
+# Same buckets (and labels) as flink/flink_sql_job.sql → agg_age_group.
+AGE_GROUP_BOUNDS = ((12, "0-12"), (18, "13-18"), (30, "19-30"), (60, "31-60"))
+AGE_GROUP_OVERFLOW = "61+"
+# Keys of the daily aggregates for rows without gender / age / location.
+UNKNOWN_GENDER = "U"
+UNKNOWN_AGE_GROUP = "unknown"
+UNKNOWN_LOCATION = "unknown"
+
+
+class InvalidChangeEvent(ValueError):
+    """The message is not a Debezium row change."""
+
+
+class ChangeEvent(NamedTuple):
+    op: str
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
+
+
+class Delta(NamedTuple):
+    dimension: str
+    label: str
+    delta: int
+
+
+def decode_change(raw: Any) -> Optional[ChangeEvent]:
+    """Parse a Kafka message value; ``None`` for tombstones (empty values after a delete)."""
+    if raw is None or raw == b"" or raw == "":
+        return None
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    try:
+        message = json.loads(raw) if isinstance(raw, str) else raw
+    except ValueError as exc:
+        raise InvalidChangeEvent(f"invalid JSON: {exc}") from exc
+    if not isinstance(message, dict):
+        raise InvalidChangeEvent("message is not an object")
+    payload = message
+    if "payload" in message and "op" not in message:
+        payload = message["payload"]
+        if payload is None:
+            return None
+    if not isinstance(payload, dict) or not isinstance(payload.get("op"), str):
+        raise InvalidChangeEvent("missing 'op'")
+    before, after = payload.get("before"), payload.get("after")
+    if (before is not None and not isinstance(before, dict)) or (after is not None and not isinstance(after, dict)):
+        raise InvalidChangeEvent("'before'/'after' must be objects")
+    return ChangeEvent(payload["op"], before, after)
+
+
+def age_group(age: Any) -> Optional[str]:
+    if not isinstance(age, int) or isinstance(age, bool) or age < 0:
+        return None
+    for upper, label in AGE_GROUP_BOUNDS:
+        if age <= upper:
+            return label
+    return AGE_GROUP_OVERFLOW
+
+
+def lost_hour(value: Any) -> Optional[int]:
+    """Hour of ``lost_timestamp`` as MySQL ``HOUR()`` sees it.
+
+    Debezium encodes ``DATETIME`` as epoch milliseconds of the wall-clock
+    value read as UTC, so the UTC hour is the stored hour. The Flink jobs use
+    the same arithmetic on the milliseconds for ``agg_hourly`` (not
+    ``HOUR(TO_TIMESTAMP_LTZ(...))``, which follows ``FLINK_LOCAL_TIMEZONE``).
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).hour
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).hour
+        except ValueError:
+            return None
+    return None
+
+
+def lost_day(value: Any) -> Optional[date]:
+    """Day of ``lost_timestamp`` as MySQL ``DATE()`` sees it (see :func:`lost_hour`)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).date()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+        except ValueError:
+            return None
+    return None
+
+
+def normalize_location(value: Any) -> str:
+    """Grouping key of ``lost_location``: trimmed, single-spaced and lower-case.
+
+    Matches the expression the Flink job uses for ``agg_daily_location``.
+    """
+    if not isinstance(value, str):
+        return UNKNOWN_LOCATION
+    return " ".join(value.split()).lower() or UNKNOWN_LOCATION
+
+
+def row_labels(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+    """Bucket labels of a ``persons_lost`` row, or ``None`` if a charted one is unknown."""
+    if not row:
+        return None
+    hour = lost_hour(row.get("lost_timestamp"))
+    labels = {
+        "age_group": age_group(row.get("age")),
+        "gender": row.get("gender") or None,
+        "hour": None if hour is None else str(hour),
+    }
+    if any(labels[dimension] is None for dimension in CHARTED_DIMENSIONS):
+        return None
+    if row.get("status"):
+        labels["status"] = str(row["status"])
+    return labels
+
+
+def change_deltas(change: ChangeEvent) -> Optional[List[Delta]]:
+    """Deltas for ``change``; ``[]`` if nothing the dashboard shows changed, ``None`` if it must reload."""
+    if change.op == "c":
+        labels = row_labels(change.after)
+        if labels is None:
+            return None
+        return [Delta(dimension, label, 1) for dimension, label in labels.items()]
+    if change.op == "u":
+        before, after = row_labels(change.before), row_labels(change.after)
+        if before is None or after is None:
+            return None
+        if any(before[dimension] != after[dimension] for dimension in CHARTED_DIMENSIONS):
+            return None
+        if before.get("status") == after.get("status"):
+            return []
+        deltas = []
+        if before.get("status"):
+            deltas.append(Delta("status", before["status"], -1))
+        if after.get("status"):
+            deltas.append(Delta("status", after["status"], 1))
+        return deltas
+    return None
@@ -0,0 +1,140 @@
+"""Shared SQLAlchemy engine factory with tuned pooling and live pool statistics.
+
+Every service builds its engine through :func:`create_service_engine` so pool
+size, overflow, timeout, recycle and pre-ping come from ``config_loader``
+instead of SQLAlchemy's defaults. The pools are instrumented: each checkout is
+timed (including the time spent waiting for a free connection) and
+:func:`get_pool_stats` exposes the current occupancy together with a checkout
+latency histogram, which tells pool exhaustion apart from a slow MySQL.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config_loader import build_database_url, get_pool_settings
+
+CHECKOUT_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class PoolStats:
+    """Thread-safe counters describing how long connection checkouts take."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._bucket_counts = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record(self, elapsed_ms: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                index = next(
+                    (idx for idx, bound in enumerate(CHECKOUT_BUCKETS_MS) if elapsed_ms <= bound),
+                    len(CHECKOUT_BUCKETS_MS),
+                )
+                self._bucket_counts[index] += 1
+            self.total_wait_ms += elapsed_ms
+            self.max_wait_ms = max(self.max_wait_ms, elapsed_ms)
+
+    def snapshot(self, pool: Optional[QueuePool]) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            histogram = [
+                {"le_ms": bound, "count": count}
+                for bound, count in zip(CHECKOUT_BUCKETS_MS + [None], self._bucket_counts)
+            ]
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_ms / attempts, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "total_wait_ms": round(self.total_wait_ms, 3),
+                "checkout_histogram": histogram,
+            }
+        if pool is not None:
+            data.update(
+                {
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "checked_in": pool.checkedin(),
+                    "overflow": pool.overflow(),
+                }
+            )
+        return data
+
+
+class _InstrumentedPoolMixin:
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.stats.record((time.perf_counter() - started) * 1000, timed_out=True)
+            raise
+        self.stats.record((time.perf_counter() - started) * 1000)
+        return connection
+
+
+_STATS: Dict[str, PoolStats] = {}
+_ENGINES: Dict[str, object] = {}
+
+
+def _instrumented_pool_class(name: str, base: type) -> type:
+    # Pools are rebuilt on dispose()/recreate() from their class, so the stats
+    # object is bound at class level to survive those swaps.
+    stats = _STATS.setdefault(name, PoolStats(name))
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPoolMixin, base), {"stats": stats})
+
+
+def _engine_kwargs(service: str, stats_name: str, pool_base: type) -> dict:
+    settings = get_pool_settings(service)
+    return {
+        "poolclass": _instrumented_pool_class(stats_name, pool_base),
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+    }
+
+
+def create_service_engine(service: str, url: Optional[str] = None) -> Engine:
+    """Build the blocking engine for ``service`` using its pool settings."""
+    engine = create_engine(url or build_database_url(), **_engine_kwargs(service, service, QueuePool))
+    _ENGINES[service] = engine
+    return engine
+
+
+def create_service_async_engine(service: str, url: Optional[str] = None) -> AsyncEngine:
+    """Build the asyncio engine for ``service`` using its pool settings."""
+    name = f"{service}_async"
+    engine = create_async_engine(
+        url or build_database_url(async_driver=True),
+        **_engine_kwargs(service, name, AsyncAdaptedQueuePool),
+    )
+    _ENGINES[name] = engine
+    return engine
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Return live statistics for every engine created in this process."""
+    stats = {}
+    for name, engine in _ENGINES.items():
+        pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+        stats[name] = pool.stats.snapshot(pool)
+    return stats
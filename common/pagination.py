@@ -0,0 +1,44 @@
+"""Keyset (cursor) pagination helpers shared by the list endpoints.
+
+A cursor is an opaque, URL-safe token encoding the sort key of the last row
+of a page: ``(timestamp, id)``. The next page is fetched with
+``WHERE ts < :ts OR (ts = :ts AND id < :id) ORDER BY ts DESC, id DESC``,
+which a composite ``(ts, id)`` index serves with a range scan, so every page
+costs the same regardless of how deep it is (unlike ``OFFSET``).
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc)) from exc
+
+
+def before_cursor(timestamp_column, id_column, cursor: Tuple[datetime, int]):
+    """Filter for rows after ``cursor`` in ``(timestamp DESC, id DESC)`` order."""
+    timestamp, row_id = cursor
+    return or_(
+        timestamp_column < timestamp,
+        and_(timestamp_column == timestamp, id_column < row_id),
+    )
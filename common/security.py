@@ -53,7 +53,9 @@ def _select_token(
     return token or _extract_token_from_header(authorization) or cookie_token
 
 
-def get_current_user(
+# Declared async (no I/O happens here) so FastAPI resolves them on the event
+# loop instead of dispatching every request to the threadpool.
+async def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
     authorization: Optional[str] = Header(default=None),
     cookie_token: Optional[str] = Cookie(default=None, alias="lpm_token"),
@@ -77,7 +79,7 @@ def get_token_from_request(request: Request) -> Optional[str]:
 
 
 def require_permissions(required_permissions: List[str]) -> Callable:
-    def dependency(current_user: TokenPayload = Depends(get_current_user)) -> TokenPayload:
+    async def dependency(current_user: TokenPayload = Depends(get_current_user)) -> TokenPayload:
         if not set(required_permissions).issubset(set(current_user.permissions)):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,104 @@
+import importlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import exc as sa_exc
+
+import config_loader
+from common import database
+from common.database import CHECKOUT_BUCKETS_MS, PoolStats
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+
+
+@pytest.fixture(name="file_config")
+def file_config_fixture(monkeypatch):
+    for name in list(os.environ):
+        if "DB_POOL" in name:
+            monkeypatch.delenv(name)
+    config = {}
+    monkeypatch.setattr(config_loader, "_load_file_config", lambda: config)
+    return config
+
+
+def test_pool_settings_precedence(file_config, monkeypatch):
+    assert config_loader.get_pool_settings("dashboard") == config_loader.DEFAULT_POOL_SETTINGS
+
+    file_config["db_pool"] = {
+        "default": {"pool_size": 4, "max_overflow": 2, "pool_recycle": 600},
+        "dashboard": {"pool_size": 8},
+    }
+    settings = config_loader.get_pool_settings("dashboard")
+    assert (settings["pool_size"], settings["max_overflow"], settings["pool_recycle"]) == (8, 2, 600)
+    assert config_loader.get_pool_settings("producer")["pool_size"] == 4
+
+    monkeypatch.setenv("DB_POOL_SIZE", "12")
+    monkeypatch.setenv("DB_POOL_MAX_OVERFLOW", "3")
+    assert config_loader.get_pool_settings("dashboard")["pool_size"] == 12
+
+    monkeypatch.setenv("DASHBOARD_DB_POOL_SIZE", "20")
+    settings = config_loader.get_pool_settings("dashboard")
+    assert (settings["pool_size"], settings["max_overflow"]) == (20, 3)
+    assert config_loader.get_pool_settings("producer")["pool_size"] == 12
+
+
+def test_pool_settings_env_values_are_coerced(file_config, monkeypatch):
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    monkeypatch.setenv("PRODUCER_DB_POOL_RECYCLE", "900")
+
+    settings = config_loader.get_pool_settings("producer")
+
+    assert settings["pool_timeout"] == 2.5
+    assert settings["pool_pre_ping"] is False
+    assert settings["pool_recycle"] == 900
+
+
+def test_pool_stats_histogram_and_timeouts():
+    stats = PoolStats("unit")
+    stats.record(0.5)
+    stats.record(30)
+    stats.record(CHECKOUT_BUCKETS_MS[-1] + 1)
+    stats.record(100, timed_out=True)
+
+    snapshot = stats.snapshot(None)
+
+    assert (snapshot["checkouts"], snapshot["timeouts"]) == (3, 1)
+    counts = {bucket["le_ms"]: bucket["count"] for bucket in snapshot["checkout_histogram"]}
+    assert (counts[1], counts[50], counts[None]) == (1, 1, 1)
+    assert sum(counts.values()) == 3
+    assert snapshot["max_wait_ms"] == CHECKOUT_BUCKETS_MS[-1] + 1
+    assert snapshot["avg_wait_ms"] == pytest.approx((0.5 + 30 + CHECKOUT_BUCKETS_MS[-1] + 1 + 100) / 4, abs=1e-3)
+
+
+def test_service_engine_pool_is_instrumented(file_config, monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "_STATS", {})
+    monkeypatch.setattr(database, "_ENGINES", {})
+    file_config["db_pool"] = {"pool-test": {"pool_size": 1, "max_overflow": 0, "pool_timeout": 0.05}}
+    engine = database.create_service_engine("pool-test", f"sqlite:///{tmp_path / 'pool.db'}")
+
+    with engine.connect():
+        busy = database.get_pool_stats()["pool-test"]
+        with pytest.raises(sa_exc.TimeoutError):
+            engine.connect()
+    engine.dispose()
+
+    stats = database.get_pool_stats()["pool-test"]
+    assert (busy["pool_size"], busy["checked_out"]) == (1, 1)
+    assert (stats["checkouts"], stats["timeouts"]) == (1, 1)
+    assert stats["max_wait_ms"] >= 50
+
+
+@pytest.mark.parametrize("service", ["producer", "case_manager", "dashboard"])
+def test_pool_endpoint_requires_the_admin_permission(service):
+    client = TestClient(importlib.import_module(f"{service}.main").app)
+
+    def headers(permissions):
+        token = jwt.encode({"sub": "1", "username": "ops", "permissions": permissions}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+        return {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/internal/db-pool").status_code == 401
+    assert client.get("/internal/db-pool", headers=headers(["dashboard", "report"])).status_code == 403
+    response = client.get("/internal/db-pool", headers=headers(["manage_users"]))
+    assert response.status_code == 200 and service in response.json()
@@ -23,6 +23,12 @@ def _load_file_config() -> Dict[str, Any]:
         return json.load(config_file)
 
 
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in {"1", "true", "yes", "on"}
+    return bool(value)
+
+
 def get_db_settings() -> Dict[str, Any]:
     """Return DB connection pieces honoring env overrides."""
     file_config = _load_file_config()
@@ -36,20 +42,57 @@ def get_db_settings() -> Dict[str, Any]:
             "DB_ROOT_PASSWORD",
             os.getenv("MYSQL_ROOT_PASSWORD", file_config.get("db_root_password", "rootpassword")),
         ),
+        "async_mode": _as_bool(os.getenv("DB_ASYNC_MODE", file_config.get("db_async_mode", False))),
+        "async_driver": os.getenv("DB_ASYNC_DRIVER", file_config.get("db_async_driver", "aiomysql")),
     }
 
 
-def build_database_url(include_db: bool = True) -> str:
-    """Compose a SQLAlchemy URL pointing at MySQL with mysqlconnector driver."""
+def build_database_url(include_db: bool = True, async_driver: bool = False) -> str:
+    """Compose a SQLAlchemy URL pointing at MySQL.
+
+    Uses the blocking mysqlconnector driver by default; ``async_driver=True``
+    switches to the asyncio driver configured in ``DB_ASYNC_DRIVER``
+    (``aiomysql`` by default) for use with ``create_async_engine``.
+    """
     settings = get_db_settings()
     database = f"/{settings['name']}" if include_db else ""
+    driver = settings["async_driver"] if async_driver else "mysqlconnector"
     return (
-        "mysql+mysqlconnector://"
+        f"mysql+{driver}://"
         f"{settings['user']}:{settings['password']}@"
         f"{settings['host']}:{settings['port']}{database}"
     )
 
 
+DEFAULT_POOL_SETTINGS: Dict[str, Any] = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30.0,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+
+def get_pool_settings(service: str) -> Dict[str, Any]:
+    """Return connection pool settings for ``service``.
+
+    Precedence (lowest to highest): built-in defaults, ``db_pool.default`` and
+    ``db_pool.<service>`` in config.json, ``DB_POOL_SIZE``-style env vars and
+    finally service-scoped env vars such as ``DASHBOARD_DB_POOL_SIZE``.
+    """
+    file_pools = _load_file_config().get("db_pool", {})
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    settings.update(file_pools.get("default", {}))
+    settings.update(file_pools.get(service, {}))
+    for key, default in DEFAULT_POOL_SETTINGS.items():
+        env_suffix = f"DB_{key.upper()}" if key.startswith("pool_") else f"DB_POOL_{key.upper()}"
+        for env_name in (env_suffix, f"{service.upper()}_{env_suffix}"):
+            raw = os.getenv(env_name)
+            if raw is not None:
+                settings[key] = _as_bool(raw) if isinstance(default, bool) else type(default)(raw)
+    return settings
+
+
 def build_root_admin_url() -> str:
     """Compose a SQLAlchemy URL using root credentials, no DB selected."""
     settings = get_db_settings()
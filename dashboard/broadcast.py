@@ -0,0 +1,188 @@
+"""Broadcast backbone shared by the dashboard workers.
+
+Events (CDC deltas, ``/internal/refresh``) can originate in any uvicorn
+worker, but each browser socket lives in exactly one of them. Workers publish
+through a :class:`Broadcast` and every worker – the publisher included –
+receives each message in its ``deliver`` callback, which stamps the local
+``seq`` and fans it out to its own sockets.
+
+``DASHBOARD_BROADCAST_URL`` selects the backend:
+
+* ``memory://`` (default): delivery inside the process; only for one worker.
+* ``unix:///path/to/hub.sock``: a hub on a Unix socket. The worker holding
+  ``<path>.lock`` (``flock``) serves the hub and relays every line to all
+  connected workers. If it dies the lock is released and another worker takes
+  over. A worker that loses the hub calls ``resync`` after reconnecting,
+  since it may have missed messages.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+from typing import Awaitable, Callable, Optional, Set
+from urllib.parse import urlparse
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_BROADCAST_URL = os.getenv("DASHBOARD_BROADCAST_URL", "memory://")
+
+Deliver = Callable[[str], Awaitable[None]]
+Resync = Callable[[], Awaitable[None]]
+
+
+class Broadcast(abc.ABC):
+    @abc.abstractmethod
+    async def start(self, deliver: Deliver, resync: Optional[Resync] = None) -> None:
+        """Begin receiving: every message published by any worker goes to ``deliver``."""
+
+    @abc.abstractmethod
+    async def stop(self) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def publish(self, message: str) -> None:
+        """Send ``message`` (a single line of text) to every worker."""
+
+
+class MemoryBroadcast(Broadcast):
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver, resync: Optional[Resync] = None) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, message: str) -> None:
+        if self._deliver is not None:
+            await self._deliver(message)
+
+
+class UnixSocketBroadcast(Broadcast):
+    # A worker that stops reading is dropped by the hub once this much output is pending.
+    PEER_BUFFER_LIMIT = 1024 * 1024
+
+    def __init__(self, path: str, reconnect_delay: float = 1.0) -> None:
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.reconnect_delay = reconnect_delay
+        self._deliver: Optional[Deliver] = None
+        self._resync: Optional[Resync] = None
+        self._task: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._lock_fd: Optional[int] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+
+    @property
+    def is_hub(self) -> bool:
+        return self._server is not None
+
+    async def start(self, deliver: Deliver, resync: Optional[Resync] = None) -> None:
+        self._deliver, self._resync = deliver, resync
+        self._task = asyncio.create_task(self._run())
+        # Best effort: publishing before the first connection falls back to local delivery.
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._connected.wait(), timeout=5)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            await self._server.wait_closed()
+            self._server = None
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def publish(self, message: str) -> None:
+        writer = self._writer
+        if writer is None:
+            logger.warning("Hub de difusión no disponible; el evento solo llega a este worker")
+            if self._deliver is not None:
+                await self._deliver(message)
+            return
+        writer.write(message.encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def _run(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                await self._try_become_hub()
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=self.PEER_BUFFER_LIMIT)
+            except OSError:
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            self._writer = writer
+            self._connected.set()
+            try:
+                if reconnecting and self._resync is not None:
+                    await self._resync()
+                while line := await reader.readline():
+                    await self._deliver(line.decode("utf-8").rstrip("\n"))
+            except (OSError, ValueError) as exc:
+                logger.warning("Conexión con el hub de difusión perdida: %s", exc)
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            reconnecting = True
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _try_become_hub(self) -> None:
+        if self._server is not None:
+            return
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return
+        self._lock_fd = fd
+        # Whoever held the lock before is gone; its socket file is stale.
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve_peer, path=self.path, limit=self.PEER_BUFFER_LIMIT)
+        logger.info("Este worker sirve el hub de difusión en %s", self.path)
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > self.PEER_BUFFER_LIMIT:
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+
+def create_broadcast(url: str = DASHBOARD_BROADCAST_URL) -> Broadcast:
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryBroadcast()
+    if parsed.scheme == "unix":
+        if not parsed.path:
+            raise ValueError("DASHBOARD_BROADCAST_URL unix:// necesita una ruta, p. ej. unix:///tmp/dashboard.sock")
+        return UnixSocketBroadcast(parsed.path)
+    raise ValueError(f"DASHBOARD_BROADCAST_URL no soportada: {url}")
@@ -0,0 +1,223 @@
+"""Pooled HTTP client for the dashboard → case manager calls.
+
+One ``httpx.AsyncClient`` is opened at startup and closed at shutdown, so the
+summary, time series, case actions, responsibles and catalog proxies reuse
+keep-alive connections instead of paying a TCP handshake per call, and none of
+them blocks the event loop. Synchronous endpoints (running in the threadpool)
+go through :meth:`CaseManagerClient.get_json_from_thread`.
+
+A :class:`CircuitBreaker` guards the client: after
+``CASE_MANAGER_BREAKER_FAILURES`` consecutive failures (connection errors,
+timeouts, 5xx) it opens and calls return ``None`` immediately, so callers use
+their local fallback without waiting for the timeout. After
+``CASE_MANAGER_BREAKER_RESET_SECONDS`` a single probe is let through
+(half-open) and its outcome closes or reopens the circuit.
+
+With ``CASE_MANAGER_HEDGE_MS`` > 0, :meth:`CaseManagerClient.get_or_fallback`
+also starts the local fallback once the remote call has been pending that long
+and returns whichever answers first.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Optional, Set
+
+import anyio.from_thread
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("dashboard")
+
+CASE_MANAGER_HTTP_TIMEOUT_SECONDS = float(os.getenv("CASE_MANAGER_HTTP_TIMEOUT_SECONDS", "5"))
+CASE_MANAGER_HTTP_MAX_CONNECTIONS = int(os.getenv("CASE_MANAGER_HTTP_MAX_CONNECTIONS", "20"))
+CASE_MANAGER_HTTP_MAX_KEEPALIVE = int(os.getenv("CASE_MANAGER_HTTP_MAX_KEEPALIVE", "10"))
+CASE_MANAGER_BREAKER_FAILURES = int(os.getenv("CASE_MANAGER_BREAKER_FAILURES", "5"))
+CASE_MANAGER_BREAKER_RESET_SECONDS = float(os.getenv("CASE_MANAGER_BREAKER_RESET_SECONDS", "30"))
+CASE_MANAGER_HEDGE_MS = int(os.getenv("CASE_MANAGER_HEDGE_MS", "0"))
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = CASE_MANAGER_BREAKER_FAILURES,
+        reset_timeout: float = CASE_MANAGER_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.short_circuited = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; counts the ones that are short-circuited."""
+        if self.state == self.OPEN:
+            if self._clock() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, healthy: Optional[bool]) -> None:
+        """Outcome of an allowed call; ``None`` when it was cancelled before answering."""
+        self._probe_in_flight = False
+        if healthy is None:
+            return
+        if healthy:
+            self.state = self.CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class CaseManagerClient:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = CASE_MANAGER_HTTP_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_after: float = CASE_MANAGER_HEDGE_MS / 1000,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after = hedge_after
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._background: Set[asyncio.Future] = set()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=CASE_MANAGER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=CASE_MANAGER_HTTP_MAX_KEEPALIVE,
+            ),
+            transport=self._transport,
+        )
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = self._new_client()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_json(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        auth_header: Optional[str] = None,
+    ) -> Optional[Any]:
+        """GET ``path``; ``None`` if the case manager is unreachable, answers with an error or the circuit is open."""
+        if not self.breaker.allow():
+            return None
+        headers = {"Authorization": auth_header} if auth_header else {}
+        healthy = None
+        try:
+            if self._client is None:
+                # Not started (e.g. a TestClient used without its lifespan): one-off client.
+                async with self._new_client() as client:
+                    response = await client.get(path, params=params, headers=headers)
+            else:
+                response = await self._client.get(path, params=params, headers=headers)
+            # A 4xx (expired token, unknown case) says nothing about the service's health.
+            healthy = response.status_code < 500
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as exc:
+            if healthy is None:
+                healthy = False
+            logger.warning("Falló la petición al case manager %s: %s", path, exc)
+            return None
+        finally:
+            self.breaker.record(healthy)
+
+    async def get_or_fallback(
+        self,
+        path: str,
+        local: Callable[[], Any],
+        *,
+        params: Optional[dict] = None,
+        auth_header: Optional[str] = None,
+        valid: Callable[[Any], bool] = bool,
+    ) -> Any:
+        """Remote answer if ``valid``, otherwise ``local()`` (run in the threadpool).
+
+        ``local`` may still be running when the remote answer wins a hedge, so
+        it must not share state with the request (open its own session).
+        """
+        remote = asyncio.ensure_future(self.get_json(path, params, auth_header))
+        if self.hedge_after > 0:
+            done, _ = await asyncio.wait({remote}, timeout=self.hedge_after)
+            if not done:
+                self.hedged += 1
+                fallback = asyncio.ensure_future(run_in_threadpool(local))
+                done, _ = await asyncio.wait({remote, fallback}, return_when=asyncio.FIRST_COMPLETED)
+                if remote in done and valid(remote.result()):
+                    self._keep_until_done(fallback)
+                    return remote.result()
+                self.hedge_wins += 1
+                # The remote call keeps going so the breaker still learns how it ended.
+                self._keep_until_done(remote)
+                return await fallback
+        data = await remote
+        if valid(data):
+            return data
+        return await run_in_threadpool(local)
+
+    def _keep_until_done(self, future: asyncio.Future) -> None:
+        self._background.add(future)
+        future.add_done_callback(self._background.discard)
+
+    def stats(self) -> dict:
+        return {
+            **self.breaker.stats(),
+            "hedge_after_ms": int(self.hedge_after * 1000),
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def get_json_from_thread(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        auth_header: Optional[str] = None,
+    ) -> Optional[Any]:
+        """Same as :meth:`get_json` for code running in the threadpool (sync endpoints)."""
+        return anyio.from_thread.run(self.get_json, path, params, auth_header)
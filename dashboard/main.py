@@ -2,13 +2,14 @@ import os
 import json
 import asyncio
 import contextlib
+import hashlib
 import logging
 from collections import Counter
 from datetime import datetime, date, time, timedelta
 from html import escape
 from io import BytesIO
 from pathlib import Path
-from typing import List, Optional, Callable, Set
+from typing import Any, List, Optional, Callable
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 import matplotlib
@@ -19,12 +20,13 @@ import numpy as np
 import pandas as pd
 import httpx
 from fastapi import FastAPI, Depends, Request, Form, Query, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, text
+from sqlalchemy import func, case, literal, select, text, union_all
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import LETTER, landscape as landscape_pagesize
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
@@ -35,9 +37,26 @@ from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Tabl
 from aiokafka import AIOKafkaConsumer
 from passlib.context import CryptContext
 
-from dashboard.database import get_db
+from dashboard.broadcast import create_broadcast
+from dashboard.case_manager_client import CaseManagerClient
+from dashboard.database import SessionLocal, get_db
+from dashboard.realtime import (
+    DASHBOARD_WS_COALESCE_MAX,
+    DASHBOARD_WS_COALESCE_MS,
+    ChangeCoalescer,
+    DashboardSocketManager,
+)
+from dashboard import report_queries
+from dashboard.report_cache import report_cache, report_cache_key
+from dashboard.report_jobs import DONE as REPORT_JOB_DONE, ReportJob, report_jobs
+from dashboard.report_pool import ReportQueueFull, report_pool
+from dashboard.stats_cache import stats_cache
+from common import case_stats, cdc
+from common.database import get_pool_stats
 from scripts.db_init import (
     AggAgeGroup,
+    AggDailyLocation,
+    AggDailyProfile,
     AggGender,
     AggHourly,
     Case,
@@ -58,6 +77,8 @@ app = FastAPI(title="Lost Persons Dashboard")
 templates = Jinja2Templates(directory="dashboard/templates")
 HOURS = list(range(24))
 AGE_GROUP_ORDER = ["0-12", "13-17", "18-25", "26-40", "41-60", "61+", "Unknown"]
+# Right-closed edges of every AGE_GROUP_ORDER bucket but "Unknown": [0, 12], (12, 17], ...
+AGE_GROUP_BINS = [0, 12, 17, 25, 40, 60, np.inf]
 WEEKDAY_NAMES_ES = ["Lunes", "Martes", "Miercoles", "Jueves", "Viernes", "Sabado", "Domingo"]
 BRAND_NAME = "Lost Persons Monitor"
 BRAND_OWNER = "ICM Software Development"
@@ -110,51 +131,50 @@ require_report_permission = require_permissions(["report"])
 require_admin_permission = require_permissions(["manage_users"])
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-class DashboardSocketManager:
-    def __init__(self) -> None:
-        self.connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        async with self._lock:
-            self.connections.add(websocket)
-
-    async def disconnect(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self.connections.discard(websocket)
-
-    async def broadcast(self, payload: str) -> None:
-        async with self._lock:
-            websockets = list(self.connections)
-        for connection in websockets:
-            try:
-                await connection.send_text(payload)
-            except WebSocketDisconnect:
-                await self.disconnect(connection)
-            except Exception:
-                await self.disconnect(connection)
-
 ws_manager = DashboardSocketManager()
+broadcast = create_broadcast()
+# Every event this worker sends to its dashboards carries the next ``seq``;
+# clients that see a gap (missed events, a restart) fall back to a full refresh.
+_event_seq = 0
+_publish_lock = asyncio.Lock()
 _consumer_task: Optional[asyncio.Task] = None
 logger = logging.getLogger("dashboard")
 
 
 async def _kafka_listener() -> None:
     retry_delay = 5
+    window_seconds = DASHBOARD_WS_COALESCE_MS / 1000
+    loop = asyncio.get_running_loop()
     while True:
         consumer = AIOKafkaConsumer(
             KAFKA_TOPIC,
             bootstrap_servers=KAFKA_BOOTSTRAP,
             group_id="dashboard-realtime",
-            enable_auto_commit=True,
+            enable_auto_commit=False,
             auto_offset_reset="latest",
         )
         try:
             await consumer.start()
             logger.info("Kafka listener conectado al tópico %s", KAFKA_TOPIC)
-            async for _msg in consumer:
-                await ws_manager.broadcast(json.dumps({"event": "refresh"}))
+            coalescer, deadline = ChangeCoalescer(), None
+            while True:
+                timeout = window_seconds if deadline is None else max(0.0, deadline - loop.time())
+                batches = await consumer.getmany(
+                    timeout_ms=int(timeout * 1000),
+                    max_records=DASHBOARD_WS_COALESCE_MAX - coalescer.messages,
+                )
+                for records in batches.values():
+                    for msg in records:
+                        coalescer.add(msg.value)
+                if not coalescer.messages:
+                    continue
+                if deadline is None:
+                    deadline = loop.time() + window_seconds
+                if loop.time() >= deadline or coalescer.messages >= DASHBOARD_WS_COALESCE_MAX:
+                    await _flush_changes(coalescer)
+                    # Committed only after the broadcast: a crash replays the window.
+                    await consumer.commit()
+                    coalescer, deadline = ChangeCoalescer(), None
         except Exception as exc:
             logger.warning("Kafka listener error: %s. Reintentando en %s s...", exc, retry_delay)
             await asyncio.sleep(retry_delay)
@@ -163,10 +183,43 @@ async def _kafka_listener() -> None:
                 await consumer.stop()
 
 
+async def publish_event(event: dict) -> None:
+    """Send ``event`` to the dashboards connected to every worker."""
+    await broadcast.publish(json.dumps(event))
+
+
+async def _deliver_event(message: str) -> None:
+    """Broadcast callback: runs in every worker for every published event."""
+    global _event_seq
+    stats_cache.invalidate()
+    # Held across the fan-out so every socket receives events in seq order.
+    async with _publish_lock:
+        _event_seq += 1
+        await ws_manager.broadcast(json.dumps({**json.loads(message), "seq": _event_seq}))
+
+
+async def _resync_dashboards() -> None:
+    # This worker may have missed events while it was cut off from the others.
+    await _deliver_event(json.dumps({"event": "refresh"}))
+
+
+async def _flush_changes(coalescer: ChangeCoalescer) -> None:
+    event = coalescer.event()
+    if event is None:
+        return
+    await publish_event(event)
+
+
 @app.on_event("startup")
 async def start_background_tasks() -> None:
     global _consumer_task
+    await broadcast.start(_deliver_event, _resync_dashboards)
+    await case_manager_client.start()
+    report_pool.start(preload=__name__)
+    await report_jobs.start()
     loop = asyncio.get_event_loop()
+    # With several workers each one joins the consumer group and takes a share
+    # of the partitions; the broadcast backbone delivers every event to all.
     _consumer_task = loop.create_task(_kafka_listener())
 
 
@@ -177,14 +230,44 @@ async def stop_background_tasks() -> None:
         _consumer_task.cancel()
         with contextlib.suppress(asyncio.CancelledError):
             await _consumer_task
+    await broadcast.stop()
+    await case_manager_client.close()
+    await report_jobs.close()
+    report_pool.close()
 
 
 @app.post("/internal/refresh")
 async def internal_refresh() -> dict:
-    await ws_manager.broadcast(json.dumps({"event": "refresh"}))
+    # Called by the case manager: only the case panels need to be reloaded.
+    await publish_event({"event": "refresh", "scope": "cases"})
     return {"status": "ok"}
 
 
+@app.get("/internal/ws-stats")
+def internal_ws_stats() -> dict:
+    return ws_manager.stats()
+
+
+@app.get("/internal/case-manager")
+def internal_case_manager() -> dict:
+    return case_manager_client.stats()
+
+
+@app.get("/internal/stats-cache")
+def internal_stats_cache() -> dict:
+    return stats_cache.stats()
+
+
+@app.get("/internal/db-pool")
+def internal_db_pool(_: TokenPayload = Depends(require_admin_permission)) -> dict:
+    return get_pool_stats()
+
+
+@app.get("/internal/report-pool")
+def internal_report_pool() -> dict:
+    return {**report_pool.stats(), "jobs": report_jobs.stats(), "cache": report_cache.stats()}
+
+
 def _load_sensitive_terms() -> None:
     global SENSITIVE_TERMS, SENSITIVE_INDEX
     try:
@@ -265,23 +348,16 @@ def _load_action_types() -> None:
 _load_action_types()
 
 
+case_manager_client = CaseManagerClient(CASE_MANAGER_INTERNAL_URL)
+
+
 def _case_manager_get(
     path: str,
     params: Optional[dict] = None,
     auth_header: Optional[str] = None,
 ) -> Optional[dict]:
-    url = f"{CASE_MANAGER_INTERNAL_URL}{path}"
-    try:
-        with httpx.Client(timeout=5.0) as client:
-            headers = {}
-            if auth_header:
-                headers["Authorization"] = auth_header
-            response = client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            return response.json()
-    except httpx.HTTPError as exc:
-        print(f"Case manager request failed: {exc}")
-        return None
+    """Blocking variant for sync endpoints; async code awaits ``case_manager_client.get_json``."""
+    return case_manager_client.get_json_from_thread(path, params=params, auth_header=auth_header)
 
 
 def _proxy_auth_header(request: Request) -> Optional[str]:
@@ -467,31 +543,36 @@ def _format_generation_timestamp() -> str:
     return f"{local_now.strftime('%Y-%m-%d %H:%M')} {tz_name}"
 
 
-def _assign_age_group(age: Optional[int]) -> str:
-    if age is None or age < 0:
-        return "Unknown"
-    if age <= 12:
-        return "0-12"
-    if age <= 17:
-        return "13-17"
-    if age <= 25:
-        return "18-25"
-    if age <= 40:
-        return "26-40"
-    if age <= 60:
-        return "41-60"
-    return "61+"
-
-
-def _split_location(location: Optional[str]) -> tuple[str, str]:
-    if not location:
-        return "Unknown", "Unknown"
-    parts = [part.strip() for part in location.split(",") if part.strip()]
-    if not parts:
-        return "Unknown", "Unknown"
-    if len(parts) == 1:
-        return parts[0], "Unknown"
-    return parts[0], parts[-1]
+def _age_groups(ages: pd.Series) -> pd.Series:
+    """Bucket ages into ``AGE_GROUP_ORDER``; missing or negative ages are "Unknown"."""
+    groups = pd.cut(
+        pd.to_numeric(ages, errors="coerce"),
+        bins=AGE_GROUP_BINS,
+        labels=AGE_GROUP_ORDER[:-1],
+        include_lowest=True,
+    )
+    return groups.cat.add_categories(["Unknown"]).fillna("Unknown")
+
+
+def _split_locations(labels: pd.Series) -> pd.DataFrame:
+    """City (first comma-separated part) and region (last part, when there are several).
+
+    The string operations run once per distinct label and are mapped back by code.
+    """
+    codes, uniques = pd.factorize(labels.fillna("").astype(str))
+    uniques = pd.Series(uniques, dtype=object)
+    city = uniques.str.extract(r"^[\s,]*([^,]*[^,\s])", expand=False)
+    region = uniques.str.extract(r"([^,]*[^,\s])[\s,]*$", expand=False).str.lstrip()
+    several_parts = uniques.str.count(r"[^,]*[^,\s][^,]*") > 1
+    split = pd.DataFrame({"city": city.fillna("Unknown"), "region": region.where(several_parts, "Unknown")})
+    return split.take(codes).set_index(labels.index)
+
+
+def _max_severity_ranks(matches: pd.Series) -> pd.Series:
+    """Highest ``SEVERITY_RANK`` among each row's matches (1 for unknown severities)."""
+    severities = matches.explode().str.get("severity").str.lower()
+    ranks = severities.map(SEVERITY_RANK).fillna(1).astype(int)
+    return ranks.groupby(level=0, sort=False).max().reindex(matches.index, fill_value=1)
 
 
 def _detect_sensitive_terms(*text_parts: Optional[str]) -> List[dict]:
@@ -863,14 +944,14 @@ def _build_operational_alerts_pdf(
 
 
 def _build_demographic_distribution_pdf(
-    records: List[dict],
+    counts: List[dict],
     start_date: date,
     end_date: date,
     start_hour: int,
     end_hour: int,
     orientation: str,
 ) -> BytesIO:
-    """Build the PDF bytes for the demographic distribution report."""
+    """Build the PDF bytes for the demographic distribution report from (age, gender) counts."""
     buffer = BytesIO()
     doc, add_page_number = _create_pdf_doc(buffer, orientation, "Distribucion demografica")
     styles = getSampleStyleSheet()
@@ -906,7 +987,7 @@ def _build_demographic_distribution_pdf(
         Spacer(1, 12),
     ]
 
-    if not records:
+    if not counts:
         story.append(
             Paragraph(
                 "No se encontraron reportes para los filtros aplicados.",
@@ -917,15 +998,15 @@ def _build_demographic_distribution_pdf(
         buffer.seek(0)
         return buffer
 
-    df = pd.DataFrame(records)
-    df["age_group"] = df["age"].apply(_assign_age_group)
+    df = pd.DataFrame(counts)
+    df["age_group"] = _age_groups(df["age"])
     df["gender_label"] = df["gender"].fillna("Unknown")
 
-    total_reports = len(df)
+    total_reports = int(df["count"].sum())
     story.append(Paragraph(f"Total de registros analizados: {total_reports}", styles["Heading3"]))
 
-    age_counts = df["age_group"].value_counts().reindex(AGE_GROUP_ORDER, fill_value=0)
-    gender_counts = df["gender_label"].value_counts().sort_values(ascending=False)
+    age_counts = df.groupby("age_group")["count"].sum().reindex(AGE_GROUP_ORDER, fill_value=0)
+    gender_counts = df.groupby("gender_label")["count"].sum().sort_values(ascending=False)
 
     if age_counts.sum() > 0:
         top_age_group = age_counts.idxmax()
@@ -1001,8 +1082,8 @@ def _build_demographic_distribution_pdf(
         df.pivot_table(
             index="age_group",
             columns="gender_label",
-            values="person_id",
-            aggfunc="count",
+            values="count",
+            aggfunc="sum",
             fill_value=0,
         )
         .reindex(index=AGE_GROUP_ORDER, fill_value=0)
@@ -1073,14 +1154,14 @@ def _build_demographic_distribution_pdf(
 
 
 def _build_geographic_distribution_pdf(
-    records: List[dict],
+    locations: List[dict],
     start_date: date,
     end_date: date,
     start_hour: int,
     end_hour: int,
     orientation: str,
 ) -> BytesIO:
-    """Build the PDF bytes for the geographic distribution report."""
+    """Build the PDF bytes for the geographic distribution report from per-location counts."""
     buffer = BytesIO()
     doc, add_page_number = _create_pdf_doc(buffer, orientation, "Mapa de ubicaciones")
     styles = getSampleStyleSheet()
@@ -1116,7 +1197,7 @@ def _build_geographic_distribution_pdf(
         Spacer(1, 12),
     ]
 
-    if not records:
+    if not locations:
         story.append(
             Paragraph(
                 "No se encontraron reportes para los filtros aplicados.",
@@ -1127,15 +1208,19 @@ def _build_geographic_distribution_pdf(
         buffer.seek(0)
         return buffer
 
-    df = pd.DataFrame(records)
-    df["lost_location"] = df["lost_location"].fillna("").apply(lambda loc: loc.strip())
-    df["location_label"] = df["lost_location"].apply(lambda loc: loc if loc else "Unknown")
-    split_series = df["location_label"].apply(_split_location)
-    df["city"] = split_series.apply(lambda item: item[0])
-    df["region"] = split_series.apply(lambda item: item[1])
+    df = pd.DataFrame(locations)
+    df["location_label"] = df["location"].fillna("").str.strip().replace("", "Unknown")
+    df[["city", "region"]] = _split_locations(df["location_label"])
 
-    total_reports = len(df)
-    unique_locations = df["location_label"].nunique()
+    location_summary = (
+        df.groupby(["location_label", "city", "region"])["count"]
+        .sum()
+        .reset_index(name="total")
+        .sort_values(["total", "location_label"], ascending=[False, True])
+    )
+
+    total_reports = int(df["count"].sum())
+    unique_locations = len(location_summary)
     story.append(Paragraph(f"Total de reportes analizados: {total_reports}", styles["Heading3"]))
     story.append(
         Paragraph(
@@ -1144,7 +1229,7 @@ def _build_geographic_distribution_pdf(
         )
     )
 
-    top_location_series = df["location_label"].value_counts()
+    top_location_series = location_summary.set_index("location_label")["total"]
     if not top_location_series.empty:
         top_location = top_location_series.index[0]
         story.append(
@@ -1163,7 +1248,7 @@ def _build_geographic_distribution_pdf(
     fig_width = 5.6 if orientation == "portrait" else 7.2
     fig_locations, ax_locations = plt.subplots(figsize=(fig_width, 3.4))
     y_positions = np.arange(len(top_locations))
-    cmap = plt.cm.get_cmap("Blues")
+    cmap = plt.get_cmap("Blues")
     location_colors = cmap(np.linspace(0.45, 0.85, len(top_locations)))
     bars = ax_locations.barh(
         y_positions,
@@ -1187,12 +1272,12 @@ def _build_geographic_distribution_pdf(
 
     story.append(Spacer(1, 12))
 
-    region_counts = df["region"].value_counts()
+    region_counts = df.groupby("region")["count"].sum().sort_values(ascending=False)
     region_counts = region_counts[region_counts > 0]
     if not region_counts.empty:
         fig_region_width = 4.8 if orientation == "portrait" else 6.2
         fig_regions, ax_regions = plt.subplots(figsize=(fig_region_width, 2.8))
-        region_colors = plt.cm.get_cmap("Oranges")(np.linspace(0.45, 0.85, len(region_counts)))
+        region_colors = plt.get_cmap("Oranges")(np.linspace(0.45, 0.85, len(region_counts)))
         bars_regions = ax_regions.bar(
             region_counts.index,
             region_counts.values,
@@ -1213,13 +1298,6 @@ def _build_geographic_distribution_pdf(
         story.append(Image(chart_regions_buffer, width=chart_regions_width, height=2.6 * inch))
         story.append(Spacer(1, 12))
 
-    location_summary = (
-        df.groupby(["location_label", "city", "region"])
-        .size()
-        .reset_index(name="total")
-        .sort_values("total", ascending=False)
-    )
-
     summary_limit = 40 if orientation == "portrait" else 60
     summary_subset = location_summary.head(summary_limit)
 
@@ -1284,14 +1362,14 @@ def _build_geographic_distribution_pdf(
 
 
 def _build_hourly_analysis_pdf(
-    records: List[dict],
+    counts: List[dict],
     start_date: date,
     end_date: date,
     start_hour: int,
     end_hour: int,
     orientation: str,
 ) -> BytesIO:
-    """Build the PDF bytes for the hourly analysis report."""
+    """Build the PDF bytes for the hourly analysis report from weekday × hour counts."""
     buffer = BytesIO()
     doc, add_page_number = _create_pdf_doc(buffer, orientation, "Analisis horario")
     styles = getSampleStyleSheet()
@@ -1327,7 +1405,7 @@ def _build_hourly_analysis_pdf(
         Spacer(1, 12),
     ]
 
-    if not records:
+    if not counts:
         story.append(
             Paragraph(
                 "No se encontraron reportes para los filtros aplicados.",
@@ -1338,16 +1416,12 @@ def _build_hourly_analysis_pdf(
         buffer.seek(0)
         return buffer
 
-    df = pd.DataFrame(records)
-    df["lost_timestamp"] = pd.to_datetime(df["lost_timestamp"])
-    df["hour"] = df["lost_timestamp"].dt.hour
-    df["weekday_index"] = df["lost_timestamp"].dt.weekday
-    df["weekday_name"] = df["weekday_index"].apply(lambda idx: WEEKDAY_NAMES_ES[idx] if 0 <= idx < len(WEEKDAY_NAMES_ES) else "Desconocido")
+    df = pd.DataFrame(counts)
 
-    total_reports = len(df)
+    total_reports = int(df["count"].sum())
     story.append(Paragraph(f"Total de reportes analizados: {total_reports}", styles["Heading3"]))
 
-    hour_counts = df.groupby("hour").size().reindex(range(24), fill_value=0)
+    hour_counts = df.groupby("hour")["count"].sum().reindex(range(24), fill_value=0)
     busiest_hour = hour_counts.idxmax()
     busiest_count = hour_counts.max()
     story.append(
@@ -1388,9 +1462,7 @@ def _build_hourly_analysis_pdf(
     story.append(Spacer(1, 12))
 
     heatmap_data = (
-        df.groupby(["weekday_index", "hour"])
-        .size()
-        .unstack(fill_value=0)
+        df.pivot_table(index="weekday", columns="hour", values="count", aggfunc="sum", fill_value=0)
         .reindex(index=range(7), columns=range(24), fill_value=0)
     )
     if heatmap_data.values.sum() > 0:
@@ -1475,14 +1547,14 @@ def _build_hourly_analysis_pdf(
 
 
 def _build_executive_summary_pdf(
-    records: List[dict],
+    summary: dict,
     start_date: date,
     end_date: date,
     start_hour: int,
     end_hour: int,
     orientation: str,
 ) -> BytesIO:
-    """Build the PDF bytes for the executive summary report."""
+    """Build the PDF bytes for the executive summary report (see ``report_queries.executive_summary``)."""
     buffer = BytesIO()
     doc, add_page_number = _create_pdf_doc(buffer, orientation, "Resumen ejecutivo")
     styles = getSampleStyleSheet()
@@ -1523,7 +1595,7 @@ def _build_executive_summary_pdf(
         Spacer(1, 12),
     ]
 
-    if not records:
+    if not summary["total"]:
         story.append(
             Paragraph(
                 "No se encontraron reportes para los filtros aplicados.",
@@ -1534,18 +1606,15 @@ def _build_executive_summary_pdf(
         buffer.seek(0)
         return buffer
 
-    df = pd.DataFrame(records)
-    df["lost_timestamp"] = pd.to_datetime(df["lost_timestamp"])
+    df = pd.DataFrame(summary["age_gender"])
     df["gender_label"] = df["gender"].fillna("Unknown")
-    df["age_group"] = df["age"].apply(_assign_age_group)
-    df["location_label"] = df["lost_location"].fillna("Unknown")
+    df["age_group"] = _age_groups(df["age"])
 
-    total_reports = len(df)
-    unique_locations = df["location_label"].nunique()
-    active_days = df["lost_timestamp"].dt.date.nunique()
-    latest_report = df["lost_timestamp"].max()
-    avg_age = df["age"].dropna()
-    avg_age_value = avg_age.mean() if not avg_age.empty else None
+    total_reports = summary["total"]
+    unique_locations = summary["unique_locations"]
+    active_days = summary["active_days"]
+    latest_report = summary["latest_report"]
+    avg_age_value = summary["average_age"]
 
     summary_lines = [
         f"Total de reportes en el periodo: <b>{total_reports}</b>",
@@ -1563,8 +1632,8 @@ def _build_executive_summary_pdf(
         story.append(Paragraph(f"• {line}", summary_line_style))
     story.append(Spacer(1, 14))
 
-    gender_counts = df["gender_label"].value_counts()
-    age_group_counts = df["age_group"].value_counts().reindex(AGE_GROUP_ORDER, fill_value=0)
+    gender_counts = df.groupby("gender_label")["count"].sum().sort_values(ascending=False)
+    age_group_counts = df.groupby("age_group")["count"].sum().reindex(AGE_GROUP_ORDER, fill_value=0)
 
     fig_gender_width = 4.5 if orientation == "portrait" else 5.5
     fig_gender, ax_gender = plt.subplots(figsize=(fig_gender_width, 3.0))
@@ -1631,20 +1700,14 @@ def _build_executive_summary_pdf(
         story.append(charts_table)
     story.append(Spacer(1, 12))
 
-    top_locations = (
-        df["location_label"]
-        .value_counts()
-        .head(5)
-        .reset_index(name="total")
-        .rename(columns={"index": "location_label"})
-    )
+    top_locations = [(item["location"] or "Unknown", item["count"]) for item in summary["top_locations"]]
     location_rows = [
         [
             Paragraph("Ubicacion", table_text_style),
             Paragraph("Reportes", table_text_center),
         ]
     ]
-    for location_value, total_value in top_locations.itertuples(index=False, name=None):
+    for location_value, total_value in top_locations:
         location_rows.append(
             [
                 Paragraph(escape(str(location_value)), table_text_style),
@@ -1679,7 +1742,8 @@ def _build_executive_summary_pdf(
     story.append(location_table)
     story.append(Spacer(1, 12))
 
-    recent_cases = df.sort_values("lost_timestamp", ascending=False).head(6)
+    recent_cases = pd.DataFrame(summary["recent_cases"])
+    recent_cases["location_label"] = recent_cases["lost_location"].fillna("Unknown")
     cases_rows = [
         [
             Paragraph("Fecha reporte", table_text_center),
@@ -1808,24 +1872,13 @@ def _build_sensitive_cases_pdf(
     df = pd.DataFrame(flagged_records)
     df["lost_timestamp"] = pd.to_datetime(df["lost_timestamp"])
     df["location_label"] = df["lost_location"].fillna("Unknown")
-    df["match_terms"] = df["matches"].apply(lambda m: sorted({match["term"] for match in m}))
-    df["match_categories"] = df["matches"].apply(lambda m: sorted({match["category"] for match in m}))
-    df["max_severity"] = df["matches"].apply(
-        lambda m: max((SEVERITY_RANK.get(match["severity"].lower(), 1) for match in m), default=1)
-    )
-    df["max_severity_label"] = df["matches"].apply(
-        lambda m: max((match["severity"] for match in m), key=lambda s: SEVERITY_RANK.get(s.lower(), 1), default="Media")
-    )
+    df["max_severity"] = _max_severity_ranks(df["matches"])
 
     total_sensitives = len(df)
-    category_counter: Counter = Counter()
-    term_counter: Counter = Counter()
-    severity_counter: Counter = Counter()
-    for matches in df["matches"]:
-        for match in matches:
-            category_counter[match["category"]] += 1
-            term_counter[match["term"]] += 1
-            severity_counter[match["severity"]] += 1
+    flat_matches = pd.DataFrame(df["matches"].explode().tolist())
+    category_counter = Counter(flat_matches["category"])
+    term_counter = Counter(flat_matches["term"])
+    severity_counter = Counter(flat_matches["severity"])
 
     summary_paragraphs = [
         f"Casos sensibles detectados en el periodo: <b>{total_sensitives}</b>",
@@ -1927,7 +1980,7 @@ def _build_sensitive_cases_pdf(
         full_name = f"{getattr(row, 'first_name', '')} {getattr(row, 'last_name', '')}".strip()
         severity_rank = getattr(row, "max_severity", 1)
         severity_label = severity_labels.get(severity_rank, "Media")
-        matched_terms = getattr(row, "match_terms", [])
+        matched_terms = sorted({match["term"] for match in row.matches})
         cases_rows.append(
             [
                 Paragraph(row.lost_timestamp.strftime("%Y-%m-%d %H:%M"), table_text_center),
@@ -2130,11 +2183,11 @@ async def manage_cases(request: Request):
 
 
 @app.get("/case-responsibles/catalog")
-def case_responsible_catalog(
+async def case_responsible_catalog(
     request: Request,
     _: TokenPayload = Depends(require_case_permission),
 ):
-    data = _case_manager_get(
+    data = await case_manager_client.get_json(
         "/responsibles/catalog",
         auth_header=_proxy_auth_header(request),
     )
@@ -2567,8 +2620,10 @@ def case_pdf_report(
 
 @app.websocket("/ws/dashboard")
 async def dashboard_ws(websocket: WebSocket):
-    await ws_manager.connect(websocket)
     try:
+        # Under the publish lock so "hello" carries the seq right before the first event the socket gets.
+        async with _publish_lock:
+            await ws_manager.connect(websocket, greeting=json.dumps({"event": "hello", "seq": _event_seq}))
         while True:
             await websocket.receive_text()
     except (WebSocketDisconnect, RuntimeError):
@@ -2577,6 +2632,130 @@ async def dashboard_ws(websocket: WebSocket):
         await ws_manager.disconnect(websocket)
 
 
+def _wants_report_job(request: Request) -> bool:
+    prefer = request.headers.get("Prefer", "")
+    return any(token.strip().lower() == "respond-async" for token in prefer.split(","))
+
+
+def _load_report_data(load_data: Callable[[Session], Any]) -> Any:
+    # Own session: a background job outlives the request that submitted it.
+    with SessionLocal() as db:
+        return load_data(db)
+
+
+def _report_data_version(start_date: date, end_date: date) -> list:
+    """Changes whenever a ``persons_lost`` row of the window is inserted, updated or deleted."""
+    window = report_queries.ReportWindow(start_date, end_date, 0, 23)
+    with SessionLocal() as db:
+        count, last_id, last_update = (
+            db.query(
+                func.count(PersonLost.person_id),
+                func.max(PersonLost.person_id),
+                func.max(PersonLost.updated_at),
+            )
+            .filter(PersonLost.lost_timestamp >= window.start_datetime)
+            .filter(PersonLost.lost_timestamp <= window.end_datetime)
+            .one()
+        )
+    return [count, last_id, last_update]
+
+
+async def _report_cache_key(report_type: str, options: dict) -> str:
+    start_date, end_date = options["start_date"], options["end_date"]
+    # Read on every request: a memoised token could still name rows changed since
+    # then and serve the stale PDF. An index-only range scan of the window
+    # (ix_persons_lost_lost_timestamp_updated_at), the table rows are not read.
+    data_version = await run_in_threadpool(_report_data_version, start_date, end_date)
+    renderer = [_current_year(), SENSITIVE_TERMS if report_type == "sensitive-cases" else None]
+    return report_cache_key(report_type, options, data_version, renderer)
+
+
+def _report_job_payload(job: ReportJob) -> dict:
+    payload = {
+        "job_id": job.id,
+        "report_type": job.report_type,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "filename": job.filename,
+        "created_at": datetime.utcfromtimestamp(job.created_at).isoformat() + "Z",
+        "expires_at": datetime.utcfromtimestamp(job.created_at + report_jobs.ttl).isoformat() + "Z",
+        "status_url": f"/reports/jobs/{job.id}",
+        "download_url": None,
+        "error": job.error,
+    }
+    if job.status == REPORT_JOB_DONE:
+        payload["download_url"] = f"/reports/jobs/{job.id}/download"
+        payload["size"] = job.size
+    return payload
+
+
+async def _report_response(
+    request: Request,
+    current_user: TokenPayload,
+    report_type: str,
+    filename: str,
+    load_data: Callable[[Session], Any],
+    builder: Callable,
+    **options,
+):
+    """Build a report now (PDF response) or, with ``Prefer: respond-async``, as a background job (202)."""
+
+    async def build(progress) -> bytes:
+        progress("Consultando datos", 0.1)
+        # Taken before the rows are read: a change in between only costs a needless re-render.
+        cache_key = await _report_cache_key(report_type, options)
+        cached = await run_in_threadpool(report_cache.get, cache_key)
+        if cached is not None:
+            return cached
+        data = await run_in_threadpool(_load_report_data, load_data)
+        progress("Generando PDF", 0.4)
+        # The builders are CPU-bound (pandas, matplotlib, reportlab): keep them off the event loop.
+        pdf_bytes = await report_pool.render(builder, data, **options)
+        await run_in_threadpool(report_cache.put, cache_key, pdf_bytes)
+        return pdf_bytes
+
+    try:
+        if _wants_report_job(request):
+            job = report_jobs.submit(report_type, current_user.username, filename, build)
+            return JSONResponse(
+                _report_job_payload(job),
+                status_code=202,
+                headers={"Location": f"/reports/jobs/{job.id}", "Preference-Applied": "respond-async"},
+            )
+        pdf_bytes = await build(lambda stage, fraction: None)
+    except ReportQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Hay demasiados reportes en cola; inténtalo de nuevo en unos segundos.",
+            headers={"Retry-After": "5"},
+        )
+    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
+    return StreamingResponse(BytesIO(pdf_bytes), media_type="application/pdf", headers=headers)
+
+
+def _owned_report_job(job_id: str, current_user: TokenPayload) -> ReportJob:
+    job = report_jobs.get(job_id)
+    # Another user's job is reported as missing rather than forbidden.
+    if job is None or job.owner != current_user.username:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado o vencido")
+    return job
+
+
+@app.get("/reports/jobs/{job_id}")
+async def read_report_job(job_id: str, current_user: TokenPayload = Depends(require_pdf_permission)) -> dict:
+    return _report_job_payload(_owned_report_job(job_id, current_user))
+
+
+@app.get("/reports/jobs/{job_id}/download")
+async def download_report_job(job_id: str, current_user: TokenPayload = Depends(require_pdf_permission)):
+    job = _owned_report_job(job_id, current_user)
+    path = report_jobs.result_path(job)
+    if path is None:
+        raise HTTPException(status_code=409, detail=f"El reporte todavía no está listo ({job.status})")
+    return FileResponse(path, media_type="application/pdf", filename=job.filename)
+
+
 @app.get("/reports/operational-alerts", response_class=HTMLResponse)
 async def read_operational_alerts_form(request: Request):
     """Render the filters for the operational alerts report."""
@@ -2602,8 +2781,7 @@ async def generate_operational_alerts_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("portrait"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for operational alerts within the selected window."""
     orientation = (orientation or "portrait").lower()
@@ -2648,44 +2826,22 @@ async def generate_operational_alerts_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    records = [
-        {
-            "person_id": person.person_id,
-            "first_name": person.first_name,
-            "last_name": person.last_name,
-            "gender": person.gender,
-            "age": person.age,
-            "lost_location": person.lost_location,
-            "lost_timestamp": person.lost_timestamp,
-            "details": person.details,
-        }
-        for person in (
-            db.query(PersonLost)
-            .filter(PersonLost.status == "active")
-            .filter(PersonLost.lost_timestamp >= start_datetime)
-            .filter(PersonLost.lost_timestamp <= end_datetime)
-            .filter(hour_expr >= start_hour)
-            .filter(hour_expr <= end_hour)
-            .order_by(PersonLost.lost_timestamp.desc())
-            .all()
-        )
-    ]
-
-    pdf_buffer = _build_operational_alerts_pdf(
-        records,
+    filename = f"reporte_alertas_operativas_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "operational-alerts",
+        filename,
+        lambda db: report_queries.person_rows(db, window),
+        _build_operational_alerts_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_alertas_operativas_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/reports/demographic-distribution", response_class=HTMLResponse)
@@ -2713,8 +2869,7 @@ async def generate_demographic_distribution_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("portrait"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for demographic distribution in the selected window."""
     orientation = (orientation or "portrait").lower()
@@ -2759,44 +2914,22 @@ async def generate_demographic_distribution_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
-
-    query = (
-        db.query(
-            PersonLost.person_id,
-            PersonLost.age,
-            PersonLost.gender,
-            PersonLost.lost_timestamp,
-        )
-        .filter(PersonLost.status == "active")
-        .filter(PersonLost.lost_timestamp >= start_datetime)
-        .filter(PersonLost.lost_timestamp <= end_datetime)
-        .filter(hour_expr >= start_hour)
-        .filter(hour_expr <= end_hour)
-    )
-    records = [
-        {
-            "person_id": row.person_id,
-            "age": row.age,
-            "gender": row.gender,
-            "lost_timestamp": row.lost_timestamp,
-        }
-        for row in query.all()
-    ]
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    pdf_buffer = _build_demographic_distribution_pdf(
-        records,
+    filename = f"reporte_distribucion_demografica_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "demographic-distribution",
+        filename,
+        lambda db: report_queries.age_gender_counts(db, window),
+        _build_demographic_distribution_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_distribucion_demografica_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/reports/geographic-distribution", response_class=HTMLResponse)
@@ -2824,8 +2957,7 @@ async def generate_geographic_distribution_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("landscape"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for geographic distribution in the selected window."""
     orientation = (orientation or "landscape").lower()
@@ -2870,42 +3002,22 @@ async def generate_geographic_distribution_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    records = [
-        {
-            "person_id": row.person_id,
-            "lost_location": row.lost_location,
-            "lost_timestamp": row.lost_timestamp,
-        }
-        for row in (
-            db.query(
-                PersonLost.person_id,
-                PersonLost.lost_location,
-                PersonLost.lost_timestamp,
-            )
-            .filter(PersonLost.status == "active")
-            .filter(PersonLost.lost_timestamp >= start_datetime)
-            .filter(PersonLost.lost_timestamp <= end_datetime)
-            .filter(hour_expr >= start_hour)
-            .filter(hour_expr <= end_hour)
-            .all()
-        )
-    ]
-
-    pdf_buffer = _build_geographic_distribution_pdf(
-        records,
+    filename = f"reporte_mapa_ubicaciones_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "geographic-distribution",
+        filename,
+        lambda db: report_queries.location_counts(db, window),
+        _build_geographic_distribution_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_mapa_ubicaciones_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/reports/hourly-analysis", response_class=HTMLResponse)
@@ -2933,8 +3045,7 @@ async def generate_hourly_analysis_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("landscape"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for hourly analysis in the selected window."""
     orientation = (orientation or "landscape").lower()
@@ -2979,40 +3090,22 @@ async def generate_hourly_analysis_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
-
-    records = [
-        {
-            "person_id": row.person_id,
-            "lost_timestamp": row.lost_timestamp,
-        }
-        for row in (
-            db.query(
-                PersonLost.person_id,
-                PersonLost.lost_timestamp,
-            )
-            .filter(PersonLost.status == "active")
-            .filter(PersonLost.lost_timestamp >= start_datetime)
-            .filter(PersonLost.lost_timestamp <= end_datetime)
-            .filter(hour_expr >= start_hour)
-            .filter(hour_expr <= end_hour)
-            .all()
-        )
-    ]
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    pdf_buffer = _build_hourly_analysis_pdf(
-        records,
+    filename = f"reporte_analisis_horario_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "hourly-analysis",
+        filename,
+        lambda db: report_queries.weekday_hour_counts(db, window),
+        _build_hourly_analysis_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_analisis_horario_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/reports/executive-summary", response_class=HTMLResponse)
@@ -3040,8 +3133,7 @@ async def generate_executive_summary_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("landscape"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for the executive summary in the selected window."""
     orientation = (orientation or "landscape").lower()
@@ -3086,52 +3178,22 @@ async def generate_executive_summary_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    records = [
-        {
-            "person_id": row.person_id,
-            "first_name": row.first_name,
-            "last_name": row.last_name,
-            "gender": row.gender,
-            "age": row.age,
-            "lost_location": row.lost_location,
-            "lost_timestamp": row.lost_timestamp,
-            "details": row.details,
-        }
-        for row in (
-            db.query(
-                PersonLost.person_id,
-                PersonLost.first_name,
-                PersonLost.last_name,
-                PersonLost.gender,
-                PersonLost.age,
-                PersonLost.lost_location,
-                PersonLost.lost_timestamp,
-                PersonLost.details,
-            )
-            .filter(PersonLost.status == "active")
-            .filter(PersonLost.lost_timestamp >= start_datetime)
-            .filter(PersonLost.lost_timestamp <= end_datetime)
-            .filter(hour_expr >= start_hour)
-            .filter(hour_expr <= end_hour)
-            .all()
-        )
-    ]
-
-    pdf_buffer = _build_executive_summary_pdf(
-        records,
+    filename = f"reporte_resumen_ejecutivo_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "executive-summary",
+        filename,
+        lambda db: report_queries.executive_summary(db, window),
+        _build_executive_summary_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_resumen_ejecutivo_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/reports/sensitive-cases", response_class=HTMLResponse)
@@ -3159,8 +3221,7 @@ async def generate_sensitive_cases_report(
     start_hour: int = Form(...),
     end_hour: int = Form(...),
     orientation: str = Form("landscape"),
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_pdf_permission),
+    current_user: TokenPayload = Depends(require_pdf_permission),
 ):
     """Generate the PDF for sensitive cases within the selected window."""
     orientation = (orientation or "landscape").lower()
@@ -3205,52 +3266,22 @@ async def generate_sensitive_cases_report(
             error_message="Las horas deben estar entre 00 y 23.",
         )
 
-    start_datetime = datetime.combine(start_date, time(hour=0, minute=0, second=0))
-    end_datetime = datetime.combine(end_date, time(hour=23, minute=59, second=59))
-    hour_expr = func.hour(PersonLost.lost_timestamp)
+    window = report_queries.ReportWindow(start_date, end_date, start_hour, end_hour)
 
-    records = [
-        {
-            "person_id": row.person_id,
-            "first_name": row.first_name,
-            "last_name": row.last_name,
-            "gender": row.gender,
-            "age": row.age,
-            "lost_location": row.lost_location,
-            "lost_timestamp": row.lost_timestamp,
-            "details": row.details,
-        }
-        for row in (
-            db.query(
-                PersonLost.person_id,
-                PersonLost.first_name,
-                PersonLost.last_name,
-                PersonLost.gender,
-                PersonLost.age,
-                PersonLost.lost_location,
-                PersonLost.lost_timestamp,
-                PersonLost.details,
-            )
-            .filter(PersonLost.status == "active")
-            .filter(PersonLost.lost_timestamp >= start_datetime)
-            .filter(PersonLost.lost_timestamp <= end_datetime)
-            .filter(hour_expr >= start_hour)
-            .filter(hour_expr <= end_hour)
-            .all()
-        )
-    ]
-
-    pdf_buffer = _build_sensitive_cases_pdf(
-        records,
+    filename = f"reporte_casos_sensibles_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
+    return await _report_response(
+        request,
+        current_user,
+        "sensitive-cases",
+        filename,
+        lambda db: report_queries.person_rows(db, window),
+        _build_sensitive_cases_pdf,
         start_date=start_date,
         end_date=end_date,
         start_hour=start_hour,
         end_hour=end_hour,
         orientation=orientation,
     )
-    filename = f"reporte_casos_sensibles_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.pdf"
-    headers = {"Content-Disposition": f'attachment; filename=\"{filename}\"'}
-    return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
 
 @app.get("/tester")
@@ -3324,47 +3355,69 @@ def _fallback_hourly_stats(db: Session):
     ]
 
 
-@app.get("/stats/age")
-def get_age_stats(
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_dashboard_permission),
-):
-    """Return counts by age group."""
+def _with_session(compute: Callable, *args):
+    # Stats loaders open their own session: they run outside the request that
+    # triggered them (cache refreshes, hedged fallbacks that may outlive it).
+    with SessionLocal() as db:
+        return compute(db, *args)
+
+
+def _age_label(age_group: str) -> str:
+    # The aggregates store missing ages as cdc.UNKNOWN_AGE_GROUP; the fallback says "Unknown".
+    return "Unknown" if age_group == cdc.UNKNOWN_AGE_GROUP else age_group
+
+
+def _age_stats(db: Session) -> dict:
     stats = db.query(AggAgeGroup).all()
     if stats:
-        return {"data": [{"label": s.age_group, "value": s.count} for s in stats]}
+        return {"data": [{"label": _age_label(s.age_group), "value": s.count} for s in stats]}
     return {"data": _fallback_age_stats(db)}
 
 
-@app.get("/stats/gender")
-def get_gender_stats(
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_dashboard_permission),
-):
-    """Return counts by gender."""
+def _gender_stats(db: Session) -> dict:
     stats = db.query(AggGender).all()
     if stats:
         return {"data": [{"label": s.gender, "value": s.count} for s in stats]}
     return {"data": _fallback_gender_stats(db)}
 
 
-@app.get("/stats/hourly")
-def get_hourly_stats(
-    db: Session = Depends(get_db),
-    _: TokenPayload = Depends(require_dashboard_permission),
-):
-    """Return counts by hour of the day."""
+def _hourly_stats(db: Session) -> dict:
     stats = db.query(AggHourly).order_by(AggHourly.hour_of_day).all()
     if stats:
         return {"data": [{"label": f"{s.hour_of_day}:00", "value": s.count} for s in stats]}
     return {"data": _fallback_hourly_stats(db)}
 
 
-def _case_summary_stats(db: Session, auth_header: Optional[str]) -> dict:
-    data = _case_manager_get("/cases/stats/summary", auth_header=auth_header)
-    if data:
-        return data
-    # fallback local computation
+@app.get("/stats/age")
+async def get_age_stats(_: TokenPayload = Depends(require_dashboard_permission)):
+    """Return counts by age group."""
+    return await stats_cache.get("stats:age", lambda: _with_session(_age_stats))
+
+
+@app.get("/stats/gender")
+async def get_gender_stats(_: TokenPayload = Depends(require_dashboard_permission)):
+    """Return counts by gender."""
+    return await stats_cache.get("stats:gender", lambda: _with_session(_gender_stats))
+
+
+@app.get("/stats/hourly")
+async def get_hourly_stats(_: TokenPayload = Depends(require_dashboard_permission)):
+    """Return counts by hour of the day."""
+    return await stats_cache.get("stats:hourly", lambda: _with_session(_hourly_stats))
+
+
+async def _case_summary_stats(auth_header: Optional[str]) -> dict:
+    return await case_manager_client.get_or_fallback(
+        "/cases/stats/summary",
+        lambda: _with_session(_local_case_summary),
+        auth_header=auth_header,
+    )
+
+
+def _local_case_summary(db: Session) -> dict:
+    summary = case_stats.read_case_summary(db)
+    if summary is not None:
+        return summary
     counts = dict(
         db.query(Case.status, func.count(Case.case_id)).group_by(Case.status).all()
     )
@@ -3396,69 +3449,224 @@ def _case_summary_stats(db: Session, auth_header: Optional[str]) -> dict:
     }
 
 
-def _case_time_series(db: Session, days: int, auth_header: Optional[str]) -> list[dict]:
-    range_param = "24h" if days == 1 else "7d" if days == 7 else "30d"
-    data = _case_manager_get(
+def _time_window(range: str, start: Optional[date], end: Optional[date]) -> tuple[str, date, date]:
+    try:
+        return case_stats.parse_time_window(range, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Rango inválido: {exc}")
+
+
+async def _case_time_series(window: tuple[str, date, date], auth_header: Optional[str]) -> list[dict]:
+    label, start_day, end_day = window
+    params = (
+        {"start": start_day.isoformat(), "end": end_day.isoformat()} if label == "custom" else {"range": label}
+    )
+    data = await case_manager_client.get_or_fallback(
         "/cases/stats/time-series",
-        params={"range": range_param},
+        lambda: {"points": _with_session(_local_case_time_series, start_day, end_day)},
+        params=params,
         auth_header=auth_header,
+        valid=lambda data: bool(data) and "points" in data,
     )
-    if data and "points" in data:
-        return data["points"]
-    # fallback computation
-    start_date = datetime.utcnow() - timedelta(days=days)
-    reported = (
-        db.query(func.date(Case.reported_at).label("day"), func.count(Case.case_id))
-        .filter(Case.reported_at >= start_date)
-        .group_by(func.date(Case.reported_at))
-        .order_by(func.date(Case.reported_at))
-        .all()
-    )
-    resolved = (
-        db.query(func.date(Case.resolved_at).label("day"), func.count(Case.case_id))
-        .filter(Case.resolved_at.isnot(None))
-        .filter(Case.resolved_at >= start_date)
-        .filter(Case.status == CaseStatusEnum.RESOLVED)
-        .group_by(func.date(Case.resolved_at))
-        .order_by(func.date(Case.resolved_at))
-        .all()
-    )
-    reported_lookup = {row[0]: row[1] for row in reported}
-    resolved_lookup = {row[0]: row[1] for row in resolved}
-    points: list[dict] = []
-    current = start_date.date()
-    today = datetime.utcnow().date()
-    while current <= today:
-        points.append(
-            {
-                "date": current.isoformat(),
-                "reported": reported_lookup.get(current, 0),
-                "resolved": resolved_lookup.get(current, 0),
-            }
-        )
-        current += timedelta(days=1)
-    return points
+    return data["points"]
+
+
+def _local_case_time_series(db: Session, start_day: date, end_day: date) -> list[dict]:
+    return [
+        {**point, "date": point["date"].isoformat()}
+        for point in case_stats.time_series(db, start_day, end_day)
+    ]
 
 
+# The case-stats results are the same for every user with the dashboard
+# permission, so the header of whichever request reloads is used.
 @app.get("/case-stats/summary")
-def case_summary(
+async def case_summary(
     request: Request,
-    db: Session = Depends(get_db),
     _: TokenPayload = Depends(require_dashboard_permission),
 ):
-    return _case_summary_stats(db, _proxy_auth_header(request))
+    auth_header = _proxy_auth_header(request)
+
+    async def load() -> dict:
+        return await _case_summary_stats(auth_header)
+
+    return await stats_cache.get("case-stats:summary", load)
 
 
 @app.get("/case-stats/time-series")
-def case_time_series(
+async def case_time_series(
     request: Request,
-    range: str = Query("7d", pattern="^(24h|7d|30d)$"),
-    db: Session = Depends(get_db),
+    range: str = Query("7d", pattern=case_stats.TIME_RANGE_PATTERN),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    _: TokenPayload = Depends(require_dashboard_permission),
+):
+    window = _time_window(range, start, end)
+    auth_header = _proxy_auth_header(request)
+
+    async def load() -> dict:
+        return {"range": window[0], "points": await _case_time_series(window, auth_header)}
+
+    return await stats_cache.get(("case-stats:time-series", *window), load)
+
+
+def _person_stats(db: Session) -> dict:
+    """Age, gender and hourly counts in one round-trip over the Flink aggregates."""
+    rows = db.execute(
+        union_all(
+            select(literal("age").label("dimension"), AggAgeGroup.age_group.label("label"), AggAgeGroup.count),
+            select(literal("gender"), AggGender.gender, AggGender.count),
+            # Not CAST to CHAR: that would take the connection collation and clash in the UNION.
+            select(literal("hourly"), AggHourly.hour_of_day, AggHourly.count),
+        )
+    ).all()
+    grouped: dict = {"age": [], "gender": [], "hourly": []}
+    for row in rows:
+        grouped[row.dimension].append((row.label, row.count))
+    grouped["hourly"].sort(key=lambda item: int(item[0]))
+    return {
+        "age": [{"label": _age_label(label), "value": count} for label, count in grouped["age"]]
+        or _fallback_age_stats(db),
+        "gender": [{"label": label, "value": count} for label, count in grouped["gender"]] or _fallback_gender_stats(db),
+        "hourly": [{"label": f"{label}:00", "value": count} for label, count in grouped["hourly"]]
+        or _fallback_hourly_stats(db),
+    }
+
+
+PERIOD_TOP_LOCATIONS = 10
+PERIOD_AGE_ORDER = [label for _, label in cdc.AGE_GROUP_BOUNDS] + [cdc.AGE_GROUP_OVERFLOW, "Unknown"]
+
+
+def _period_response(profile_rows, location_rows) -> dict:
+    """Fold ``(age_group, gender, hour, count)`` and ``(location, count)`` rows into the chart series."""
+    unknown = {cdc.UNKNOWN_GENDER, cdc.UNKNOWN_AGE_GROUP, cdc.UNKNOWN_LOCATION, None}
+    ages: Counter = Counter()
+    genders: Counter = Counter()
+    hours: Counter = Counter()
+    locations: Counter = Counter()
+    for age_group, gender, hour, count in profile_rows:
+        ages["Unknown" if age_group in unknown else age_group] += int(count)
+        genders["Unknown" if gender in unknown else gender] += int(count)
+        hours[int(hour)] += int(count)
+    for location, count in location_rows:
+        locations["Unknown" if location in unknown else location] += int(count)
+    return {
+        "total": sum(ages.values()),
+        "age": [
+            {"label": label, "value": ages[label]}
+            for label in sorted(ages, key=lambda label: PERIOD_AGE_ORDER.index(label))
+            if ages[label] > 0
+        ],
+        "gender": [{"label": label, "value": value} for label, value in genders.most_common() if value > 0],
+        "hourly": [{"label": f"{hour:02d}:00", "value": hours[hour]} for hour in sorted(hours) if hours[hour] > 0],
+        "locations": [
+            {"label": label, "value": value}
+            for label, value in locations.most_common(PERIOD_TOP_LOCATIONS)
+            if value > 0
+        ],
+    }
+
+
+def _period_stats(db: Session, start_day: date, end_day: date) -> dict:
+    """Age, gender, hourly and location counts of the reports lost between both days (included).
+
+    Reads ``agg_daily_profile``/``agg_daily_location`` (O(days × buckets));
+    while no job has filled them, folds the matching ``persons_lost`` rows.
+    """
+    if db.query(AggDailyProfile.day).limit(1).first() is not None:
+        profile_rows = db.execute(
+            select(
+                AggDailyProfile.age_group,
+                AggDailyProfile.gender,
+                AggDailyProfile.hour_of_day,
+                func.sum(AggDailyProfile.count),
+            )
+            .where(AggDailyProfile.day.between(start_day, end_day))
+            .group_by(AggDailyProfile.age_group, AggDailyProfile.gender, AggDailyProfile.hour_of_day)
+        ).all()
+        location_rows = db.execute(
+            select(AggDailyLocation.location, func.sum(AggDailyLocation.count))
+            .where(AggDailyLocation.day.between(start_day, end_day))
+            .group_by(AggDailyLocation.location)
+        ).all()
+        return _period_response(profile_rows, location_rows)
+    since = datetime.combine(start_day, time.min)
+    until = datetime.combine(end_day + timedelta(days=1), time.min)
+    persons = db.execute(
+        select(PersonLost.age, PersonLost.gender, PersonLost.lost_timestamp, PersonLost.lost_location)
+        .where(PersonLost.lost_timestamp >= since, PersonLost.lost_timestamp < until)
+        .execution_options(yield_per=5000)
+    )
+    profile: Counter = Counter()
+    locations: Counter = Counter()
+    for age, gender, lost_timestamp, lost_location in persons:
+        profile[(cdc.age_group(age), gender or None, lost_timestamp.hour)] += 1
+        locations[cdc.normalize_location(lost_location)] += 1
+    return _period_response(
+        [(*key, count) for key, count in profile.items()],
+        locations.items(),
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+@app.get("/stats/snapshot")
+async def stats_snapshot(
+    request: Request,
+    range: str = Query("7d", pattern=case_stats.TIME_RANGE_PATTERN),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    _: TokenPayload = Depends(require_dashboard_permission),
+):
+    """Everything the live dashboard shows, with an ETag over the content."""
+    window = _time_window(range, start, end)
+    auth_header = _proxy_auth_header(request)
+
+    async def load() -> dict:
+        summary, points, person = await asyncio.gather(
+            _case_summary_stats(auth_header),
+            _case_time_series(window, auth_header),
+            run_in_threadpool(_with_session, _person_stats),
+        )
+        body = json.dumps(
+            {"summary": summary, **person, "time_series": {"range": window[0], "points": points}},
+            default=str,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return {"body": body, "etag": f'"{hashlib.sha1(body).hexdigest()[:20]}"'}
+
+    snapshot = await stats_cache.get(("stats:snapshot", *window), load)
+    # Revalidated on every use; an unchanged snapshot costs a 304 and no queries.
+    headers = {"ETag": snapshot["etag"], "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("If-None-Match"), snapshot["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot["body"], media_type="application/json", headers=headers)
+
+
+@app.get("/stats/period")
+async def period_stats(
+    range: str = Query("30d", pattern=case_stats.TIME_RANGE_PATTERN),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
     _: TokenPayload = Depends(require_dashboard_permission),
 ):
-    days = 1 if range == "24h" else 7 if range == "7d" else 30
-    points = _case_time_series(db, days, _proxy_auth_header(request))
-    return {"range": range, "points": points}
+    """Age, gender, hourly and top-location counts for reports lost in a date range."""
+    label, start_day, end_day = _time_window(range, start, end)
+
+    def load() -> dict:
+        return {
+            "range": label,
+            "start": start_day.isoformat(),
+            "end": end_day.isoformat(),
+            **_with_session(_period_stats, start_day, end_day),
+        }
+
+    return await stats_cache.get(("stats:period", label, start_day, end_day), load)
 
 
 @app.get("/persons/options")
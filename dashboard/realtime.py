@@ -0,0 +1,191 @@
+"""Real-time delivery of dashboard events.
+
+The Kafka listener reads change events in batches and feeds them to a
+:class:`ChangeCoalescer` for one window (``DASHBOARD_WS_COALESCE_MS``, or
+until ``DASHBOARD_WS_COALESCE_MAX`` events). The window is then sent as a single
+message: the summed deltas, or one ``refresh`` if any event in it could not be
+expressed as deltas. A burst of 5,000 inserts therefore costs a handful of
+broadcasts instead of 5,000.
+
+:class:`DashboardSocketManager` fans each message out without waiting for any
+client: every socket has a bounded outbound queue drained by its own sender
+task. A client that does not keep up either loses its oldest queued frames
+(``drop_oldest``; it notices the ``seq`` gap and reloads) or is disconnected
+(``disconnect``), and a send that takes longer than
+``DASHBOARD_WS_SEND_TIMEOUT_SECONDS`` closes the socket. The Kafka listener and
+the other clients are never held up.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import WebSocket
+
+from common import cdc
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_WS_COALESCE_MS = int(os.getenv("DASHBOARD_WS_COALESCE_MS", "250"))
+DASHBOARD_WS_COALESCE_MAX = int(os.getenv("DASHBOARD_WS_COALESCE_MAX", "500"))
+DASHBOARD_WS_QUEUE_SIZE = int(os.getenv("DASHBOARD_WS_QUEUE_SIZE", "32"))
+DASHBOARD_WS_SEND_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_WS_SEND_TIMEOUT_SECONDS", "5"))
+DASHBOARD_WS_SLOW_POLICY = os.getenv("DASHBOARD_WS_SLOW_POLICY", "drop_oldest")
+SLOW_POLICIES = ("drop_oldest", "disconnect")
+_CLOSE = None  # queued in place of the backlog to make the sender close the socket
+
+
+class ChangeCoalescer:
+    """Accumulates the raw CDC messages of one broadcast window."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.needs_refresh = False
+        self.new_reports = 0
+        self._totals: Dict[Tuple[str, str], int] = {}
+
+    def add(self, raw: Any) -> None:
+        self.messages += 1
+        try:
+            change = cdc.decode_change(raw)
+        except cdc.InvalidChangeEvent as exc:
+            logger.warning("Evento CDC no reconocido (%s); se fuerza una recarga completa", exc)
+            self.needs_refresh = True
+            return
+        if change is None:
+            return
+        deltas = cdc.change_deltas(change)
+        if deltas is None:
+            self.needs_refresh = True
+            return
+        if change.op == "c":
+            self.new_reports += 1
+        for delta in deltas:
+            key = (delta.dimension, delta.label)
+            self._totals[key] = self._totals.get(key, 0) + delta.delta
+
+    def event(self) -> Optional[dict]:
+        """The message to broadcast for this window, or ``None`` if nothing visible changed."""
+        if self.needs_refresh:
+            return {"event": "refresh"}
+        deltas = [
+            {"dimension": dimension, "label": label, "delta": total}
+            for (dimension, label), total in self._totals.items()
+            if total
+        ]
+        if not deltas and not self.new_reports:
+            return None
+        return {"event": "delta", "new_reports": self.new_reports, "deltas": deltas}
+
+
+class _Connection:
+    def __init__(self, websocket: WebSocket, queue_size: int) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.dropped = 0
+        self.sending = False
+        self.sender: Optional[asyncio.Task] = None
+
+
+class DashboardSocketManager:
+    def __init__(
+        self,
+        queue_size: int = DASHBOARD_WS_QUEUE_SIZE,
+        send_timeout: float = DASHBOARD_WS_SEND_TIMEOUT_SECONDS,
+        slow_policy: str = DASHBOARD_WS_SLOW_POLICY,
+    ) -> None:
+        if slow_policy not in SLOW_POLICIES:
+            raise ValueError(f"slow_policy must be one of {SLOW_POLICIES}")
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.slow_policy = slow_policy
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.send_timeouts = 0
+        self.slow_disconnects = 0
+
+    @property
+    def connections(self) -> list:
+        return list(self._connections)
+
+    async def connect(self, websocket: WebSocket, greeting: Optional[str] = None) -> None:
+        """Accept ``websocket``; ``greeting`` is queued ahead of any broadcast."""
+        await websocket.accept()
+        connection = _Connection(websocket, self.queue_size)
+        if greeting is not None:
+            connection.queue.put_nowait(greeting)
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        self._connections[websocket] = connection
+
+    async def disconnect(self, websocket: WebSocket) -> None:
+        connection = self._connections.pop(websocket, None)
+        if connection and connection.sender and connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+
+    async def broadcast(self, payload: str) -> None:
+        """Queue ``payload`` for every socket; never waits for a client."""
+        for connection in list(self._connections.values()):
+            try:
+                connection.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._handle_full_queue(connection, payload)
+
+    def _handle_full_queue(self, connection: _Connection, payload: str) -> None:
+        connection.queue.get_nowait()
+        if self.slow_policy == "disconnect":
+            self.slow_disconnects += 1
+            self._connections.pop(connection.websocket, None)
+            if connection.sending:
+                # Stuck in send_text: cancelling runs the sender's cleanup, which closes the socket.
+                connection.sender.cancel()
+                return
+            # A task cancelled before it first runs skips its cleanup, so ask it to close instead.
+            while not connection.queue.empty():
+                connection.queue.get_nowait()
+            connection.queue.put_nowait(_CLOSE)
+            return
+        connection.queue.put_nowait(payload)
+        connection.dropped += 1
+        self.frames_dropped += 1
+
+    async def _send_loop(self, connection: _Connection) -> None:
+        try:
+            while True:
+                payload = await connection.queue.get()
+                if payload is _CLOSE:
+                    return
+                connection.sending = True
+                try:
+                    async with asyncio.timeout(self.send_timeout):
+                        await connection.websocket.send_text(payload)
+                except TimeoutError:
+                    self.send_timeouts += 1
+                    logger.info("Cliente WebSocket lento; se cierra la conexión")
+                    return
+                except Exception:
+                    return
+                finally:
+                    connection.sending = False
+                self.frames_sent += 1
+        finally:
+            self._connections.pop(connection.websocket, None)
+            with contextlib.suppress(Exception):
+                await connection.websocket.close()
+
+    def stats(self) -> dict:
+        depths = [connection.queue.qsize() for connection in self._connections.values()]
+        return {
+            "connections": len(depths),
+            "queue_size": self.queue_size,
+            "slow_policy": self.slow_policy,
+            "queue_depth_max": max(depths, default=0),
+            "queued_frames": sum(depths),
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "send_timeouts": self.send_timeouts,
+            "slow_disconnects": self.slow_disconnects,
+        }
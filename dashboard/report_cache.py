@@ -0,0 +1,154 @@
+"""On-disk cache of generated PDF reports.
+
+Analysts often download the same report (type, dates, hours, orientation)
+several times in a row; each time the rows were queried again and every chart
+re-rendered. :class:`ReportCache` stores each PDF under the SHA-256 of
+
+* the report type and its normalized parameters,
+* a data-version token of the rows the report reads (computed by the caller;
+  for the dashboard reports, count, max ``person_id`` and max ``updated_at`` of
+  ``persons_lost`` in the window), so an insert, update or delete in the window
+  yields a new key and the old entry is simply never read again, and
+* :data:`REPORT_RENDERER_VERSION` plus whatever else shapes the output (the
+  sensitive terms, the copyright year), so changing a builder invalidates it.
+
+Entries are ``<sha256>.pdf`` files in ``DASHBOARD_REPORT_CACHE_DIR``; a hit
+refreshes the file's mtime, and after each store the least recently used
+entries are deleted until the directory fits in
+``DASHBOARD_REPORT_CACHE_MAX_MB``. All workers may share the directory.
+``DASHBOARD_REPORT_CACHE_MAX_MB=0`` disables the cache. The methods do blocking
+file I/O: call them from the threadpool.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_REPORT_CACHE_DIR = os.getenv(
+    "DASHBOARD_REPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "lpm-report-cache")
+)
+DASHBOARD_REPORT_CACHE_MAX_MB = float(os.getenv("DASHBOARD_REPORT_CACHE_MAX_MB", "256"))
+
+# Bump when a builder changes what it draws for the same rows.
+REPORT_RENDERER_VERSION = 3
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def report_cache_key(report_type: str, params: dict, data_version: Any, renderer: Any = None) -> str:
+    """Content address of a report: equal inputs give equal keys, in any worker."""
+    material = {
+        "type": report_type,
+        "params": _normalize(params),
+        "data": _normalize(data_version),
+        "renderer": [REPORT_RENDERER_VERSION, _normalize(renderer)],
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    def __init__(
+        self,
+        directory: str = DASHBOARD_REPORT_CACHE_DIR,
+        max_bytes: int = int(DASHBOARD_REPORT_CACHE_MAX_MB * 1024 * 1024),
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # most recently used
+        except FileNotFoundError:
+            # Never stored, or evicted (possibly by another worker) meanwhile.
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        # A unique name per call: threads of one worker may render the same key at once.
+        handle = tempfile.NamedTemporaryFile(dir=self.directory, prefix=f"{path.name}.", suffix=".tmp", delete=False)
+        try:
+            with handle:
+                handle.write(data)
+            os.replace(handle.name, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(handle.name)
+            raise
+        self.stores += 1
+        self._evict()
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "enabled": self.enabled,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def _entries(self) -> list:
+        entries = []
+        for path in self.directory.glob("*.pdf"):
+            with contextlib.suppress(FileNotFoundError):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+                self.evictions += 1
+            total -= size
+
+
+report_cache = ReportCache()
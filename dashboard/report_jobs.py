@@ -0,0 +1,226 @@
+"""Background jobs for the PDF reports.
+
+A ``POST /reports/*`` sent with ``Prefer: respond-async`` does not wait for
+the PDF: :meth:`ReportJobStore.submit` records a job and answers ``202`` with
+its id, while a task on the event loop loads the rows (threadpool) and renders
+the PDF (:mod:`dashboard.report_pool`). The result is written to
+``DASHBOARD_REPORT_JOBS_DIR`` and served by
+``GET /reports/jobs/{id}/download`` straight from disk, so a report that takes
+longer than the proxy timeout still completes and downloading it again costs
+nothing. ``GET /reports/jobs/{id}`` returns the status and progress.
+
+Each job is a ``<id>.json`` file (status, stage, owner, ...) next to its
+``<id>.pdf``, both replaced atomically, so with ``uvicorn --workers N`` any
+worker can answer for a job another one is building. Jobs and their PDFs are
+removed ``DASHBOARD_REPORT_JOB_TTL_SECONDS`` after they were created; at most
+``DASHBOARD_REPORT_MAX_JOBS`` may be queued or running per worker.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from dashboard.report_pool import ReportQueueFull
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_REPORT_JOBS_DIR = os.getenv(
+    "DASHBOARD_REPORT_JOBS_DIR", os.path.join(tempfile.gettempdir(), "lpm-report-jobs")
+)
+DASHBOARD_REPORT_JOB_TTL_SECONDS = float(os.getenv("DASHBOARD_REPORT_JOB_TTL_SECONDS", "3600"))
+DASHBOARD_REPORT_MAX_JOBS = int(os.getenv("DASHBOARD_REPORT_MAX_JOBS", "16"))
+
+PURGE_INTERVAL_SECONDS = 60
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# progress(stage, fraction): lets the build report where it is.
+Progress = Callable[[str, float], None]
+
+
+@dataclass
+class ReportJob:
+    id: str
+    report_type: str
+    owner: str
+    filename: str
+    created_at: float
+    status: str = QUEUED
+    stage: str = "En cola"
+    progress: float = 0.0
+    finished_at: Optional[float] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ReportJobStore:
+    def __init__(
+        self,
+        directory: str = DASHBOARD_REPORT_JOBS_DIR,
+        ttl: float = DASHBOARD_REPORT_JOB_TTL_SECONDS,
+        max_active: int = DASHBOARD_REPORT_MAX_JOBS,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_active = max_active
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._purger: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.purged = 0
+
+    async def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self._purger is None:
+            self._purger = asyncio.ensure_future(self._purge_periodically())
+
+    async def close(self) -> None:
+        tasks: Set[asyncio.Task] = set(self._tasks.values())
+        if self._purger is not None:
+            tasks.add(self._purger)
+            self._purger = None
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def submit(
+        self,
+        report_type: str,
+        owner: str,
+        filename: str,
+        build: Callable[[Progress], Awaitable[bytes]],
+    ) -> ReportJob:
+        """Record a job and start ``build`` in the background; raises :class:`ReportQueueFull` when busy."""
+        if len(self._tasks) >= self.max_active:
+            raise ReportQueueFull()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        job = ReportJob(uuid.uuid4().hex, report_type, owner, filename, created_at=time.time())
+        self._save(job)
+        self.submitted += 1
+        self._tasks[job.id] = asyncio.ensure_future(self._run(job, build))
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        """The job ``job_id`` or ``None`` if it does not exist or has expired."""
+        if not _JOB_ID.match(job_id):
+            return None
+        try:
+            data = json.loads(self._meta_path(job_id).read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+        job = ReportJob(**data)
+        if job.created_at + self.ttl <= time.time():
+            self._remove(job_id)
+            return None
+        return job
+
+    def result_path(self, job: ReportJob) -> Optional[Path]:
+        path = self._pdf_path(job.id)
+        return path if job.status == DONE and path.exists() else None
+
+    def purge_expired(self) -> int:
+        """Delete the jobs older than the TTL (and stray temporary files); returns how many."""
+        now = time.time()
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                created_at = json.loads(path.read_text(encoding="utf-8"))["created_at"]
+            except FileNotFoundError:
+                continue  # removed by another worker
+            except (ValueError, KeyError):
+                created_at = path.stat().st_mtime
+            if created_at + self.ttl <= now and path.stem not in self._tasks:
+                self._remove(path.stem)
+                removed += 1
+        for path in self.directory.glob("*.tmp"):
+            with contextlib.suppress(FileNotFoundError):
+                if path.stat().st_mtime + self.ttl <= now:
+                    path.unlink()
+        self.purged += removed
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._tasks),
+            "max_active": self.max_active,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "purged": self.purged,
+            "ttl_seconds": self.ttl,
+        }
+
+    async def _run(self, job: ReportJob, build: Callable[[Progress], Awaitable[bytes]]) -> None:
+        def progress(stage: str, fraction: float) -> None:
+            job.status, job.stage, job.progress = RUNNING, stage, round(fraction, 2)
+            self._save(job)
+
+        try:
+            data = await build(progress)
+            _write_atomically(self._pdf_path(job.id), data)
+            job.status, job.stage, job.progress = DONE, "Listo", 1.0
+            job.size = len(data)
+            self.completed += 1
+        except asyncio.CancelledError:
+            job.status, job.stage, job.error = FAILED, "Cancelado", "El servicio se detuvo antes de terminar el reporte."
+            self.failed += 1
+            raise
+        except ReportQueueFull:
+            job.status, job.stage, job.error = FAILED, "Rechazado", "Hay demasiados reportes en cola."
+            self.failed += 1
+        except Exception:
+            logger.exception("No se pudo generar el reporte %s (%s)", job.id, job.report_type)
+            job.status, job.stage, job.error = FAILED, "Error", "No se pudo generar el reporte."
+            self.failed += 1
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            self._tasks.pop(job.id, None)
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            try:
+                self.purge_expired()
+            except OSError:
+                logger.exception("No se pudieron purgar los reportes vencidos")
+            await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+
+    def _meta_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def _pdf_path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.pdf"
+
+    def _save(self, job: ReportJob) -> None:
+        _write_atomically(self._meta_path(job.id), json.dumps(asdict(job)).encode("utf-8"))
+
+    def _remove(self, job_id: str) -> None:
+        for path in (self._pdf_path(job_id), self._meta_path(job_id)):
+            with contextlib.suppress(FileNotFoundError):
+                path.unlink()
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+report_jobs = ReportJobStore()
@@ -0,0 +1,172 @@
+"""Process pool for the CPU-bound part of the PDF reports.
+
+pandas, matplotlib and reportlab hold the GIL for the whole build, so a large
+report rendered on the event loop (or in its threadpool) stalls every
+WebSocket and stats request of that worker. :class:`ReportPool` runs the
+builders in ``DASHBOARD_REPORT_WORKERS`` separate processes instead:
+
+* at most ``DASHBOARD_REPORT_WORKERS`` builds run at once; further requests
+  wait their turn, and beyond ``DASHBOARD_REPORT_MAX_QUEUE`` waiting requests
+  :class:`ReportQueueFull` is raised so the handler can answer 503 instead of
+  piling up connections;
+* the time each build spent waiting and rendering is recorded and exposed by
+  :meth:`ReportPool.stats` (``GET /internal/report-pool``).
+
+Builders must be module-level functions (they are pickled by name) that take
+picklable arguments; the pool returns the PDF as ``bytes``. Workers use the
+``spawn`` start method, so nothing from the serving process (event loop, DB
+connections, sockets) leaks into them. With ``DASHBOARD_REPORT_WORKERS=0``
+builds run in the threadpool, as before (tests, single-core hosts).
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_REPORT_WORKERS = int(os.getenv("DASHBOARD_REPORT_WORKERS", "2"))
+DASHBOARD_REPORT_MAX_QUEUE = int(os.getenv("DASHBOARD_REPORT_MAX_QUEUE", "16"))
+
+# Upper bounds (seconds) of the queue/render time histograms.
+TIME_BUCKETS_SECONDS = [0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120]
+
+
+class ReportQueueFull(Exception):
+    """Too many reports are already waiting for a worker."""
+
+
+class _Timings:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(TIME_BUCKETS_SECONDS) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        index = next(
+            (idx for idx, bound in enumerate(TIME_BUCKETS_SECONDS) if seconds <= bound),
+            len(TIME_BUCKETS_SECONDS),
+        )
+        self.buckets[index] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 1),
+            "histogram": [
+                {"le_seconds": bound, "count": count}
+                for bound, count in zip(TIME_BUCKETS_SECONDS + [None], self.buckets)
+            ],
+        }
+
+
+def _render(builder: Callable[..., Any], args: tuple, kwargs: dict) -> tuple:
+    """Runs in the worker: build the PDF and report when the build actually started."""
+    started = time.time()
+    buffer = builder(*args, **kwargs)
+    data = buffer.getvalue() if hasattr(buffer, "getvalue") else bytes(buffer)
+    return data, started, time.time()
+
+
+class ReportPool:
+    def __init__(self, workers: int = DASHBOARD_REPORT_WORKERS, max_queue: int = DASHBOARD_REPORT_MAX_QUEUE) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._preload: Optional[str] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.queue_time = _Timings()
+        self.render_time = _Timings()
+
+    def start(self, preload: Optional[str] = None) -> None:
+        """Create the workers; ``preload`` names the builders' module so they import it now.
+
+        Importing the dashboard (pandas, matplotlib, reportlab) takes seconds,
+        which would otherwise land on the first report of each worker.
+        """
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            if preload:
+                self._preload = preload
+                for _ in range(self.workers):
+                    self._executor.submit(importlib.import_module, preload)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def render(self, builder: Callable[..., Any], *args: Any, **kwargs: Any) -> bytes:
+        """Run ``builder(*args, **kwargs)`` in a worker and return the PDF bytes."""
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ReportQueueFull()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(self.workers, 1))
+        enqueued = time.time()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            data, started, finished = await self._submit(builder, args, kwargs)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self._slots.release()
+        self.completed += 1
+        # Wall-clock stamps taken in the worker: the queue time includes process hand-off.
+        self.queue_time.record(max(0.0, started - enqueued))
+        self.render_time.record(max(0.0, finished - started))
+        return data
+
+    async def _submit(self, builder: Callable[..., Any], args: tuple, kwargs: dict) -> tuple:
+        if self.workers <= 0:
+            return await run_in_threadpool(_render, builder, args, kwargs)
+        self.start(self._preload)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, _render, builder, args, kwargs)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault in a native library): start a fresh pool for the next report.
+            logger.exception("El pool de reportes se rompió; se recrea")
+            self.close()
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "queue_time": self.queue_time.snapshot(),
+            "render_time": self.render_time.snapshot(),
+        }
+
+
+report_pool = ReportPool()
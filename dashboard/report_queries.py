@@ -0,0 +1,165 @@
+"""Queries behind the PDF reports.
+
+Every report covers the active ``persons_lost`` rows of a
+:class:`ReportWindow` (dates, plus an hour-of-day range). The demographic,
+geographic, hourly and executive reports only draw counts, so their queries
+``GROUP BY`` in the database and return a few hundred rows at most, whatever
+the size of the window:
+
+* :func:`age_gender_counts`: one row per (age, gender); ages are bucketed by
+  the builders, the raw age keeps the grouping in one place (``AGE_GROUP_ORDER``);
+* :func:`location_counts`: one row per reported location;
+* :func:`weekday_hour_counts`: the weekday × hour matrix;
+* :func:`executive_summary`: the totals, top locations and latest cases.
+
+Only the tables that list individual people (operational alerts, sensitive
+cases, the latest cases of the executive summary) read rows, through
+:func:`person_rows`.
+
+``HOUR()``/``WEEKDAY()`` are MySQL functions; :func:`hour_of` and
+:func:`weekday_of` fall back to ``strftime`` on SQLite (tests). Locations are
+grouped by :func:`location_of`, which compares them byte by byte like the
+pandas ``value_counts`` the builders used before (MySQL's default collation
+would merge "Bolívar" and "bolivar").
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import Integer, cast, distinct, func
+from sqlalchemy.orm import Query, Session
+
+from scripts.db_init import PersonLost
+
+EXECUTIVE_TOP_LOCATIONS = 5
+EXECUTIVE_RECENT_CASES = 6
+
+
+class ReportWindow(NamedTuple):
+    start_date: date
+    end_date: date
+    start_hour: int
+    end_hour: int
+
+    @property
+    def start_datetime(self) -> datetime:
+        return datetime.combine(self.start_date, time(hour=0, minute=0, second=0))
+
+    @property
+    def end_datetime(self) -> datetime:
+        return datetime.combine(self.end_date, time(hour=23, minute=59, second=59))
+
+
+def hour_of(db: Session, column):
+    if db.get_bind().dialect.name == "mysql":
+        return func.hour(column)
+    return cast(func.strftime("%H", column), Integer)
+
+
+def weekday_of(db: Session, column):
+    """0 = Monday ... 6 = Sunday, as MySQL's ``WEEKDAY()`` and pandas' ``dt.weekday``."""
+    if db.get_bind().dialect.name == "mysql":
+        return func.weekday(column)
+    return (cast(func.strftime("%w", column), Integer) + 6) % 7
+
+
+def location_of(db: Session, column):
+    """``TRIM()``-med location, with a binary collation on MySQL."""
+    location = func.trim(column)
+    if db.get_bind().dialect.name == "mysql":
+        return location.collate("utf8mb4_bin")
+    return location
+
+
+def _in_window(query: Query, db: Session, window: ReportWindow) -> Query:
+    hour_expr = hour_of(db, PersonLost.lost_timestamp)
+    return (
+        query.filter(PersonLost.status == "active")
+        .filter(PersonLost.lost_timestamp >= window.start_datetime)
+        .filter(PersonLost.lost_timestamp <= window.end_datetime)
+        .filter(hour_expr >= window.start_hour)
+        .filter(hour_expr <= window.end_hour)
+    )
+
+
+def person_rows(db: Session, window: ReportWindow, limit: Optional[int] = None) -> List[dict]:
+    """The reported people of the window, most recent first."""
+    query = _in_window(
+        db.query(
+            PersonLost.person_id,
+            PersonLost.first_name,
+            PersonLost.last_name,
+            PersonLost.gender,
+            PersonLost.age,
+            PersonLost.lost_location,
+            PersonLost.lost_timestamp,
+            PersonLost.details,
+        ),
+        db,
+        window,
+    ).order_by(PersonLost.lost_timestamp.desc(), PersonLost.person_id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return [dict(row._mapping) for row in query.all()]
+
+
+def age_gender_counts(db: Session, window: ReportWindow) -> List[dict]:
+    count = func.count(PersonLost.person_id)
+    rows = (
+        _in_window(db.query(PersonLost.age, PersonLost.gender, count.label("count")), db, window)
+        .group_by(PersonLost.age, PersonLost.gender)
+        .all()
+    )
+    return [{"age": row.age, "gender": row.gender, "count": int(row.count)} for row in rows]
+
+
+def location_counts(db: Session, window: ReportWindow, limit: Optional[int] = None) -> List[dict]:
+    """Reports per location (``None`` when it was left empty), busiest first."""
+    location = location_of(db, PersonLost.lost_location)
+    count = func.count(PersonLost.person_id)
+    query = (
+        _in_window(db.query(location.label("location"), count.label("count")), db, window)
+        .group_by(location)
+        .order_by(count.desc(), location)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [{"location": row.location or None, "count": int(row.count)} for row in query.all()]
+
+
+def weekday_hour_counts(db: Session, window: ReportWindow) -> List[dict]:
+    weekday = weekday_of(db, PersonLost.lost_timestamp)
+    hour = hour_of(db, PersonLost.lost_timestamp)
+    count = func.count(PersonLost.person_id)
+    rows = (
+        _in_window(db.query(weekday.label("weekday"), hour.label("hour"), count.label("count")), db, window)
+        .group_by(weekday, hour)
+        .all()
+    )
+    return [{"weekday": int(row.weekday), "hour": int(row.hour), "count": int(row.count)} for row in rows]
+
+
+def executive_summary(db: Session, window: ReportWindow) -> dict:
+    totals = _in_window(
+        db.query(
+            func.count(PersonLost.person_id).label("total"),
+            func.count(distinct(func.date(PersonLost.lost_timestamp))).label("active_days"),
+            # Empty and missing locations count once, as the "Unknown" row of location_counts().
+            func.count(distinct(func.coalesce(location_of(db, PersonLost.lost_location), ""))).label("unique_locations"),
+            func.max(PersonLost.lost_timestamp).label("latest_report"),
+            func.avg(PersonLost.age).label("average_age"),
+        ),
+        db,
+        window,
+    ).one()
+    return {
+        "total": int(totals.total or 0),
+        "active_days": int(totals.active_days or 0),
+        "unique_locations": int(totals.unique_locations or 0),
+        "latest_report": totals.latest_report,
+        "average_age": float(totals.average_age) if totals.average_age is not None else None,
+        "age_gender": age_gender_counts(db, window),
+        "top_locations": location_counts(db, window, limit=EXECUTIVE_TOP_LOCATIONS),
+        "recent_cases": person_rows(db, window, limit=EXECUTIVE_RECENT_CASES),
+    }
@@ -0,0 +1,88 @@
+(function () {
+    const POLL_INTERVAL_MS = 1000;
+
+    function statusBox(form) {
+        let box = form.querySelector('[data-report-job-status]');
+        if (!box) {
+            box = document.createElement('div');
+            box.className = 'col-12';
+            box.setAttribute('data-report-job-status', '');
+            form.appendChild(box);
+        }
+        return box;
+    }
+
+    function showProgress(form, job) {
+        const percent = Math.round((job.progress || 0) * 100);
+        statusBox(form).innerHTML = `
+            <div class="small text-muted mb-1">${job.stage} (${percent}%)</div>
+            <div class="progress" role="progressbar" aria-valuenow="${percent}" aria-valuemin="0" aria-valuemax="100">
+                <div class="progress-bar progress-bar-striped progress-bar-animated" style="width: ${percent}%"></div>
+            </div>`;
+    }
+
+    function showError(form, message) {
+        statusBox(form).innerHTML = '<div class="alert alert-danger mb-0" role="alert"></div>';
+        statusBox(form).firstElementChild.textContent = message;
+    }
+
+    function setBusy(form, busy) {
+        form.querySelectorAll('button[type="submit"]').forEach((button) => {
+            button.disabled = busy;
+        });
+    }
+
+    async function poll(form, statusUrl) {
+        const response = await fetch(statusUrl, { credentials: 'same-origin' });
+        if (!response.ok) {
+            throw new Error('No se pudo consultar el estado del reporte.');
+        }
+        const job = await response.json();
+        showProgress(form, job);
+        if (job.status === 'done') {
+            window.location.href = job.download_url;
+            return;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'No se pudo generar el reporte.');
+        }
+        setTimeout(() => poll(form, statusUrl).catch((error) => fail(form, error)), POLL_INTERVAL_MS);
+    }
+
+    function fail(form, error) {
+        setBusy(form, false);
+        showError(form, error.message);
+    }
+
+    async function submitAsJob(event) {
+        const form = event.target;
+        event.preventDefault();
+        setBusy(form, true);
+        try {
+            const response = await fetch(form.action || window.location.pathname, {
+                method: 'POST',
+                body: new FormData(form),
+                credentials: 'same-origin',
+                headers: { Prefer: 'respond-async' },
+            });
+            if (response.status === 503) {
+                throw new Error('Hay demasiados reportes en cola; inténtalo de nuevo en unos segundos.');
+            }
+            if (response.status !== 202) {
+                // Validation errors come back as the form page: let the browser render it.
+                form.removeEventListener('submit', submitAsJob);
+                form.submit();
+                return;
+            }
+            const job = await response.json();
+            showProgress(form, job);
+            await poll(form, job.status_url);
+        } catch (error) {
+            fail(form, error);
+        }
+    }
+
+    document.querySelectorAll('form[data-report-job]').forEach((form) => {
+        form.addEventListener('submit', submitAsJob);
+    });
+})();
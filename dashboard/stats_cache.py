@@ -0,0 +1,122 @@
+"""In-process cache for the dashboard statistics endpoints.
+
+Every open dashboard polls five stats endpoints and re-fetches them on each
+WebSocket refresh, so without a cache N browsers cost N×5 queries per change.
+:class:`StatsCache` keeps the last result per key and:
+
+* serves it while it is younger than ``ttl``;
+* once the TTL expires, keeps serving it for up to ``stale_ttl`` more seconds
+  while a single background task reloads it (stale-while-revalidate);
+* after :meth:`StatsCache.invalidate` (a CDC event or ``/internal/refresh``)
+  never serves the old value again: the next caller reloads it and concurrent
+  callers await that same load (single flight), so one change costs one query
+  per key regardless of how many dashboards are open.
+
+Keys include caller-chosen windows (``/stats/period?start=…&end=…``), so the
+cache holds at most ``max_entries`` of them, least recently used first out;
+:meth:`StatsCache.invalidate` empties it and an entry past its stale window is
+dropped when read.
+
+Synchronous loaders (SQLAlchemy sessions) run in the threadpool; coroutine
+functions (the pooled case manager client) are awaited on the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("dashboard")
+
+DASHBOARD_STATS_TTL_SECONDS = float(os.getenv("DASHBOARD_STATS_TTL_SECONDS", "30"))
+DASHBOARD_STATS_STALE_SECONDS = float(os.getenv("DASHBOARD_STATS_STALE_SECONDS", "300"))
+DASHBOARD_STATS_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_STATS_CACHE_MAX_ENTRIES", "512"))
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+
+
+class StatsCache:
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int = DASHBOARD_STATS_CACHE_MAX_ENTRIES) -> None:
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._load(key, loader)
+                return entry.value
+            del self._entries[key]
+        self.misses += 1
+        return await asyncio.shield(self._load(key, loader))
+
+    def invalidate(self) -> None:
+        """Drop every entry; in-flight loads started before are neither reused nor stored."""
+        self._generation += 1
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "generation": self._generation,
+        }
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run_loader(key, loader, self._generation))
+            self._inflight[key] = future
+            # Background refreshes are never awaited; keep their errors out of the loop's log.
+            future.add_done_callback(lambda fut: fut.cancelled() or fut.exception())
+        return future
+
+    async def _run_loader(self, key: Hashable, loader: Callable[[], Any], generation: int) -> Any:
+        try:
+            if asyncio.iscoroutinefunction(loader):
+                value = await loader()
+            else:
+                value = await run_in_threadpool(loader)
+        except Exception:
+            logger.exception("No se pudo recalcular %s", key)
+            raise
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+        if generation == self._generation:
+            self._entries[key] = _Entry(value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+stats_cache = StatsCache(DASHBOARD_STATS_TTL_SECONDS, DASHBOARD_STATS_STALE_SECONDS)
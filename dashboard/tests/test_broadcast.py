@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from dashboard.broadcast import Broadcast, MemoryBroadcast, UnixSocketBroadcast, create_broadcast
+
+
+class Worker:
+    def __init__(self, path):
+        self.broadcast = UnixSocketBroadcast(str(path), reconnect_delay=0.05)
+        self.received = []
+        self.resyncs = 0
+
+    async def start(self):
+        await self.broadcast.start(self._deliver, self._resync)
+
+    async def _deliver(self, message):
+        self.received.append(message)
+
+    async def _resync(self):
+        self.resyncs += 1
+
+
+async def _wait_for(predicate, timeout=3.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_memory_backend_delivers_in_process():
+    async def scenario():
+        received = []
+
+        async def deliver(message):
+            received.append(message)
+
+        backend = create_broadcast("memory://")
+        await backend.start(deliver)
+        await backend.publish('{"event": "refresh"}')
+        return backend, received
+
+    backend, received = asyncio.run(scenario())
+    assert isinstance(backend, MemoryBroadcast)
+    assert received == ['{"event": "refresh"}']
+
+
+def test_unix_hub_reaches_every_worker_and_fails_over(tmp_path):
+    async def scenario():
+        first, second = Worker(tmp_path / "hub.sock"), Worker(tmp_path / "hub.sock")
+        await first.start()
+        await second.start()
+        assert first.broadcast.is_hub and not second.broadcast.is_hub
+
+        await second.broadcast.publish("from-second")
+        await _wait_for(lambda: first.received and second.received)
+        assert first.received == second.received == ["from-second"]
+
+        # The hub worker goes away: the other one takes over and resyncs.
+        await first.broadcast.stop()
+        await _wait_for(lambda: second.broadcast.is_hub and second.resyncs == 1)
+        third = Worker(tmp_path / "hub.sock")
+        await third.start()
+        await third.broadcast.publish("from-third")
+        await _wait_for(lambda: "from-third" in second.received and "from-third" in third.received)
+
+        await second.broadcast.stop()
+        await third.broadcast.stop()
+
+    asyncio.run(scenario())
+
+
+def test_backends_must_implement_the_whole_interface():
+    class PublishOnly(Broadcast):
+        async def publish(self, message):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
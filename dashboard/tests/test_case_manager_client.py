@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+
+from dashboard.case_manager_client import CaseManagerClient, CircuitBreaker
+
+
+def _transport(seen):
+    def handler(request):
+        seen.append((request.url.path, request.headers.get("Authorization")))
+        if request.url.path == "/cases/stats/summary":
+            return httpx.Response(200, json={"total_cases": 3})
+        return httpx.Response(503)
+
+    return httpx.MockTransport(handler)
+
+
+def test_started_client_is_reused_and_errors_become_none(caplog):
+    seen = []
+    client = CaseManagerClient("http://case_manager:58103/", transport=_transport(seen))
+
+    async def scenario():
+        await client.start()
+        pooled = client._client
+        summary = await client.get_json("/cases/stats/summary", auth_header="Bearer abc")
+        failed = await client.get_json("/cases/1/actions")
+        assert client._client is pooled
+        await client.close()
+        return summary, failed
+
+    summary, failed = asyncio.run(scenario())
+
+    assert summary == {"total_cases": 3}
+    assert failed is None
+    assert seen == [("/cases/stats/summary", "Bearer abc"), ("/cases/1/actions", None)]
+    assert client._client is None
+    assert any("/cases/1/actions" in record.getMessage() for record in caplog.records if record.name == "dashboard")
+
+
+def test_unstarted_client_still_answers():
+    seen = []
+    client = CaseManagerClient("http://case_manager:58103", transport=_transport(seen))
+
+    assert asyncio.run(client.get_json("/cases/stats/summary")) == {"total_cases": 3}
+
+
+def test_breaker_opens_after_failures_and_half_opens_after_reset():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    seen = []
+    client = CaseManagerClient("http://case_manager:58103", transport=_transport(seen), breaker=breaker)
+
+    async def scenario():
+        for _ in range(3):
+            assert await client.get_json("/cases/1/actions") is None
+        assert len(seen) == 2 and breaker.state == CircuitBreaker.OPEN
+        now[0] = 11.0
+        # Half-open probe succeeds and closes the circuit.
+        assert await client.get_json("/cases/stats/summary") == {"total_cases": 3}
+
+    asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.short_circuited == 1 and breaker.times_opened == 1
+
+
+def test_client_errors_do_not_open_the_breaker():
+    transport = httpx.MockTransport(lambda request: httpx.Response(401))
+    client = CaseManagerClient("http://case_manager:58103", transport=transport, breaker=CircuitBreaker(failure_threshold=1))
+
+    asyncio.run(client.get_json("/cases/stats/summary"))
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_hedged_call_returns_the_local_answer_when_remote_is_slow():
+    async def slow(request):
+        await asyncio.sleep(0.5)
+        return httpx.Response(200, json={"total_cases": 3})
+
+    client = CaseManagerClient("http://case_manager:58103", transport=httpx.MockTransport(slow), hedge_after=0.02)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        result = await client.get_or_fallback("/cases/stats/summary", lambda: {"total_cases": 1})
+        return result, asyncio.get_running_loop().time() - started
+
+    result, elapsed = asyncio.run(scenario())
+
+    assert result == {"total_cases": 1}
+    assert elapsed < 0.4
+    assert client.hedged == 1 and client.hedge_wins == 1
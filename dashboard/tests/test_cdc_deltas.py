@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from common import cdc
+from dashboard.realtime import ChangeCoalescer
+
+# 2024-05-01 14:30:00 as Debezium encodes a DATETIME column.
+LOST_AT_MS = 1714573800000
+
+
+def _row(**overrides):
+    row = {"person_id": 7, "gender": "F", "age": 27, "lost_timestamp": LOST_AT_MS, "status": "active"}
+    row.update(overrides)
+    return row
+
+
+def _message(op, before=None, after=None, envelope=False):
+    payload = {"op": op, "before": before, "after": after}
+    return json.dumps({"schema": {}, "payload": payload} if envelope else payload).encode("utf-8")
+
+
+@pytest.mark.parametrize("envelope", [False, True])
+def test_insert_becomes_one_delta_per_bucket(envelope):
+    change = cdc.decode_change(_message("c", after=_row(), envelope=envelope))
+
+    assert cdc.change_deltas(change) == [
+        cdc.Delta("age_group", "19-30", 1),
+        cdc.Delta("gender", "F", 1),
+        cdc.Delta("hour", "14", 1),
+        cdc.Delta("status", "active", 1),
+    ]
+
+
+def test_status_update_moves_between_status_buckets_only():
+    change = cdc.decode_change(_message("u", before=_row(), after=_row(status="found")))
+
+    assert cdc.change_deltas(change) == [cdc.Delta("status", "active", -1), cdc.Delta("status", "found", 1)]
+    unchanged = cdc.decode_change(_message("u", before=_row(), after=_row(first_name="Ana")))
+    assert cdc.change_deltas(unchanged) == []
+
+
+@pytest.mark.parametrize(
+    "op, before, after",
+    [
+        ("u", _row(), _row(age=45)),
+        ("d", _row(), None),
+        ("r", None, _row()),
+        ("c", None, _row(age=None)),
+    ],
+)
+def test_changes_that_need_a_full_refresh(op, before, after):
+    assert cdc.change_deltas(cdc.decode_change(_message(op, before, after))) is None
+
+
+def test_tombstones_and_garbage():
+    assert cdc.decode_change(None) is None
+    assert cdc.decode_change(json.dumps({"schema": {}, "payload": None})) is None
+    with pytest.raises(cdc.InvalidChangeEvent):
+        cdc.decode_change(b"not json")
+    with pytest.raises(cdc.InvalidChangeEvent):
+        cdc.decode_change(json.dumps({"after": _row()}))
+
+
+def test_coalescer_sums_a_window_into_one_event():
+    coalescer = ChangeCoalescer()
+    for person_id in range(3):
+        coalescer.add(_message("c", after=_row(person_id=person_id)))
+    coalescer.add(_message("c", after=_row(gender="M", age=8)))
+    coalescer.add(_message("u", before=_row(), after=_row(status="found")))
+    coalescer.add(None)
+
+    event = coalescer.event()
+
+    assert coalescer.messages == 6
+    assert event["event"] == "delta" and event["new_reports"] == 4
+    totals = {(d["dimension"], d["label"]): d["delta"] for d in event["deltas"]}
+    assert totals[("gender", "F")] == 3 and totals[("gender", "M")] == 1
+    assert totals[("age_group", "19-30")] == 3 and totals[("age_group", "0-12")] == 1
+    assert totals[("status", "active")] == 3 and totals[("status", "found")] == 1
+
+
+def test_coalescer_window_with_a_delete_becomes_a_refresh():
+    coalescer = ChangeCoalescer()
+    coalescer.add(_message("c", after=_row()))
+    coalescer.add(_message("d", before=_row()))
+
+    assert coalescer.event() == {"event": "refresh"}
+    assert ChangeCoalescer().event() is None
+
+
+def test_live_hour_matches_the_flink_hourly_bucket():
+    # 2024-03-04 23:30 stored in MySQL, as Debezium publishes it (wall clock read as UTC).
+    millis = 1709595000000
+    assert cdc.lost_hour(millis) == 23 == (millis // 3600000) % 24
+    root = Path(__file__).resolve().parents[2]
+    flink_job = root / "flink-job" / "src" / "main" / "java" / "com" / "lostpersons" / "flink" / "LostPersonsJob.java"
+    for source in (root / "flink" / "flink_sql_job.sql", flink_job):
+        text = source.read_text(encoding="utf-8")
+        assert "HOUR(TO_TIMESTAMP_LTZ" not in text, source
+        assert "FLOOR(payload.after.lost_timestamp / 3600000)" in text, source
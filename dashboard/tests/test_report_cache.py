@@ -0,0 +1,53 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from dashboard.report_cache import ReportCache, report_cache_key
+
+
+def test_key_depends_on_parameters_and_data_version_only():
+    params = {"start_date": date(2024, 3, 1), "end_date": date(2024, 3, 31), "orientation": "portrait"}
+    key = report_cache_key("operational-alerts", params, [6, 6, "2024-03-06T13:00:00"])
+
+    reordered = {"orientation": "Portrait ", "end_date": date(2024, 3, 31), "start_date": date(2024, 3, 1)}
+    assert report_cache_key("operational-alerts", reordered, [6, 6, "2024-03-06T13:00:00"]) == key
+    assert report_cache_key("executive-summary", params, [6, 6, "2024-03-06T13:00:00"]) != key
+    assert report_cache_key("operational-alerts", params, [7, 7, "2024-03-06T13:00:00"]) != key
+    assert report_cache_key("operational-alerts", params, [6, 6, "2024-03-06T13:00:00"], renderer=[2025]) != key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ReportCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    os.utime(tmp_path / "a.pdf", (1, 1))
+    os.utime(tmp_path / "b.pdf", (2, 2))
+    assert cache.get("a") == b"aaaa"  # now the most recently used
+
+    cache.put("c", b"cccc")
+    cache.put("huge", b"x" * 11)
+
+    assert cache.get("b") is None
+    assert cache.get("huge") is None
+    assert (cache.get("a"), cache.get("c")) == (b"aaaa", b"cccc")
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 8, 1)
+    assert (stats["hits"], stats["misses"]) == (3, 2)
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ReportCache(str(tmp_path / "off"), max_bytes=0)
+    cache.put("a", b"pdf")
+    assert cache.get("a") is None
+    assert not (tmp_path / "off").exists()
+
+
+def test_concurrent_stores_of_one_key_publish_a_whole_file(tmp_path):
+    cache = ReportCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    payloads = [bytes([65 + idx]) * (50_000 + idx) for idx in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda data: [cache.put("same", data) for _ in range(20)], payloads))
+
+    assert cache.get("same") in payloads
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["same.pdf"]
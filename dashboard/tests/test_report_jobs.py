@@ -0,0 +1,159 @@
+import asyncio
+from datetime import date, datetime
+
+import httpx
+import pytest
+from jose import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from dashboard import main
+from dashboard.database import SessionLocal
+from dashboard.report_cache import ReportCache
+from dashboard.report_jobs import DONE, FAILED, ReportJobStore
+from dashboard.report_pool import ReportPool
+from scripts.db_init import Base, PersonLost
+
+
+def _token(username):
+    return jwt.encode({"sub": "1", "username": username, "permissions": ["pdf_reports"]}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+
+
+@pytest.fixture(name="jobs")
+def jobs_fixture(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([_person(idx) for idx in range(6)])
+        db.commit()
+    original_bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    store = ReportJobStore(str(tmp_path / "jobs"), ttl=600, max_active=4)
+    monkeypatch.setattr(main, "report_jobs", store)
+    monkeypatch.setattr(main, "report_pool", ReportPool(workers=0))
+    monkeypatch.setattr(main, "report_cache", ReportCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024))
+    yield store
+    SessionLocal.configure(bind=original_bind)
+
+
+def _person(idx):
+    return PersonLost(
+        first_name="Reporte",
+        last_name="Prueba",
+        gender="MF"[idx % 2],
+        birth_date=date(2000, 1, 1),
+        age=5 + idx * 7,
+        lost_timestamp=datetime(2024, 3, 1 + idx, 8 + idx),
+        lost_location="Quito, Pichincha",
+        status="active",
+    )
+
+
+def _client(username="analyst"):
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://dashboard",
+        headers={"Authorization": f"Bearer {_token(username)}"},
+    )
+
+
+FORM = {"start_date": "2024-03-01", "end_date": "2024-03-31", "start_hour": "0", "end_hour": "23"}
+
+
+def test_report_job_is_built_in_the_background_and_downloaded_from_disk(jobs):
+    async def scenario():
+        async with _client() as client, _client("someone-else") as other:
+            submitted = await client.post(
+                "/reports/demographic-distribution", data=FORM, headers={"Prefer": "respond-async"}
+            )
+            assert submitted.status_code == 202
+            job = submitted.json()
+            assert submitted.headers["Location"] == job["status_url"]
+            for _ in range(200):
+                status = (await client.get(job["status_url"])).json()
+                if status["status"] == DONE:
+                    break
+                await asyncio.sleep(0.05)
+            downloads = [await client.get(status["download_url"]) for _ in range(2)]
+            hidden = await other.get(job["status_url"])
+            direct = await client.post("/reports/demographic-distribution", data=FORM)
+            return status, downloads, hidden, direct
+
+    status, downloads, hidden, direct = asyncio.run(scenario())
+
+    assert status["status"] == DONE and status["progress"] == 1.0
+    for download in downloads:
+        assert download.status_code == 200
+        assert download.content.startswith(b"%PDF")
+        assert status["filename"] in download.headers["content-disposition"]
+    assert downloads[0].content == downloads[1].content
+    assert jobs.stats()["completed"] == 1
+    assert hidden.status_code == 404
+    assert direct.status_code == 200 and direct.content == downloads[0].content
+    # Same parameters and rows: the direct request was served from the report cache.
+    assert main.report_pool.completed == 1
+
+
+def test_cached_report_is_rebuilt_when_rows_in_the_window_change(jobs):
+    async def scenario():
+        async with _client() as client:
+            first = await client.post("/reports/executive-summary", data={**FORM, "orientation": "portrait"})
+            same = await client.post("/reports/executive-summary", data={**FORM, "orientation": "Portrait"})
+            landscape = await client.post("/reports/executive-summary", data={**FORM, "orientation": "landscape"})
+            with SessionLocal() as db:
+                db.add(_person(7))
+                db.commit()
+            # No CDC event or cache invalidation: the next request must still see the new row.
+            changed = await client.post("/reports/executive-summary", data=FORM)
+            return first, same, landscape, changed
+
+    first, same, landscape, changed = asyncio.run(scenario())
+
+    assert all(response.status_code == 200 for response in (first, same, landscape, changed))
+    assert same.content == first.content
+    assert main.report_pool.completed == 3
+    assert main.report_cache.stats()["hits"] == 1
+
+
+def test_data_version_is_read_from_the_covering_index(jobs):
+    statements = []
+    engine = SessionLocal.kw["bind"]
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        version = main._report_data_version(date(2024, 3, 1), date(2024, 3, 31))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = statements[-1]
+    with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+
+    assert version[:2] == [6, 6]
+    assert "COVERING INDEX ix_persons_lost_lost_timestamp_updated_at" in plan
+
+
+def test_failed_and_expired_jobs(tmp_path):
+    store = ReportJobStore(str(tmp_path), ttl=600)
+
+    async def broken(progress):
+        progress("Generando PDF", 0.4)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        failed = store.submit("executive-summary", "analyst", "a.pdf", broken)
+        await asyncio.sleep(0.05)
+        return store.get(failed.id)
+
+    failed = asyncio.run(scenario())
+    assert failed.status == FAILED and failed.error
+    assert store.result_path(failed) is None
+    assert store.get("../etc/passwd") is None
+
+    store.ttl = 0
+    assert store.purge_expired() == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from io import BytesIO
+
+import pytest
+
+from dashboard.report_pool import ReportPool, ReportQueueFull
+
+
+def _pdf(label, *, pages=1):
+    return BytesIO(f"{label}:{pages}".encode())
+
+
+def test_process_workers_return_the_builder_output():
+    pool = ReportPool(workers=1, max_queue=4)
+
+    async def scenario():
+        pool.start()
+        try:
+            # Builders are pickled by name, so the worker needs an importable function.
+            return await asyncio.gather(pool.render(bytes, 3), pool.render(bytes, 1))
+        finally:
+            pool.close()
+
+    assert asyncio.run(scenario()) == [b"\x00\x00\x00", b"\x00"]
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["running"] == stats["waiting"] == 0
+    assert sum(bucket["count"] for bucket in stats["queue_time"]["histogram"]) == 2
+
+
+def test_concurrency_limit_queue_bound_and_failures():
+    pool = ReportPool(workers=0, max_queue=1)
+    release = threading.Event()
+
+    def slow(label):
+        release.wait(5)
+        return _pdf(label)
+
+    def broken(label):
+        raise RuntimeError(label)
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.render(slow, "a"))
+        second = asyncio.ensure_future(pool.render(_pdf, "b", pages=2))
+        await asyncio.sleep(0.05)
+        # One build at a time: the second report is waiting and the queue is full.
+        assert (pool.running, pool.waiting) == (1, 1)
+        with pytest.raises(ReportQueueFull):
+            await pool.render(_pdf, "c")
+        release.set()
+        results = await asyncio.gather(first, second)
+        with pytest.raises(RuntimeError):
+            await pool.render(broken, "d")
+        return results
+
+    assert asyncio.run(scenario()) == [b"a:1", b"b:2"]
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["failed"]) == (2, 1, 1)
+    assert stats["queue_time"]["max_ms"] >= 40
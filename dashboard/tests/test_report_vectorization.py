@@ -0,0 +1,42 @@
+import pandas as pd
+
+from dashboard import main
+
+
+def test_age_groups_follow_age_group_order_bounds():
+    ages = pd.Series([0, 12, 13, 17, 18, 25, 26, 40, 41, 60, 61, 104, None, -1])
+    assert list(main._age_groups(ages)) == [
+        "0-12", "0-12", "13-17", "13-17", "18-25", "18-25", "26-40",
+        "26-40", "41-60", "41-60", "61+", "61+", "Unknown", "Unknown",
+    ]
+    assert list(main._age_groups(pd.Series([None, None])).cat.categories) == main.AGE_GROUP_ORDER
+
+
+def test_split_locations_keeps_first_and_last_parts():
+    labels = pd.Series(["Quito, Pichincha", "Cuenca", " a , b , c ", ",Loja,", ",,", "Unknown", None], index=[4, 3, 2, 1, 0, 9, 8])
+    split = main._split_locations(labels)
+    assert split.index.equals(labels.index)
+    assert list(zip(split["city"], split["region"])) == [
+        ("Quito", "Pichincha"),
+        ("Cuenca", "Unknown"),
+        ("a", "c"),
+        ("Loja", "Unknown"),
+        ("Unknown", "Unknown"),
+        ("Unknown", "Unknown"),
+        ("Unknown", "Unknown"),
+    ]
+
+
+def test_max_severity_ranks():
+    matches = pd.Series(
+        [
+            [
+                {"term": "amenaza", "category": "violencia", "severity": "Media"},
+                {"term": "secuestro", "category": "violencia", "severity": "Alta"},
+            ],
+            [{"term": "extraviado", "category": "otro", "severity": "desconocida"}],
+            [],
+        ],
+        index=[7, 3, 5],
+    )
+    assert main._max_severity_ranks(matches).to_dict() == {7: 3, 3: 1, 5: 1}
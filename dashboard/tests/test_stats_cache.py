@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from dashboard import main
+from dashboard.database import get_db
+from dashboard.stats_cache import StatsCache
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def _age(cache, key, seconds):
+    cache._entries[key].stored_at -= seconds
+
+
+def test_fresh_values_are_served_until_the_ttl_expires():
+    cache, loader = StatsCache(ttl=10, stale_ttl=0), Loader()
+
+    async def scenario():
+        first = await cache.get("k", loader)
+        cached = await cache.get("k", loader)
+        _age(cache, "k", 11)
+        reloaded = await cache.get("k", loader)
+        return first, cached, reloaded
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
+    assert (cache.hits, cache.misses, loader.calls) == (1, 2, 2)
+
+
+def test_stale_value_is_served_while_one_background_load_refreshes_it():
+    cache, loader = StatsCache(ttl=10, stale_ttl=60), Loader()
+
+    async def scenario():
+        await cache.get("k", loader)
+        _age(cache, "k", 11)
+        stale = [await cache.get("k", loader) for _ in range(3)]
+        await asyncio.sleep(0.05)  # let the background refresh finish
+        return stale, await cache.get("k", loader)
+
+    stale, refreshed = asyncio.run(scenario())
+    assert stale == [1, 1, 1]
+    assert refreshed == 2
+    assert loader.calls == 2
+    assert cache.stale_hits == 3
+
+
+def test_invalidate_discards_entries_and_loads_started_before():
+    cache = StatsCache(ttl=60, stale_ttl=60)
+    release = None
+    values = iter(["old", "new"])
+
+    async def slow_loader():
+        value = next(values)
+        await release.wait()
+        return value
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        before = asyncio.ensure_future(cache.get("k", slow_loader))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        after = asyncio.ensure_future(cache.get("k", slow_loader))
+        await asyncio.sleep(0)
+        release.set()
+        results = (await before, await after)
+        return results, await cache.get("k", slow_loader)
+
+    (before, after), cached = asyncio.run(scenario())
+    assert (before, after) == ("old", "new")
+    assert cached == "new"  # the load started before invalidate() was not stored
+    assert cache.stats()["generation"] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = StatsCache(ttl=60, stale_ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("k", loader) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["value"] * 10
+    assert calls == 1
+
+
+def test_failed_load_is_not_cached():
+    cache, loader = StatsCache(ttl=60, stale_ttl=60), Loader()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.get("k", broken)
+        return await cache.get("k", loader)
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_least_recently_used_entry_is_evicted_past_max_entries():
+    cache, loader = StatsCache(ttl=60, stale_ttl=60, max_entries=2), Loader()
+
+    async def scenario():
+        for key in ["a", "b", "a", "c"]:  # reading "a" again leaves "b" as the oldest
+            await cache.get(key, loader)
+
+    asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats()["max_entries"] == 2
+
+
+def test_entry_past_the_stale_window_is_dropped_and_reloaded():
+    cache, loader = StatsCache(ttl=10, stale_ttl=60), Loader()
+
+    async def scenario():
+        await cache.get("k", loader)
+        _age(cache, "k", 71)
+        return await cache.get("k", loader)
+
+    assert asyncio.run(scenario()) == 2
+    assert cache.stale_hits == 0
+
+
+def test_invalidate_empties_the_cache():
+    cache, loader = StatsCache(ttl=60, stale_ttl=60), Loader()
+
+    async def scenario():
+        for key in range(5):
+            await cache.get(("stats:period", key), loader)
+        cache.invalidate()
+
+    asyncio.run(scenario())
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_stats_routes_do_not_hold_the_request_session():
+    # Refreshes run after the request (and its get_db session) is gone.
+    cached_paths = {"/stats/age", "/stats/gender", "/stats/hourly", "/stats/snapshot", "/stats/period"}
+    routes = [route for route in main.app.routes if getattr(route, "path", None) in cached_paths]
+
+    def dependencies(dependant):
+        for sub in dependant.dependencies:
+            yield sub.call
+            yield from dependencies(sub)
+
+    assert {route.path for route in routes} == cached_paths
+    for route in routes:
+        assert get_db not in set(dependencies(route.dependant)), route.path
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common import case_stats
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from dashboard import main
+from dashboard.database import SessionLocal
+from scripts.db_init import AggAgeGroup, AggDailyLocation, AggDailyProfile, AggGender, AggHourly, Base, PersonLost
+
+
+@pytest.fixture(name="client")
+def client_fixture(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        db.add_all([
+            AggAgeGroup(age_group="0-12", count=4),
+            AggAgeGroup(age_group="19-30", count=6),
+            AggAgeGroup(age_group="unknown", count=2),
+            AggGender(gender="F", count=7),
+            AggGender(gender="M", count=3),
+            AggHourly(hour_of_day=14, count=9),
+            AggHourly(hour_of_day=7, count=1),
+        ])
+        case_stats.rebuild_case_counters(db)
+        db.commit()
+
+    async def case_manager_down(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(main.case_manager_client, "get_json", case_manager_down)
+    original_bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    main.stats_cache.invalidate()
+    token = jwt.encode({"sub": "1", "username": "tester", "permissions": ["dashboard"]}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+    yield TestClient(main.app, headers={"Authorization": f"Bearer {token}"})
+    SessionLocal.configure(bind=original_bind)
+    main.stats_cache.invalidate()
+
+
+def test_snapshot_bundles_every_panel(client):
+    response = client.get("/stats/snapshot", params={"range": "7d"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["age"] == [
+        {"label": "0-12", "value": 4},
+        {"label": "19-30", "value": 6},
+        {"label": "Unknown", "value": 2},
+    ]
+    assert {item["label"]: item["value"] for item in body["gender"]} == {"F": 7, "M": 3}
+    assert body["hourly"] == [{"label": "7:00", "value": 1}, {"label": "14:00", "value": 9}]
+    assert body["summary"]["total_cases"] == 0
+    assert body["time_series"]["range"] == "7d"
+    assert body["time_series"]["points"][-1]["date"] == datetime.utcnow().date().isoformat()
+
+
+def test_unchanged_snapshot_revalidates_with_304(client):
+    first = client.get("/stats/snapshot")
+    etag = first.headers["ETag"]
+
+    cached = client.get("/stats/snapshot", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    main.stats_cache.invalidate()
+    assert client.get("/stats/snapshot", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/stats/snapshot", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def _person(gender, age, lost_timestamp, lost_location):
+    return PersonLost(
+        first_name="Periodo",
+        last_name="Prueba",
+        gender=gender,
+        birth_date=date(2000, 1, 1),
+        age=age,
+        lost_timestamp=lost_timestamp,
+        lost_location=lost_location,
+    )
+
+
+def test_period_stats_from_daily_aggregates_or_raw_rows(client):
+    with SessionLocal() as db:
+        db.add_all([
+            _person("F", 8, datetime(2024, 5, 1, 9), "Loja,  Loja"),
+            _person("F", 40, datetime(2024, 5, 2, 9), "loja, loja"),
+            _person("M", 40, datetime(2024, 6, 1, 9), "Quito"),
+        ])
+        db.commit()
+    params = {"start": "2024-05-01", "end": "2024-05-31"}
+
+    raw = client.get("/stats/period", params=params).json()
+    assert raw["range"] == "custom" and raw["total"] == 2
+    assert raw["age"] == [{"label": "0-12", "value": 1}, {"label": "31-60", "value": 1}]
+    assert raw["hourly"] == [{"label": "09:00", "value": 2}]
+    assert raw["locations"] == [{"label": "loja, loja", "value": 2}]
+
+    with SessionLocal() as db:
+        day = date(2024, 5, 3)
+        db.add_all([
+            AggDailyProfile(day=day, hour_of_day=10, gender="M", age_group="unknown", count=5),
+            AggDailyProfile(day=date(2024, 7, 1), hour_of_day=10, gender="M", age_group="61+", count=9),
+            AggDailyLocation(day=day, location="quito", count=5),
+        ])
+        db.commit()
+    main.stats_cache.invalidate()
+
+    aggregated = client.get("/stats/period", params=params).json()
+    assert aggregated["total"] == 5
+    assert aggregated["age"] == [{"label": "Unknown", "value": 5}]
+    assert aggregated["gender"] == [{"label": "M", "value": 5}]
+    assert aggregated["locations"] == [{"label": "quito", "value": 5}]
@@ -0,0 +1,74 @@
+import asyncio
+
+from dashboard.realtime import DashboardSocketManager
+
+
+class FakeSocket:
+    def __init__(self, stalled=False):
+        self.stalled = stalled
+        self.received = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.received.append(payload)
+
+    async def close(self):
+        self.closed = True
+
+
+async def _fan_out(manager, sockets, frames):
+    for socket in sockets:
+        await manager.connect(socket, greeting="hello")
+    for frame in range(frames):
+        await manager.broadcast(str(frame))
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.05)
+
+
+def test_stalled_client_loses_oldest_frames_without_delaying_others():
+    manager = DashboardSocketManager(queue_size=4, send_timeout=1, slow_policy="drop_oldest")
+    fast, stalled = FakeSocket(), FakeSocket(stalled=True)
+
+    async def scenario():
+        await _fan_out(manager, [fast, stalled], frames=20)
+        return manager.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert fast.received == ["hello"] + [str(frame) for frame in range(20)]
+    assert stats["frames_dropped"] > 0
+    assert stats["queue_depth_max"] == 4
+
+
+def _run_stalled(manager, frames):
+    fast, stalled = FakeSocket(), FakeSocket(stalled=True)
+
+    async def scenario():
+        await _fan_out(manager, [fast, stalled], frames=frames)
+        return stalled.closed, fast.closed, manager.stats()
+
+    return asyncio.run(scenario())
+
+
+def test_disconnect_policy_closes_clients_whose_queue_fills():
+    manager = DashboardSocketManager(queue_size=2, send_timeout=10, slow_policy="disconnect")
+
+    stalled_closed, fast_closed, stats = _run_stalled(manager, frames=5)
+
+    assert stalled_closed and not fast_closed
+    assert stats["connections"] == 1
+    assert stats["slow_disconnects"] == 1 and stats["send_timeouts"] == 0
+
+
+def test_send_timeout_closes_stalled_clients():
+    manager = DashboardSocketManager(queue_size=8, send_timeout=0.01, slow_policy="drop_oldest")
+
+    stalled_closed, fast_closed, stats = _run_stalled(manager, frames=2)
+
+    assert stalled_closed and not fast_closed
+    assert stats["send_timeouts"] == 1 and stats["frames_dropped"] == 0
@@ -89,15 +89,90 @@ public final class LostPersonsJob {
                         + " 'password' = 'password'"
                         + ")"
         );
+
+        tableEnv.executeSql(
+                "CREATE TABLE IF NOT EXISTS agg_daily_profile_sink ("
+                        + " `day` DATE,"
+                        + " hour_of_day INT,"
+                        + " gender STRING,"
+                        + " age_group STRING,"
+                        + " `count` BIGINT,"
+                        + " PRIMARY KEY (`day`, hour_of_day, gender, age_group) NOT ENFORCED"
+                        + ") WITH ("
+                        + " 'connector' = 'jdbc',"
+                        + " 'url' = 'jdbc:mysql://mysql:3306/lost_persons_db',"
+                        + " 'table-name' = 'agg_daily_profile',"
+                        + " 'username' = 'user',"
+                        + " 'password' = 'password'"
+                        + ")"
+        );
+
+        // location is utf8mb4_bin in MySQL (scripts/db_init.py), so accent variants keep separate rows.
+        tableEnv.executeSql(
+                "CREATE TABLE IF NOT EXISTS agg_daily_location_sink ("
+                        + " `day` DATE,"
+                        + " location STRING,"
+                        + " `count` BIGINT,"
+                        + " PRIMARY KEY (`day`, location) NOT ENFORCED"
+                        + ") WITH ("
+                        + " 'connector' = 'jdbc',"
+                        + " 'url' = 'jdbc:mysql://mysql:3306/lost_persons_db',"
+                        + " 'table-name' = 'agg_daily_location',"
+                        + " 'username' = 'user',"
+                        + " 'password' = 'password'"
+                        + ")"
+        );
+
+        // Every change counts: the new row adds one, the previous one (updates, deletes) subtracts one.
+        tableEnv.executeSql(
+                "CREATE TEMPORARY VIEW IF NOT EXISTS person_changes AS "
+                        + "SELECT payload.after.gender AS gender, payload.after.age AS age, "
+                        + " payload.after.lost_timestamp AS lost_timestamp, payload.after.lost_location AS lost_location, "
+                        + " 1 AS delta "
+                        + "FROM persons_lost_stream "
+                        + "WHERE payload.op IN ('c', 'r', 'u') AND payload.after IS NOT NULL "
+                        + "UNION ALL "
+                        + "SELECT payload.before.gender, payload.before.age, "
+                        + " payload.before.lost_timestamp, payload.before.lost_location, "
+                        + " -1 "
+                        + "FROM persons_lost_stream "
+                        + "WHERE payload.op IN ('u', 'd') AND payload.before IS NOT NULL"
+        );
+
+        // One-day buckets of lost_timestamp used as grouping keys rather than a TUMBLE window:
+        // reports arrive late, and a closed window would drop them. Day and hour come from the
+        // epoch millis (Debezium encodes DATETIME as UTC), like DATE()/HOUR() in MySQL.
+        tableEnv.executeSql(
+                "CREATE TEMPORARY VIEW IF NOT EXISTS person_buckets AS "
+                        + "SELECT "
+                        + " CAST(TIMESTAMPADD(DAY, CAST(FLOOR(lost_timestamp / 86400000) AS INT), "
+                        + "   TIMESTAMP '1970-01-01 00:00:00') AS DATE) AS `day`, "
+                        + " CAST(MOD(CAST(FLOOR(lost_timestamp / 3600000) AS BIGINT), 24) AS INT) AS hour_of_day, "
+                        + " COALESCE(gender, 'U') AS gender, "
+                        + " CASE "
+                        + "   WHEN age IS NULL OR age < 0 THEN 'unknown' "
+                        + "   WHEN age <= 12 THEN '0-12' "
+                        + "   WHEN age <= 18 THEN '13-18' "
+                        + "   WHEN age <= 30 THEN '19-30' "
+                        + "   WHEN age <= 60 THEN '31-60' "
+                        + "   ELSE '61+' "
+                        + " END AS age_group, "
+                        + " COALESCE(NULLIF(LOWER(TRIM(REGEXP_REPLACE(lost_location, '\\s+', ' '))), ''), 'unknown') AS location, "
+                        + " delta "
+                        + "FROM person_changes "
+                        + "WHERE lost_timestamp IS NOT NULL"
+        );
     }
 
     private static void submitInserts(TableEnvironment tableEnv) {
         StatementSet statements = tableEnv.createStatementSet();
 
+        // Missing or negative ages go to 'unknown', like agg_daily_profile and aggregator/.
         statements.addInsertSql(
                 "INSERT INTO agg_age_group_sink "
                         + "SELECT "
                         + " CASE "
+                        + "   WHEN payload.after.age IS NULL OR payload.after.age < 0 THEN 'unknown' "
                         + "   WHEN payload.after.age <= 12 THEN '0-12' "
                         + "   WHEN payload.after.age <= 18 THEN '13-18' "
                         + "   WHEN payload.after.age <= 30 THEN '19-30' "
@@ -109,6 +184,7 @@ public final class LostPersonsJob {
                         + "WHERE payload.op = 'c' "
                         + "GROUP BY "
                         + " CASE "
+                        + "   WHEN payload.after.age IS NULL OR payload.after.age < 0 THEN 'unknown' "
                         + "   WHEN payload.after.age <= 12 THEN '0-12' "
                         + "   WHEN payload.after.age <= 18 THEN '13-18' "
                         + "   WHEN payload.after.age <= 30 THEN '19-30' "
@@ -125,14 +201,30 @@ public final class LostPersonsJob {
                         + "GROUP BY payload.after.gender"
         );
 
+        // Hour from the epoch millis, like person_buckets and MySQL's HOUR(): TO_TIMESTAMP_LTZ
+        // would shift it by the local time zone and disagree with the dashboard's live deltas.
         statements.addInsertSql(
                 "INSERT INTO agg_hourly_sink "
                         + "SELECT "
-                        + " CAST(HOUR(TO_TIMESTAMP_LTZ(payload.after.lost_timestamp / 1000, 3)) AS INT) AS hour_of_day, "
+                        + " CAST(MOD(CAST(FLOOR(payload.after.lost_timestamp / 3600000) AS BIGINT), 24) AS INT) AS hour_of_day, "
                         + " COUNT(*) AS `count` "
                         + "FROM persons_lost_stream "
                         + "WHERE payload.op = 'c' "
-                        + "GROUP BY CAST(HOUR(TO_TIMESTAMP_LTZ(payload.after.lost_timestamp / 1000, 3)) AS INT)"
+                        + "GROUP BY CAST(MOD(CAST(FLOOR(payload.after.lost_timestamp / 3600000) AS BIGINT), 24) AS INT)"
+        );
+
+        statements.addInsertSql(
+                "INSERT INTO agg_daily_profile_sink "
+                        + "SELECT `day`, hour_of_day, gender, age_group, SUM(delta) AS `count` "
+                        + "FROM person_buckets "
+                        + "GROUP BY `day`, hour_of_day, gender, age_group"
+        );
+
+        statements.addInsertSql(
+                "INSERT INTO agg_daily_location_sink "
+                        + "SELECT `day`, location, SUM(delta) AS `count` "
+                        + "FROM person_buckets "
+                        + "GROUP BY `day`, location"
         );
 
         statements.execute();
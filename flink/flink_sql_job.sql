@@ -58,10 +58,12 @@ CREATE TABLE agg_hourly_sink (
 -- # 3. Definir y ejecutar las consultas de agregación
 -- #############################################################################
 
--- Consulta para agregación por grupo de edad
+-- Consulta para agregación por grupo de edad. Edad nula o negativa: 'unknown',
+-- igual que agg_daily_profile y aggregator/ (common/cdc.py UNKNOWN_AGE_GROUP).
 INSERT INTO agg_age_group_sink
 SELECT
     CASE
+        WHEN payload.after.age IS NULL OR payload.after.age < 0 THEN 'unknown'
         WHEN payload.after.age <= 12 THEN '0-12'
         WHEN payload.after.age <= 18 THEN '13-18'
         WHEN payload.after.age <= 30 THEN '19-30'
@@ -73,6 +75,7 @@ FROM persons_lost_stream
 WHERE payload.op = 'c' -- Solo contar inserciones (creates)
 GROUP BY
     CASE
+        WHEN payload.after.age IS NULL OR payload.after.age < 0 THEN 'unknown'
         WHEN payload.after.age <= 12 THEN '0-12'
         WHEN payload.after.age <= 18 THEN '13-18'
         WHEN payload.after.age <= 30 THEN '19-30'
@@ -89,12 +92,97 @@ FROM persons_lost_stream
 WHERE payload.op = 'c'
 GROUP BY payload.after.gender;
 
--- Consulta para agregación por hora (con CAST a INT)
+-- Consulta para agregación por hora (con CAST a INT). La hora sale de los
+-- milisegundos (Debezium codifica el DATETIME como si fuera UTC), igual que
+-- HOUR() en MySQL y los deltas del dashboard (common/cdc.py); con
+-- TO_TIMESTAMP_LTZ dependería de FLINK_LOCAL_TIMEZONE.
 INSERT INTO agg_hourly_sink
 SELECT
-    CAST(HOUR(TO_TIMESTAMP_LTZ(payload.after.lost_timestamp / 1000, 3)) AS INT) AS hour_of_day,
+    CAST(MOD(CAST(FLOOR(payload.after.lost_timestamp / 3600000) AS BIGINT), 24) AS INT) AS hour_of_day,
     COUNT(*) as `count`
 FROM persons_lost_stream
 WHERE payload.op = 'c'
 GROUP BY
-    CAST(HOUR(TO_TIMESTAMP_LTZ(payload.after.lost_timestamp / 1000, 3)) AS INT);
+    CAST(MOD(CAST(FLOOR(payload.after.lost_timestamp / 3600000) AS BIGINT), 24) AS INT);
+
+-- #############################################################################
+-- # 4. Agregados por día (día × hora × género × edad y día × ubicación)
+-- #############################################################################
+-- El día actúa como ventana de un día sobre lost_timestamp, pero se agrupa por
+-- él en lugar de usar TUMBLE con watermark: los reportes llegan con horas o
+-- días de retraso y una ventana ya cerrada los descartaría; así el conteo del
+-- día se actualiza cuando llegan. Día y hora salen de la aritmética sobre los
+-- milisegundos (Debezium codifica el DATETIME como si fuera UTC), igual que
+-- DATE()/HOUR() en MySQL, sin depender de FLINK_LOCAL_TIMEZONE.
+-- A diferencia de las consultas anteriores se aplican todas las operaciones:
+-- la fila nueva suma 1 y la anterior (updates y deletes) resta 1.
+
+CREATE TABLE agg_daily_profile_sink (
+    `day` DATE,
+    hour_of_day INT,
+    gender STRING,
+    age_group STRING,
+    `count` BIGINT,
+    PRIMARY KEY (`day`, hour_of_day, gender, age_group) NOT ENFORCED
+) WITH (
+    'connector' = 'jdbc',
+    'url' = 'jdbc:mysql://mysql:3306/lost_persons_db',
+    'table-name' = 'agg_daily_profile',
+    'username' = 'user',
+    'password' = 'password'
+);
+
+-- La columna location es utf8mb4_bin (scripts/db_init.py): "bolívar" y "bolivar" son filas distintas.
+CREATE TABLE agg_daily_location_sink (
+    `day` DATE,
+    location STRING,
+    `count` BIGINT,
+    PRIMARY KEY (`day`, location) NOT ENFORCED
+) WITH (
+    'connector' = 'jdbc',
+    'url' = 'jdbc:mysql://mysql:3306/lost_persons_db',
+    'table-name' = 'agg_daily_location',
+    'username' = 'user',
+    'password' = 'password'
+);
+
+CREATE TEMPORARY VIEW person_changes AS
+SELECT payload.after.gender AS gender, payload.after.age AS age,
+       payload.after.lost_timestamp AS lost_timestamp, payload.after.lost_location AS lost_location,
+       1 AS delta
+FROM persons_lost_stream
+WHERE payload.op IN ('c', 'r', 'u') AND payload.after IS NOT NULL
+UNION ALL
+SELECT payload.before.gender, payload.before.age,
+       payload.before.lost_timestamp, payload.before.lost_location,
+       -1
+FROM persons_lost_stream
+WHERE payload.op IN ('u', 'd') AND payload.before IS NOT NULL;
+
+CREATE TEMPORARY VIEW person_buckets AS
+SELECT
+    CAST(TIMESTAMPADD(DAY, CAST(FLOOR(lost_timestamp / 86400000) AS INT), TIMESTAMP '1970-01-01 00:00:00') AS DATE) AS `day`,
+    CAST(MOD(CAST(FLOOR(lost_timestamp / 3600000) AS BIGINT), 24) AS INT) AS hour_of_day,
+    COALESCE(gender, 'U') AS gender,
+    CASE
+        WHEN age IS NULL OR age < 0 THEN 'unknown'
+        WHEN age <= 12 THEN '0-12'
+        WHEN age <= 18 THEN '13-18'
+        WHEN age <= 30 THEN '19-30'
+        WHEN age <= 60 THEN '31-60'
+        ELSE '61+'
+    END AS age_group,
+    COALESCE(NULLIF(LOWER(TRIM(REGEXP_REPLACE(lost_location, '\s+', ' '))), ''), 'unknown') AS location,
+    delta
+FROM person_changes
+WHERE lost_timestamp IS NOT NULL;
+
+INSERT INTO agg_daily_profile_sink
+SELECT `day`, hour_of_day, gender, age_group, SUM(delta) AS `count`
+FROM person_buckets
+GROUP BY `day`, hour_of_day, gender, age_group;
+
+INSERT INTO agg_daily_location_sink
+SELECT `day`, location, SUM(delta) AS `count`
+FROM person_buckets
+GROUP BY `day`, location;
@@ -1,16 +1,31 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-from config_loader import build_database_url
+from common.database import create_service_async_engine, create_service_engine
+from config_loader import build_database_url, get_db_settings
 
 DATABASE_URL = build_database_url()
+ASYNC_DB_ENABLED = get_db_settings()["async_mode"]
 
-engine = create_engine(DATABASE_URL)
+engine = create_service_engine("producer", DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional asyncio path (DB_ASYNC_MODE=true): report_person and list_reports
+# then run on the event loop with an AsyncSession instead of the threadpool.
+async_engine = create_service_async_engine("producer") if ASYNC_DB_ENABLED else None
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    if async_engine is not None
+    else None
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
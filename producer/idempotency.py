@@ -0,0 +1,199 @@
+"""Idempotency-Key support for ``POST /report_person/``.
+
+A client that times out and retries sends the same ``Idempotency-Key`` header
+again; the stored response is replayed instead of inserting a second
+``PersonLost``/``Case`` (which Debezium and Flink would then count twice).
+
+Keys are scoped per user and persisted in ``idempotency_keys`` inside the same
+transaction as the report, so a key exists if and only if its report was
+committed. The unique index on ``(user_id, idempotency_key)`` settles races
+between concurrent retries: the loser gets an ``IntegrityError`` and replays
+the winner's response. A small in-process LRU answers repeated replays without
+a database round trip. Expired rows are ignored on lookup and purged lazily.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from scripts.db_init import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_LRU_SIZE = int(os.getenv("IDEMPOTENCY_LRU_SIZE", "10000"))
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = int(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: dict
+    expires_at: datetime
+
+
+class _LRUCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, str], StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cache_key: Tuple[int, str]) -> Optional[StoredResponse]:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            if entry.expires_at <= datetime.utcnow():
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return entry
+
+    def put(self, cache_key: Tuple[int, str], entry: StoredResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _LRUCache(IDEMPOTENCY_LRU_SIZE)
+_last_purge = 0.0
+
+
+def request_fingerprint(payload: BaseModel) -> str:
+    canonical = json.dumps(payload.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def replay(entry: StoredResponse, request_hash: str) -> JSONResponse:
+    """Return the stored response, or 422 if the key was used for another payload."""
+    if entry.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail=f"La cabecera {IDEMPOTENCY_HEADER} ya se usó con un contenido distinto.",
+        )
+    return JSONResponse(
+        content=entry.body,
+        status_code=entry.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def _to_entry(row: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(
+        request_hash=row.request_hash,
+        status_code=row.status_code,
+        body=json.loads(row.response_body),
+        expires_at=row.expires_at,
+    )
+
+
+def _lookup_stmt(user_id: int, key: str):
+    return select(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.idempotency_key == key,
+    )
+
+
+def _new_row(user_id: int, key: str, request_hash: str, status_code: int, body: dict) -> IdempotencyKey:
+    now = datetime.utcnow()
+    return IdempotencyKey(
+        idempotency_key=key,
+        user_id=user_id,
+        request_hash=request_hash,
+        status_code=status_code,
+        response_body=json.dumps(body),
+        created_at=now,
+        expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+    )
+
+
+def _purge_due() -> bool:
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+        return False
+    _last_purge = now
+    return True
+
+
+def lookup(db: Session, user_id: int, key: str) -> Optional[StoredResponse]:
+    """Find a live stored response; an expired row is deleted in the current transaction."""
+    cached = _cache.get((user_id, key))
+    if cached is not None:
+        return cached
+    row = db.execute(_lookup_stmt(user_id, key)).scalar_one_or_none()
+    if row is None:
+        return None
+    if row.expires_at <= datetime.utcnow():
+        db.delete(row)
+        db.flush()
+        return None
+    entry = _to_entry(row)
+    _cache.put((user_id, key), entry)
+    return entry
+
+
+async def lookup_async(db: AsyncSession, user_id: int, key: str) -> Optional[StoredResponse]:
+    cached = _cache.get((user_id, key))
+    if cached is not None:
+        return cached
+    row = (await db.execute(_lookup_stmt(user_id, key))).scalar_one_or_none()
+    if row is None:
+        return None
+    if row.expires_at <= datetime.utcnow():
+        await db.delete(row)
+        await db.flush()
+        return None
+    entry = _to_entry(row)
+    _cache.put((user_id, key), entry)
+    return entry
+
+
+def add(db: Session, user_id: int, key: str, request_hash: str, status_code: int, body: dict) -> StoredResponse:
+    """Stage the key row in ``db``; it is committed together with the report."""
+    if _purge_due():
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+    row = _new_row(user_id, key, request_hash, status_code, body)
+    db.add(row)
+    return _to_entry(row)
+
+
+async def add_async(
+    db: AsyncSession, user_id: int, key: str, request_hash: str, status_code: int, body: dict
+) -> StoredResponse:
+    if _purge_due():
+        await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+    row = _new_row(user_id, key, request_hash, status_code, body)
+    db.add(row)
+    return _to_entry(row)
+
+
+def remember(user_id: int, key: str, entry: StoredResponse) -> None:
+    """Cache a committed response so later replays skip the database."""
+    _cache.put((user_id, key), entry)
+
+
+def clear_cache() -> None:
+    _cache.clear()
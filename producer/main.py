@@ -1,13 +1,22 @@
 import os
+import uuid
 from datetime import date, datetime
+from typing import List, Optional
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from producer import models
-from producer.database import get_db
+from producer import idempotency, models
+from producer.database import ASYNC_DB_ENABLED, get_async_db, get_db
 from scripts.db_init import PersonLost, Case, CaseStatusEnum
+from common import case_stats
+from common.database import get_pool_stats
+from common.pagination import InvalidCursor, before_cursor, decode_cursor, encode_cursor
 from common.security import TokenPayload, require_permissions
 
 DEFAULT_TIMEZONE = "America/Guayaquil"
@@ -17,11 +26,52 @@ try:
 except ZoneInfoNotFoundError:
     REPORT_TIMEZONE = ZoneInfo("UTC")
 
+REPORT_BATCH_MAX_ITEMS = int(os.getenv("REPORT_BATCH_MAX_ITEMS", "1000"))
+REPORT_BATCH_CHUNK_SIZE = int(os.getenv("REPORT_BATCH_CHUNK_SIZE", "250"))
+VALID_GENDERS = {"M", "F", "O"}
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 def _local_now() -> datetime:
     # DB column is naive; store local system time without tz info
     return datetime.now(REPORT_TIMEZONE).replace(tzinfo=None)
 
+
+def _compute_ages(birth_dates: List[date], today: date) -> List[int]:
+    """Compute the age of every birth date in a single pass."""
+    reference = (today.month, today.day)
+    return [
+        today.year - birth.year - (reference < (birth.month, birth.day))
+        for birth in birth_dates
+    ]
+
+
+def _chunked(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _insert_persons_chunk(db: Session, rows: List[dict]) -> List[int]:
+    """Insert persons with one multi-row INSERT and return their ids in order.
+
+    Each row carries a random ``batch_key``. The ids come back through
+    RETURNING where the database supports it and from a SELECT on those keys
+    otherwise (MySQL), so nothing is assumed about how ids are assigned.
+    """
+    keys = [uuid.uuid4().hex for _ in rows]
+    stmt = insert(PersonLost.__table__).values([{**row, "batch_key": key} for row, key in zip(rows, keys)])
+    if db.get_bind().dialect.insert_returning:
+        resolved = db.execute(stmt.returning(PersonLost.person_id, PersonLost.batch_key)).all()
+    else:
+        db.execute(stmt)
+        resolved = db.execute(
+            select(PersonLost.person_id, PersonLost.batch_key).where(PersonLost.batch_key.in_(keys))
+        ).all()
+    ids_by_key = {batch_key: person_id for person_id, batch_key in resolved}
+    if len(ids_by_key) != len(rows):
+        raise RuntimeError("no se pudieron resolver los identificadores del lote")
+    return [ids_by_key[key] for key in keys]
+
 app = FastAPI(title="Lost Persons Reporter API")
 
 allowed_origins = [
@@ -39,23 +89,12 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-@app.post("/report_person/", response_model=models.ReportPersonPayload)
-def report_person(
-    payload: models.ReportPersonPayload,
-    db: Session = Depends(get_db),
-    current_user: TokenPayload = Depends(require_permissions(["report"])),
-):
-    """
-    Endpoint para reportar una persona como perdida.
-    Los datos se validan con Pydantic y se guardan en MySQL usando SQLAlchemy.
-    """
-    # Calcular edad
-    today = date.today()
-    age = today.year - payload.birth_date.year - ((today.month, today.day) < (payload.birth_date.month, payload.birth_date.day))
-
-    db_person = PersonLost(
+def _new_person(payload: models.ReportPersonPayload, user_id: int) -> PersonLost:
+    age = _compute_ages([payload.birth_date], date.today())[0]
+    return PersonLost(
         first_name=payload.first_name,
         last_name=payload.last_name,
         gender=payload.gender,
@@ -65,46 +104,309 @@ def report_person(
         lost_location=payload.lost_location,
         details=payload.details,
         status='active',
-        created_by=current_user.user_id,
+        created_by=user_id,
+    )
+
+
+def _new_case(person: PersonLost) -> Case:
+    return Case(
+        person_id=person.person_id,
+        status=CaseStatusEnum.NEW,
+        reported_at=person.lost_timestamp,
+        priority=None,
+        is_priority=False,
     )
-    
+
+
+IDEMPOTENCY_KEY_HEADER = Header(
+    None,
+    alias=idempotency.IDEMPOTENCY_HEADER,
+    max_length=255,
+    description="Clave única por intento lógico; los reintentos con la misma clave devuelven la respuesta original.",
+)
+
+
+def _response_body(person: PersonLost) -> dict:
+    return models.ReportPersonPayload.model_validate(person).model_dump(mode="json")
+
+
+def report_person(
+    payload: models.ReportPersonPayload,
+    db: Session = Depends(get_db),
+    current_user: TokenPayload = Depends(require_permissions(["report"])),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
+):
+    """
+    Endpoint para reportar una persona como perdida.
+    Los datos se validan con Pydantic y se guardan en MySQL usando SQLAlchemy.
+    Con la cabecera Idempotency-Key los reintentos no crean registros duplicados.
+    """
+    user_id = current_user.user_id
+    request_hash = idempotency.request_fingerprint(payload) if idempotency_key else None
+    if idempotency_key:
+        stored = idempotency.lookup(db, user_id, idempotency_key)
+        if stored is not None:
+            return idempotency.replay(stored, request_hash)
+
+    db_person = _new_person(payload, user_id)
+
     try:
         db.add(db_person)
         db.flush()  # ensure person_id is available for the related case
-
-        db_case = Case(
-            person_id=db_person.person_id,
-            status=CaseStatusEnum.NEW,
-            reported_at=db_person.lost_timestamp,
-            priority=None,
-            is_priority=False,
-        )
+        db_case = _new_case(db_person)
         db.add(db_case)
+        stored = None
+        if idempotency_key:
+            stored = idempotency.add(db, user_id, idempotency_key, request_hash, 200, _response_body(db_person))
+        case_stats.record_cases_created(db, [case_stats.case_state(db_case)])
 
         db.commit()
+        if stored is not None:
+            idempotency.remember(user_id, idempotency_key, stored)
         db.refresh(db_person)
         return db_person
+    except IntegrityError as e:
+        db.rollback()
+        # A concurrent retry with the same key committed first: replay it.
+        stored = idempotency.lookup(db, user_id, idempotency_key) if idempotency_key else None
+        if stored is None:
+            raise HTTPException(status_code=500, detail=f"Error al guardar en la base de datos: {e}")
+        return idempotency.replay(stored, request_hash)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error al guardar en la base de datos: {e}")
 
-@app.get("/report_person/", response_model=list[models.ReportPersonResponse])
+
+async def report_person_async(
+    payload: models.ReportPersonPayload,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenPayload = Depends(require_permissions(["report"])),
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
+):
+    """
+    Variante asyncio de report_person (DB_ASYNC_MODE=true): usa AsyncSession
+    y se ejecuta en el event loop sin pasar por el threadpool.
+    """
+    user_id = current_user.user_id
+    request_hash = idempotency.request_fingerprint(payload) if idempotency_key else None
+    if idempotency_key:
+        stored = await idempotency.lookup_async(db, user_id, idempotency_key)
+        if stored is not None:
+            return idempotency.replay(stored, request_hash)
+
+    db_person = _new_person(payload, user_id)
+
+    try:
+        db.add(db_person)
+        await db.flush()  # ensure person_id is available for the related case
+        db_case = _new_case(db_person)
+        db.add(db_case)
+        stored = None
+        if idempotency_key:
+            stored = await idempotency.add_async(
+                db, user_id, idempotency_key, request_hash, 200, _response_body(db_person)
+            )
+        await db.run_sync(case_stats.record_cases_created, [case_stats.case_state(db_case)])
+
+        await db.commit()
+        if stored is not None:
+            idempotency.remember(user_id, idempotency_key, stored)
+        await db.refresh(db_person)
+        return db_person
+    except IntegrityError as e:
+        await db.rollback()
+        stored = await idempotency.lookup_async(db, user_id, idempotency_key) if idempotency_key else None
+        if stored is None:
+            raise HTTPException(status_code=500, detail=f"Error al guardar en la base de datos: {e}")
+        return idempotency.replay(stored, request_hash)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al guardar en la base de datos: {e}")
+
+
+app.post("/report_person/", response_model=models.ReportPersonPayload)(
+    report_person_async if ASYNC_DB_ENABLED else report_person
+)
+
+@app.post("/report_person/batch", response_model=models.ReportPersonBatchResponse)
+def report_person_batch(
+    payload: models.ReportPersonBatchPayload,
+    db: Session = Depends(get_db),
+    current_user: TokenPayload = Depends(require_permissions(["report"])),
+):
+    """
+    Registra varios reportes en una sola transacción (ingesta masiva).
+    Cada elemento se valida por separado; los inválidos se devuelven con sus
+    errores y el resto se inserta con INSERTs multi-fila.
+    """
+    if len(payload.items) > REPORT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"El lote supera el máximo de {REPORT_BATCH_MAX_ITEMS} reportes.",
+        )
+
+    today = date.today()
+    results: List[models.ReportPersonBatchItemResult] = []
+    valid: List[tuple[int, models.ReportPersonPayload]] = []
+    for index, raw_item in enumerate(payload.items):
+        try:
+            item = models.ReportPersonPayload.model_validate(raw_item)
+        except ValidationError as exc:
+            errors = [
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            ]
+            results.append(models.ReportPersonBatchItemResult(index=index, status="error", errors=errors))
+            continue
+        errors = []
+        if item.gender not in VALID_GENDERS:
+            errors.append("gender: debe ser M, F u O")
+        if item.birth_date > today:
+            errors.append("birth_date: no puede estar en el futuro")
+        if errors:
+            results.append(models.ReportPersonBatchItemResult(index=index, status="error", errors=errors))
+            continue
+        valid.append((index, item))
+
+    if valid:
+        lost_timestamp = _local_now()
+        ages = _compute_ages([item.birth_date for _, item in valid], today)
+        person_rows = [
+            {
+                "first_name": item.first_name,
+                "last_name": item.last_name,
+                "gender": item.gender,
+                "birth_date": item.birth_date,
+                "age": age,
+                "lost_timestamp": lost_timestamp,
+                "lost_location": item.lost_location,
+                "details": item.details,
+                "status": "active",
+                "created_by": current_user.user_id,
+            }
+            for (_, item), age in zip(valid, ages)
+        ]
+        try:
+            person_ids: List[int] = []
+            for chunk in _chunked(person_rows, REPORT_BATCH_CHUNK_SIZE):
+                person_ids.extend(_insert_persons_chunk(db, chunk))
+
+            created_at = datetime.utcnow()
+            case_rows = [
+                {
+                    "person_id": person_id,
+                    "status": CaseStatusEnum.NEW,
+                    "priority": None,
+                    "reported_at": lost_timestamp,
+                    "resolved_at": None,
+                    "resolution_summary": None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "is_priority": False,
+                }
+                for person_id in person_ids
+            ]
+            case_ids: dict[int, int] = {}
+            for chunk in _chunked(case_rows, REPORT_BATCH_CHUNK_SIZE):
+                db.execute(insert(Case.__table__).values(chunk))
+                chunk_person_ids = [row["person_id"] for row in chunk]
+                case_ids.update(
+                    (person_id, case_id)
+                    for case_id, person_id in db.execute(
+                        select(Case.case_id, Case.person_id).where(Case.person_id.in_(chunk_person_ids))
+                    )
+                )
+            case_stats.record_cases_created(
+                db, [case_stats.new_case_state(CaseStatusEnum.NEW, lost_timestamp)] * len(person_ids)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error al guardar en la base de datos: {e}")
+
+        for (index, _), person_id in zip(valid, person_ids):
+            results.append(
+                models.ReportPersonBatchItemResult(
+                    index=index,
+                    status="created",
+                    person_id=person_id,
+                    case_id=case_ids.get(person_id),
+                )
+            )
+
+    results.sort(key=lambda result: result.index)
+    created = len(valid)
+    return models.ReportPersonBatchResponse(
+        received=len(payload.items),
+        created=created,
+        failed=len(payload.items) - created,
+        results=results,
+    )
+
+LIST_LIMIT_QUERY = Query(10, ge=1, le=100, description="Número máximo de reportes recientes a devolver.")
+LIST_CURSOR_QUERY = Query(
+    None,
+    description=f"Valor de la cabecera {NEXT_CURSOR_HEADER} de la página anterior (paginación por clave).",
+)
+
+
+def _reports_page_stmt(limit: int, cursor: Optional[str]):
+    stmt = select(PersonLost).order_by(PersonLost.lost_timestamp.desc(), PersonLost.person_id.desc())
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Cursor inválido.")
+        stmt = stmt.where(before_cursor(PersonLost.lost_timestamp, PersonLost.person_id, position))
+    # One extra row tells whether there is a next page.
+    return stmt.limit(limit + 1)
+
+
+def _reports_page(reports: List[PersonLost], limit: int, response: Response) -> List[PersonLost]:
+    if len(reports) > limit:
+        reports = reports[:limit]
+        last = reports[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.lost_timestamp, last.person_id)
+    return reports
+
+
 def list_reports(
-    limit: int = Query(10, ge=1, le=100, description="Número máximo de reportes recientes a devolver."),
+    response: Response,
+    limit: int = LIST_LIMIT_QUERY,
+    cursor: Optional[str] = LIST_CURSOR_QUERY,
     db: Session = Depends(get_db),
     _: TokenPayload = Depends(require_permissions(["dashboard"])),
 ):
     """
     Devuelve una lista de reportes recientes para facilitar la verificación manual desde la UI.
+    Si hay más resultados, la cabecera X-Next-Cursor trae el cursor de la página siguiente.
     """
-    reports = (
-        db.query(PersonLost)
-        .order_by(PersonLost.lost_timestamp.desc())
-        .limit(limit)
-        .all()
-    )
-    return reports
+    reports = db.execute(_reports_page_stmt(limit, cursor)).scalars().all()
+    return _reports_page(reports, limit, response)
+
+
+async def list_reports_async(
+    response: Response,
+    limit: int = LIST_LIMIT_QUERY,
+    cursor: Optional[str] = LIST_CURSOR_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    _: TokenPayload = Depends(require_permissions(["dashboard"])),
+):
+    """
+    Variante asyncio de list_reports (DB_ASYNC_MODE=true).
+    """
+    result = await db.execute(_reports_page_stmt(limit, cursor))
+    return _reports_page(result.scalars().all(), limit, response)
+
+
+app.get("/report_person/", response_model=list[models.ReportPersonResponse])(
+    list_reports_async if ASYNC_DB_ENABLED else list_reports
+)
 
 @app.get("/")
 def read_root():
     return {"message": "Producer API is running. Use POST /report_person/ to submit data."}
+
+@app.get("/internal/db-pool")
+def internal_db_pool(_: TokenPayload = Depends(require_permissions(["manage_users"]))) -> dict:
+    return get_pool_stats()
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import Annotated, Any, Dict, List, Optional, Union
 
 class ReportPersonPayload(BaseModel):
     first_name: str
@@ -19,3 +19,24 @@ class ReportPersonResponse(ReportPersonPayload):
     status: str
 
     model_config = ConfigDict(from_attributes=True)
+
+# Items are validated one by one in the endpoint so a single bad entry is
+# reported back instead of rejecting the whole batch: an entry that does not
+# fit ReportPersonPayload falls through to the plain dict.
+ReportPersonBatchItem = Annotated[Union[ReportPersonPayload, Dict[str, Any]], Field(union_mode="left_to_right")]
+
+class ReportPersonBatchPayload(BaseModel):
+    items: List[ReportPersonBatchItem] = Field(..., min_length=1)
+
+class ReportPersonBatchItemResult(BaseModel):
+    index: int
+    status: str  # 'created' | 'error'
+    person_id: Optional[int] = None
+    case_id: Optional[int] = None
+    errors: Optional[List[str]] = None
+
+class ReportPersonBatchResponse(BaseModel):
+    received: int
+    created: int
+    failed: int
+    results: List[ReportPersonBatchItemResult]
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from producer import idempotency
+from producer.database import get_db
+from producer.main import app
+from scripts.db_init import Base, Case, IdempotencyKey, PersonLost
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    idempotency.clear_cache()
+    yield factory
+    app.dependency_overrides.clear()
+    idempotency.clear_cache()
+
+
+@pytest.fixture(name="client")
+def client_fixture(session_factory):
+    token = jwt.encode(
+        {"sub": "1", "username": "tester", "permissions": ["report", "dashboard"]},
+        AUTH_SECRET_KEY,
+        algorithm=AUTH_ALGORITHM,
+    )
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+PAYLOAD = {
+    "first_name": "Reintento",
+    "last_name": "Movil",
+    "gender": "M",
+    "birth_date": "1988-03-02",
+    "lost_location": "Cuenca, Azuay",
+    "details": "conexión intermitente",
+}
+
+
+def test_retry_with_same_key_replays_without_new_rows(client, session_factory):
+    headers = {"Idempotency-Key": "abc-123"}
+    first = client.post("/report_person/", json=PAYLOAD, headers=headers)
+    second = client.post("/report_person/", json=PAYLOAD, headers=headers)
+    idempotency.clear_cache()
+    third = client.post("/report_person/", json=PAYLOAD, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 200 and third.status_code == 200
+    assert second.json() == first.json() == third.json()
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert third.headers["Idempotent-Replayed"] == "true"
+    with session_factory() as db:
+        assert db.query(PersonLost).count() == 1
+        assert db.query(Case).count() == 1
+        assert db.query(IdempotencyKey).count() == 1
+
+
+def test_key_reused_with_different_payload_is_rejected(client, session_factory):
+    headers = {"Idempotency-Key": "abc-123"}
+    assert client.post("/report_person/", json=PAYLOAD, headers=headers).status_code == 200
+
+    response = client.post("/report_person/", json={**PAYLOAD, "first_name": "Otro"}, headers=headers)
+
+    assert response.status_code == 422
+    with session_factory() as db:
+        assert db.query(PersonLost).count() == 1
+
+
+def test_expired_key_is_accepted_again(client, session_factory):
+    headers = {"Idempotency-Key": "abc-123"}
+    assert client.post("/report_person/", json=PAYLOAD, headers=headers).status_code == 200
+    with session_factory() as db:
+        db.query(IdempotencyKey).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+    idempotency.clear_cache()
+
+    response = client.post("/report_person/", json=PAYLOAD, headers=headers)
+
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+    with session_factory() as db:
+        assert db.query(PersonLost).count() == 2
+        assert db.query(IdempotencyKey).count() == 1
+
+
+def test_requests_without_key_are_not_deduplicated(client, session_factory):
+    client.post("/report_person/", json=PAYLOAD)
+    client.post("/report_person/", json=PAYLOAD)
+
+    with session_factory() as db:
+        assert db.query(PersonLost).count() == 2
+        assert db.query(IdempotencyKey).count() == 0
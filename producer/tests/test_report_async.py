@@ -0,0 +1,102 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from jose import jwt
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from producer import idempotency, main, models
+from producer.database import get_async_db
+from scripts.db_init import Base, Case, CaseCounter, PersonLost
+
+# Test-only dependency (producer/requirements-test.txt).
+pytest.importorskip("aiosqlite")
+
+PAYLOAD = {
+    "first_name": "Asincrona",
+    "last_name": "Prueba",
+    "gender": "F",
+    "birth_date": "1994-05-20",
+    "lost_location": "Loja, Loja",
+    "details": "modo asyncio",
+}
+
+
+def _async_app() -> FastAPI:
+    # The producer registers these handlers only with DB_ASYNC_MODE=true.
+    app = FastAPI()
+    app.post("/report_person/", response_model=models.ReportPersonPayload)(main.report_person_async)
+    app.get("/report_person/", response_model=list[models.ReportPersonResponse])(main.list_reports_async)
+    return app
+
+
+def _token(permissions):
+    return jwt.encode({"sub": "1", "username": "tester", "permissions": permissions}, AUTH_SECRET_KEY, algorithm=AUTH_ALGORITHM)
+
+
+@pytest.fixture(autouse=True)
+def clear_idempotency_cache():
+    idempotency.clear_cache()
+    yield
+    idempotency.clear_cache()
+
+
+async def _scenario(steps):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def _get_async_db():
+        async with factory() as db:
+            yield db
+
+    app = _async_app()
+    app.dependency_overrides[get_async_db] = _get_async_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://producer") as client:
+            return await steps(client, factory)
+    finally:
+        await engine.dispose()
+
+
+def test_async_report_creates_person_case_and_counters():
+    async def steps(client, factory):
+        headers = {"Authorization": f"Bearer {_token(['report', 'dashboard'])}", "Idempotency-Key": "async-1"}
+        first = await client.post("/report_person/", json=PAYLOAD, headers=headers)
+        retry = await client.post("/report_person/", json=PAYLOAD, headers=headers)
+        listed = await client.get("/report_person/", params={"limit": 5}, headers=headers)
+        async with factory() as db:
+            persons = await db.scalar(select(func.count(PersonLost.person_id)))
+            cases = await db.scalar(select(func.count(Case.case_id)))
+            counter = await db.get(CaseCounter, "status:new")
+        return first, retry, listed, persons, cases, counter.value
+
+    first, retry, listed, persons, cases, new_cases = asyncio.run(_scenario(steps))
+
+    assert first.status_code == 200 and first.json()["first_name"] == "Asincrona"
+    assert retry.headers["Idempotent-Replayed"] == "true" and retry.json() == first.json()
+    assert [report["first_name"] for report in listed.json()] == ["Asincrona"]
+    assert (persons, cases, new_cases) == (1, 1, 1)
+
+
+def test_async_dependencies_reject_missing_token_and_permissions():
+    async def steps(client, factory):
+        anonymous = await client.post("/report_person/", json=PAYLOAD)
+        forbidden = await client.post(
+            "/report_person/", json=PAYLOAD, headers={"Authorization": f"Bearer {_token(['dashboard'])}"}
+        )
+        async with factory() as db:
+            persons = await db.scalar(select(func.count(PersonLost.person_id)))
+        return anonymous, forbidden, persons
+
+    anonymous, forbidden, persons = asyncio.run(_scenario(steps))
+
+    assert anonymous.status_code == 401
+    assert forbidden.status_code == 403
+    assert persons == 0
@@ -0,0 +1,117 @@
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from producer.database import get_db
+from producer.main import app
+from scripts.db_init import Base, Case, CaseCounter, PersonLost
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    yield factory
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="client")
+def client_fixture(session_factory):
+    token = jwt.encode(
+        {"sub": "1", "username": "tester", "permissions": ["report", "dashboard"]},
+        AUTH_SECRET_KEY,
+        algorithm=AUTH_ALGORITHM,
+    )
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def _person(first_name: str, **overrides) -> dict:
+    payload = {
+        "first_name": first_name,
+        "last_name": "Lote",
+        "gender": "F",
+        "birth_date": "1990-06-15",
+        "lost_location": "Quito, Pichincha",
+        "details": "ingesta masiva",
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_batch_creates_persons_and_cases(client, session_factory):
+    items = [_person(f"Persona{i}") for i in range(5)]
+    response = client.post("/report_person/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 5
+    assert body["failed"] == 0
+    with session_factory() as db:
+        assert db.query(PersonLost).count() == 5
+        assert db.get(CaseCounter, "status:new").value == 5
+        cases = {case.person_id: case.case_id for case in db.query(Case).all()}
+    for result in body["results"]:
+        assert result["status"] == "created"
+        assert cases[result["person_id"]] == result["case_id"]
+
+
+def test_batch_reports_invalid_items_without_failing_the_rest(client, session_factory):
+    items = [
+        _person("Valida"),
+        _person("SinGenero", gender="X"),
+        {"first_name": "Incompleta"},
+        _person("Futura", birth_date="2999-01-01"),
+        _person("OtraValida", gender="M"),
+    ]
+    response = client.post("/report_person/batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["received"] == 5
+    assert body["created"] == 2
+    assert [result["status"] for result in body["results"]] == [
+        "created",
+        "error",
+        "error",
+        "error",
+        "created",
+    ]
+    assert body["results"][1]["errors"] == ["gender: debe ser M, F u O"]
+    with session_factory() as db:
+        names = sorted(person.first_name for person in db.query(PersonLost).all())
+    assert names == ["OtraValida", "Valida"]
+
+
+def test_batch_resolves_ids_without_returning(client, session_factory, monkeypatch):
+    # MySQL has no INSERT ... RETURNING: the ids are read back by batch_key.
+    monkeypatch.setattr(session_factory.kw["bind"].dialect, "insert_returning", False)
+    client.post("/report_person/batch", json={"items": [_person("Previa")]})
+    response = client.post("/report_person/batch", json={"items": [_person(f"Persona{i}") for i in range(3)]})
+
+    assert response.status_code == 200
+    with session_factory() as db:
+        names = {person.person_id: person.first_name for person in db.query(PersonLost).all()}
+    assert [names[result["person_id"]] for result in response.json()["results"]] == ["Persona0", "Persona1", "Persona2"]
+
+
+def test_batch_items_schema_is_documented():
+    items = app.openapi()["components"]["schemas"]["ReportPersonBatchPayload"]["properties"]["items"]
+    assert {"$ref": "#/components/schemas/ReportPersonPayload"} in items["items"]["anyOf"]
@@ -0,0 +1,101 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+from producer.database import get_db
+from producer.main import app
+from scripts.db_init import Base, PersonLost
+
+
+@pytest.fixture(name="session_factory")
+def session_factory_fixture():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    yield factory
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="client")
+def client_fixture(session_factory):
+    token = jwt.encode(
+        {"sub": "1", "username": "tester", "permissions": ["report", "dashboard"]},
+        AUTH_SECRET_KEY,
+        algorithm=AUTH_ALGORITHM,
+    )
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+def _seed(session_factory, count: int) -> None:
+    base = datetime(2024, 5, 1, 8, 0, 0)
+    with session_factory() as db:
+        for index in range(count):
+            db.add(
+                PersonLost(
+                    first_name=f"Persona{index}",
+                    last_name="Cursor",
+                    gender="F",
+                    birth_date=date(1990, 1, 1),
+                    age=34,
+                    # Pairs of rows share a timestamp to exercise the id tie-breaker.
+                    lost_timestamp=base + timedelta(minutes=index // 2),
+                    status="active",
+                )
+            )
+        db.commit()
+
+
+def test_cursor_pages_cover_every_report_once(client, session_factory):
+    _seed(session_factory, 25)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/report_person/", params=params)
+        assert response.status_code == 200
+        seen.extend(item["person_id"] for item in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert seen == sorted(range(1, 26), reverse=True)
+
+
+def test_last_page_has_no_cursor(client, session_factory):
+    _seed(session_factory, 3)
+
+    response = client.get("/report_person/", params={"limit": 3})
+
+    assert len(response.json()) == 3
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_invalid_cursor_is_rejected(client, session_factory):
+    response = client.get("/report_person/", params={"cursor": "no-es-un-cursor"})
+
+    assert response.status_code == 400
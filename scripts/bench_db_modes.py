@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Compare producer throughput between the sync and asyncio database modes.
+
+Run one producer with the default blocking driver and another one with
+``DB_ASYNC_MODE=true`` (``docker compose --profile bench up -d producer
+producer_async`` starts both), then::
+
+    python scripts/bench_db_modes.py --token "$TOKEN"
+
+Each mode is hit at 50, 200 and 1000 concurrent clients and a summary table
+with throughput and latency percentiles is printed (and optionally written as
+JSON with ``--output``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.bench_utils import percentile  # noqa: E402
+
+DEFAULT_CONCURRENCY = [50, 200, 1000]
+
+
+def _report_payload() -> dict:
+    return {
+        "first_name": "Bench",
+        "last_name": uuid.uuid4().hex[:8],
+        "gender": "F",
+        "birth_date": "1995-01-01",
+        "lost_location": "QA City",
+        "details": "benchmark",
+    }
+
+
+async def _run_level(base_url: str, endpoint: str, token: str, concurrency: int, total: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    if endpoint == "report":
+                        response = await client.post("/report_person/", json=_report_payload())
+                    else:
+                        response = await client.get("/report_person/", params={"limit": 10})
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+    }
+
+
+async def _run(args: argparse.Namespace) -> List[dict]:
+    results = []
+    for mode, base_url in (("sync", args.sync_url), ("async", args.async_url)):
+        for concurrency in args.concurrency:
+            total = max(args.requests, concurrency)
+            stats = await _run_level(base_url, args.endpoint, args.token, concurrency, total)
+            stats["mode"] = mode
+            results.append(stats)
+            print(
+                f"{mode:5s} c={concurrency:<5d} {stats['throughput_rps']:>8.1f} req/s "
+                f"p50={stats['p50_ms']:>7.1f} ms p99={stats['p99_ms']:>7.1f} ms errors={stats['errors']}"
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del producer en modo sync vs asyncio.")
+    parser.add_argument("--sync-url", default="http://localhost:40140")
+    parser.add_argument("--async-url", default="http://localhost:40141")
+    parser.add_argument("--token", default=os.getenv("LPM_TOKEN", ""), help="JWT con permisos report y dashboard.")
+    parser.add_argument("--endpoint", choices=["report", "list"], default="report")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=2000, help="Peticiones por nivel de concurrencia.")
+    parser.add_argument("--output", help="Ruta opcional para guardar los resultados en JSON.")
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
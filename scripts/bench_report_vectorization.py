@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Compare the per-row ``.apply()`` code of the PDF builders with its vectorized replacement.
+
+The report builders used to bucket ages, split locations into city/region and
+rank sensitive-term matches with a Python function per row. Run from the
+repository root (``dashboard.main`` mounts its static directory relatively)::
+
+    python scripts/bench_report_vectorization.py --rows 1000000
+
+Each step is timed with the original per-row implementation (kept here as the
+baseline) and with the helper the builders now call; the outputs are compared
+before the timings are printed (and optionally written as JSON with
+``--output``).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard.main import SEVERITY_RANK, _age_groups, _max_severity_ranks, _split_locations  # noqa: E402
+
+LOCATIONS = ["Quito, Pichincha", "Guayaquil, Guayas", "Cuenca", " Loja , Loja ", "Ambato, Tungurahua, Ecuador", ""]
+MATCHES = [
+    [{"term": "menor", "category": "vulnerabilidad", "severity": "Alta"}],
+    [
+        {"term": "secuestro", "category": "violencia", "severity": "Alta"},
+        {"term": "amenaza", "category": "violencia", "severity": "Media"},
+    ],
+    [{"term": "medicamento", "category": "salud", "severity": "Baja"}],
+]
+
+
+def _assign_age_group(age: Optional[float]) -> str:
+    if age is None or pd.isna(age) or age < 0:
+        return "Unknown"
+    if age <= 12:
+        return "0-12"
+    if age <= 17:
+        return "13-17"
+    if age <= 25:
+        return "18-25"
+    if age <= 40:
+        return "26-40"
+    if age <= 60:
+        return "41-60"
+    return "61+"
+
+
+def _split_location(location: Optional[str]) -> tuple[str, str]:
+    if not location:
+        return "Unknown", "Unknown"
+    parts = [part.strip() for part in location.split(",") if part.strip()]
+    if not parts:
+        return "Unknown", "Unknown"
+    if len(parts) == 1:
+        return parts[0], "Unknown"
+    return parts[0], parts[-1]
+
+
+def _apply_ages(ages: pd.Series) -> pd.Series:
+    return ages.apply(_assign_age_group)
+
+
+def _apply_locations(labels: pd.Series) -> pd.DataFrame:
+    split_series = labels.apply(_split_location)
+    return pd.DataFrame(
+        {"city": split_series.apply(lambda item: item[0]), "region": split_series.apply(lambda item: item[1])}
+    )
+
+
+def _apply_max_severity(matches: pd.Series) -> pd.Series:
+    return matches.apply(lambda m: max((SEVERITY_RANK.get(match["severity"].lower(), 1) for match in m), default=1))
+
+
+def _timed(func: Callable, data: pd.Series, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(data)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def _run(rows: int, repeat: int, seed: int) -> List[Dict[str, float]]:
+    rng = np.random.default_rng(seed)
+    ages = pd.Series(rng.integers(-1, 95, rows), dtype="float64").mask(rng.random(rows) < 0.05)
+    labels = pd.Series(LOCATIONS).take(rng.integers(0, len(LOCATIONS), rows)).reset_index(drop=True)
+    matches = pd.Series(MATCHES).take(rng.integers(0, len(MATCHES), rows)).reset_index(drop=True)
+
+    steps = [
+        ("age_group", _apply_ages, _age_groups, ages),
+        ("city/region", _apply_locations, _split_locations, labels),
+        ("max severity", _apply_max_severity, _max_severity_ranks, matches),
+    ]
+    results = []
+    for name, baseline, vectorized, data in steps:
+        apply_seconds, expected = _timed(baseline, data, repeat)
+        vectorized_seconds, actual = _timed(vectorized, data, repeat)
+        if not expected.astype(object).equals(actual.astype(object)):
+            raise SystemExit(f"{name}: el resultado vectorizado no coincide con .apply()")
+        results.append(
+            {
+                "step": name,
+                "rows": rows,
+                "apply_s": round(apply_seconds, 3),
+                "vectorized_s": round(vectorized_seconds, 3),
+                "speedup": round(apply_seconds / vectorized_seconds, 1) if vectorized_seconds else 0.0,
+            }
+        )
+        print(
+            f"{name:18s} rows={rows:<9d} apply={apply_seconds:>7.3f} s "
+            f"vectorized={vectorized_seconds:>7.3f} s x{results[-1]['speedup']}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de .apply() vs operaciones vectorizadas en los reportes.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por paso; se reporta la mejor.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Ruta opcional para guardar los resultados en JSON.")
+    args = parser.parse_args()
+
+    results = _run(args.rows, args.repeat, args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Helpers shared by the load generator and the benchmark scripts."""
+from __future__ import annotations
+
+from typing import List
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (``pct`` in 0-100); 0.0 for no samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
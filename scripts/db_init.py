@@ -6,7 +6,8 @@ from pathlib import Path
 import sys
 import datetime
 import enum
-from sqlalchemy import create_engine, text, Column, Integer, String, Date, DateTime, Enum, ForeignKey, Boolean
+from sqlalchemy import create_engine, event, inspect, text, DDL, Column, Integer, BigInteger, String, Text, Date, DateTime, Enum, ForeignKey, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import declarative_base, relationship, Session
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from mysql.connector import errors as mysql_errors
@@ -26,6 +27,15 @@ Base = declarative_base()
 
 class PersonLost(Base):
     __tablename__ = 'persons_lost'
+    __table_args__ = (
+        # Serves keyset pagination of GET /report_person/ (common/pagination.py).
+        Index('ix_persons_lost_lost_timestamp_person_id', 'lost_timestamp', 'person_id'),
+        # Covers the data-version token of the PDF report cache (dashboard/main.py):
+        # count/max over a window read from the index alone.
+        Index('ix_persons_lost_lost_timestamp_updated_at', 'lost_timestamp', 'updated_at', 'person_id'),
+        # Search in GET /cases (case_manager/search.py); a plain index on other dialects.
+        Index('ft_persons_lost_search', 'first_name', 'last_name', 'lost_location', mysql_prefix='FULLTEXT'),
+    )
     person_id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
@@ -37,6 +47,24 @@ class PersonLost(Base):
     details = Column(String(1000))
     status = Column(Enum('active', 'found', 'cancelled', name='status_enum'), default='active')
     created_by = Column(Integer, ForeignKey('auth_users.user_id'), nullable=True)
+    # Parte de la versión de datos de la caché de reportes PDF (dashboard/report_cache.py).
+    updated_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'),
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+    )
+    # Marca aleatoria por fila de POST /report_person/batch para recuperar los ids del INSERT multi-fila.
+    batch_key = Column(String(32), index=True)
+
+# En MySQL también cambia con los UPDATE que no pasan por el ORM (correcciones manuales).
+PERSON_UPDATED_AT_MYSQL = (
+    "updated_at DATETIME(6) NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"
+)
+event.listen(
+    PersonLost.__table__,
+    'after_create',
+    DDL(f"ALTER TABLE persons_lost MODIFY {PERSON_UPDATED_AT_MYSQL}").execute_if(dialect='mysql'),
+)
 
 class Reporter(Base):
     __tablename__ = 'reporters'
@@ -69,6 +97,40 @@ class AggHourly(Base):
     hour_of_day = Column(Integer, primary_key=True)
     count = Column(Integer)
 
+class AggDailyProfile(Base):
+    """Reportes por día × hora × género × grupo de edad (job de Flink o aggregator/)."""
+    __tablename__ = 'agg_daily_profile'
+    day = Column(Date, primary_key=True)
+    hour_of_day = Column(Integer, primary_key=True)
+    gender = Column(String(1), primary_key=True)
+    age_group = Column(String(20), primary_key=True)
+    count = Column(Integer)
+
+# La clave compara bytes: con utf8mb4_0900_ai_ci "bolívar" y "bolivar" chocarían en la
+# PK y los upserts de conteos absolutos (aggregator/ y sink JDBC de Flink) se pisarían.
+AGG_LOCATION_MYSQL = "location VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL"
+
+class AggDailyLocation(Base):
+    """Reportes por día y ubicación normalizada (minúsculas, espacios simples)."""
+    __tablename__ = 'agg_daily_location'
+    day = Column(Date, primary_key=True)
+    location = Column(
+        String(255).with_variant(mysql.VARCHAR(255, charset="utf8mb4", collation="utf8mb4_bin"), "mysql"),
+        primary_key=True,
+    )
+    count = Column(Integer)
+
+class AggregatorOffset(Base):
+    """Siguiente offset de Kafka por partición ya reflejado en las tablas agg_* (aggregator/).
+
+    Se escribe en la misma transacción que los agregados; al arrancar, el servicio
+    reconstruye su estado desde esas tablas y sigue a partir de estos offsets.
+    """
+    __tablename__ = 'aggregator_offsets'
+    topic = Column(String(255), primary_key=True)
+    kafka_partition = Column(Integer, primary_key=True)
+    next_offset = Column(BigInteger, nullable=False)
+
 class CaseStatusEnum(enum.Enum):
     NEW = "new"
     IN_PROGRESS = "in_progress"
@@ -78,6 +140,10 @@ class CaseStatusEnum(enum.Enum):
 
 class Case(Base):
     __tablename__ = 'case_cases'
+    __table_args__ = (
+        # Serves keyset pagination of GET /cases (common/pagination.py).
+        Index('ix_case_cases_created_at_case_id', 'created_at', 'case_id'),
+    )
     case_id = Column(Integer, primary_key=True, autoincrement=True)
     person_id = Column(Integer, ForeignKey('persons_lost.person_id'), nullable=False, unique=True)
     status = Column(Enum(CaseStatusEnum), nullable=False, default=CaseStatusEnum.NEW)
@@ -98,6 +164,21 @@ class Case(Base):
         order_by="CaseResponsibleHistory.assigned_at.desc()",
     )
 
+class CaseCounter(Base):
+    """Contadores de casos mantenidos en la misma transacción que los cambios (ver common/case_stats.py)."""
+    __tablename__ = 'case_counters'
+    name = Column(String(64), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class CaseDailyRollup(Base):
+    """Casos reportados y resueltos por día, mantenidos junto a case_counters."""
+    __tablename__ = 'case_daily_rollup'
+    day = Column(Date, primary_key=True)
+    reported = Column(BigInteger, nullable=False, default=0)
+    resolved = Column(BigInteger, nullable=False, default=0)
+
+
 class CaseAction(Base):
     __tablename__ = 'case_actions'
     action_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -133,6 +214,23 @@ class ResponsibleContact(Base):
     created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
 
 
+class IdempotencyKey(Base):
+    """Respuesta almacenada de un POST con cabecera Idempotency-Key (ver producer/idempotency.py)."""
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'idempotency_key', name='uq_idempotency_user_key'),
+        Index('ix_idempotency_expires_at', 'expires_at'),
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key = Column(String(255), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+
 class AuthUser(Base):
     __tablename__ = 'auth_users'
     user_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -172,7 +270,7 @@ class AuthUserRole(Base):
     user_id = Column(Integer, ForeignKey('auth_users.user_id'), nullable=False)
     role_id = Column(Integer, ForeignKey('auth_roles.role_id'), nullable=False)
 
-def init_db(reset_database: bool = False):
+def init_db(reset_database: bool = False, rebuild_counters: bool = False):
     """
     Inicializa la base de datos y crea las tablas si no existen.
     Intenta conectarse varias veces antes de fallar.
@@ -208,6 +306,9 @@ def init_db(reset_database: bool = False):
     while retries < max_retries:
         try:
             Base.metadata.create_all(engine)
+            _ensure_columns(engine)
+            _ensure_indexes(engine)
+            _ensure_collations(engine)
             print("Tablas creadas exitosamente.")
             break
         except (OperationalError, SQLAlchemyError, mysql_errors.Error) as e:
@@ -221,6 +322,56 @@ def init_db(reset_database: bool = False):
 
     _seed_auth_data(engine)
     _seed_responsible_contacts(engine)
+    _seed_case_counters(engine, rebuild=rebuild_counters)
+
+
+def _ensure_columns(engine) -> None:
+    """Add columns declared after a table already existed (create_all skips them)."""
+    columns = {column["name"] for column in inspect(engine).get_columns("persons_lost")}
+    definitions = {
+        "updated_at": PERSON_UPDATED_AT_MYSQL if engine.dialect.name == "mysql" else "updated_at DATETIME",
+        "batch_key": "batch_key VARCHAR(32) NULL",
+    }
+    for name, definition in definitions.items():
+        if name in columns:
+            continue
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE persons_lost ADD COLUMN {definition}"))
+        print(f"Columna persons_lost.{name} agregada.")
+
+
+def _ensure_indexes(engine) -> None:
+    """Create indexes declared after a table already existed (create_all skips them)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _ensure_collations(engine) -> None:
+    """Switch agg_daily_location.location to a binary collation on tables created before it."""
+    if engine.dialect.name != "mysql":
+        return
+    with engine.begin() as connection:
+        collation = connection.execute(
+            text(
+                "SELECT COLLATION_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'agg_daily_location' AND COLUMN_NAME = 'location'"
+            )
+        ).scalar()
+        if collation is None or collation == "utf8mb4_bin":
+            return
+        connection.execute(text(f"ALTER TABLE agg_daily_location MODIFY {AGG_LOCATION_MYSQL}"))
+    print("Columna agg_daily_location.location cambiada a utf8mb4_bin; recalcula los agregados de ubicación.")
+
+
+def _seed_case_counters(engine, rebuild: bool = False) -> None:
+    from common.case_stats import counters_initialized, rebuild_case_counters, rollup_initialized
+
+    with Session(engine) as session:
+        if rebuild or not counters_initialized(session) or not rollup_initialized(session):
+            rebuild_case_counters(session)
+            session.commit()
+            print("Contadores de casos y resumen diario recalculados.")
 
 
 def _seed_responsible_contacts(engine) -> None:
@@ -324,7 +475,12 @@ if __name__ == "__main__":
         action="store_true",
         help="Elimina la base de datos antes de recrearla (deja todo en blanco).",
     )
+    parser.add_argument(
+        "--rebuild-counters",
+        action="store_true",
+        help="Recalcula case_counters y case_daily_rollup desde case_cases (ejecutar sin tráfico de escritura).",
+    )
     args = parser.parse_args()
     reset_flag = args.reset or os.getenv("RESET_DB", "").lower() in {"1", "true", "yes"}
     print("Iniciando script de preparación de la base de datos...")
-    init_db(reset_database=reset_flag)
+    init_db(reset_database=reset_flag, rebuild_counters=args.rebuild_counters)
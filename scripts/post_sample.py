@@ -1,25 +1,540 @@
+#!/usr/bin/env python3
+"""Load generator for the producer, case manager and dashboard stats APIs.
+
+Examples::
+
+    # 50 concurrent clients posting reports at ~200 req/s for 60 s (10 s warm-up)
+    python scripts/post_sample.py --target producer --token "$TOKEN" \\
+        --concurrency 50 --rate 200 --duration 60 --warmup 10 --output run.json
+
+    # Same scenario against the app started in-process on SQLite (no docker)
+    python scripts/post_sample.py --target producer --local --duration 30
+
+    # Read-heavy scenarios
+    python scripts/post_sample.py --target case_manager --local --seed-rows 5000
+    python scripts/post_sample.py --target dashboard_stats --base-url http://localhost:40145
+
+Payloads are randomized (gender, age group, location and ``details`` that
+mention terms from ``config/sensitive_terms.json``). Requests issued during
+the warm-up are discarded. With ``--rate`` each request has a scheduled start
+time and latency is measured from it, so a stalled server is not hidden by
+clients that simply wait (coordinated omission). The JSON written with
+``--output`` contains p50/p90/p99/max latency, a latency histogram, per
+endpoint breakdowns and a per-second throughput timeline, so two runs can be
+compared side by side.
+"""
 from __future__ import annotations
 
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
 import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 import httpx
 
-PAYLOAD_TEMPLATE = {
-    "first_name": "Auto",
-    "gender": "F",
-    "birth_date": "1995-01-01",
-    "lost_timestamp": "2024-01-01T12:00:00Z",
-    "lost_location": "QA City",
-    "details": "autotest",
-    "status": "active",
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from scripts.bench_utils import percentile  # noqa: E402
+
+DEFAULT_BASE_URLS = {
+    "producer": "http://localhost:40140",
+    "case_manager": "http://localhost:40150",
+    "dashboard_stats": "http://localhost:40145",
 }
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+FIRST_NAMES = ["María", "Juan", "Leila", "Carlos", "Amelia", "Diego", "Sofía", "Omar", "Greta", "Nicolás", "Ana", "Luis"]
+LAST_NAMES = ["López", "Rodríguez", "Chen", "Khan", "García", "Nakamura", "Singh", "Anders", "Díaz", "Paredes", "Mora"]
+LOCATIONS = [
+    "Quito, Pichincha",
+    "Guayaquil, Guayas",
+    "Cuenca, Azuay",
+    "Ambato, Tungurahua",
+    "Loja, Loja",
+    "Manta, Manabí",
+    "Esmeraldas, Esmeraldas",
+    "Ibarra, Imbabura",
+    "Riobamba, Chimborazo",
+    "Bogotá, Colombia",
+    "Lima, Perú",
+]
+NOTES = [
+    "Vista por última vez cerca de la estación central.",
+    "Vestía chaqueta verde y botas de excursión.",
+    "No volvió de una caminata matutina.",
+    "Portaba una mochila azul.",
+    "Salió del colegio y no llegó a casa.",
+]
+# (min_age, max_age, weight) – roughly follows the age groups shown in the dashboard.
+AGE_BANDS = [(0, 12, 0.15), (13, 17, 0.15), (18, 25, 0.15), (26, 40, 0.2), (41, 60, 0.2), (61, 92, 0.15)]
+GENDER_WEIGHTS = [("F", 0.48), ("M", 0.48), ("O", 0.04)]
+CASE_STATUSES = ["new", "in_progress", "resolved", "cancelled", "archived"]
+
+
+def _load_sensitive_terms() -> List[str]:
+    path = ROOT_DIR / "config" / "sensitive_terms.json"
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            return [entry["term"] for entry in json.load(handle) if entry.get("term")]
+    except (OSError, ValueError):
+        return []
+
+
+class PayloadFactory:
+    """Builds realistic, randomized report payloads."""
+
+    def __init__(self, rng: random.Random, sensitive_ratio: float) -> None:
+        self.rng = rng
+        self.sensitive_ratio = sensitive_ratio
+        self.sensitive_terms = _load_sensitive_terms()
+
+    def birth_date(self) -> date:
+        bands = [band[:2] for band in AGE_BANDS]
+        low, high = self.rng.choices(bands, weights=[band[2] for band in AGE_BANDS])[0]
+        age = self.rng.randint(low, high)
+        return date.today() - timedelta(days=age * 365 + self.rng.randint(0, 364))
+
+    def details(self) -> str:
+        note = self.rng.choice(NOTES)
+        if self.sensitive_terms and self.rng.random() < self.sensitive_ratio:
+            note = f"{note} Requiere atención: {self.rng.choice(self.sensitive_terms)}."
+        return note
+
+    def report(self) -> dict:
+        genders = [gender for gender, _ in GENDER_WEIGHTS]
+        return {
+            "first_name": self.rng.choice(FIRST_NAMES),
+            "last_name": f"{self.rng.choice(LAST_NAMES)}-{uuid.uuid4().hex[:6]}",
+            "gender": self.rng.choices(genders, weights=[weight for _, weight in GENDER_WEIGHTS])[0],
+            "birth_date": self.birth_date().isoformat(),
+            "lost_location": self.rng.choice(LOCATIONS),
+            "details": self.details(),
+        }
+
+
+# --- Scenarios -------------------------------------------------------------
+
+RequestSpec = Tuple[str, str, str, dict]  # (endpoint label, method, path, httpx kwargs)
+
+
+def _producer_requests(factory: PayloadFactory) -> Callable[[], RequestSpec]:
+    def build() -> RequestSpec:
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        return "POST /report_person/", "POST", "/report_person/", {"json": factory.report(), "headers": headers}
+
+    return build
+
+
+def _case_manager_requests(factory: PayloadFactory) -> Callable[[], RequestSpec]:
+    rng = factory.rng
+    search_terms = (factory.sensitive_terms or []) + [name.lower() for name in LAST_NAMES]
+    options: List[Tuple[float, Callable[[], RequestSpec]]] = [
+        (0.4, lambda: ("GET /cases", "GET", "/cases", {"params": {"limit": 50}})),
+        (
+            0.2,
+            lambda: (
+                "GET /cases?search",
+                "GET",
+                "/cases",
+                {"params": {"limit": 50, "search": rng.choice(search_terms)}},
+            ),
+        ),
+        (0.2, lambda: ("GET /cases/stats/summary", "GET", "/cases/stats/summary", {})),
+        (
+            0.2,
+            lambda: ("GET /cases/stats/time-series", "GET", "/cases/stats/time-series", {"params": {"range": "7d"}}),
+        ),
+    ]
+    return _weighted(rng, options)
+
+
+def _dashboard_requests(factory: PayloadFactory) -> Callable[[], RequestSpec]:
+    paths = ["/stats/age", "/stats/gender", "/stats/hourly", "/case-stats/summary"]
+    options = [(1.0, lambda path=path: (f"GET {path}", "GET", path, {})) for path in paths]
+    # What the live dashboard page requests since it switched to the snapshot.
+    options.append((4.0, lambda: ("GET /stats/snapshot", "GET", "/stats/snapshot", {"params": {"range": "7d"}})))
+    return _weighted(factory.rng, options)
+
+
+def _weighted(rng: random.Random, options) -> Callable[[], RequestSpec]:
+    weights = [weight for weight, _ in options]
+    builders = [builder for _, builder in options]
+
+    def build() -> RequestSpec:
+        return rng.choices(builders, weights=weights)[0]()
+
+    return build
+
+
+SCENARIOS = {
+    "producer": _producer_requests,
+    "case_manager": _case_manager_requests,
+    "dashboard_stats": _dashboard_requests,
+}
+
+
+# --- Local (in-process) mode -----------------------------------------------
+
+def _install_sqlite_shims(engine) -> None:
+    """Emulate the MySQL functions used by the services (HOUR, TIMESTAMPDIFF)."""
+    from sqlalchemy import event
+    from sqlalchemy.ext.compiler import compiles
+    from sqlalchemy.sql.functions import Function
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _record):
+        dbapi_connection.create_function(
+            "hour", 1, lambda value: int(str(value)[11:13]) if value else None, deterministic=True
+        )
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    @compiles(Function, "sqlite")
+    def _sqlite_function(element, compiler, **kw):
+        if element.name.lower() == "timestampdiff":
+            # Only TIMESTAMPDIFF(SECOND, start, end) is used by the services.
+            _, start, end = element.clauses.clauses
+            return (
+                f"CAST((julianday({compiler.process(end, **kw)}) - "
+                f"julianday({compiler.process(start, **kw)})) * 86400 AS INTEGER)"
+            )
+        return compiler.visit_function(element, **kw)
+
+
+def _seed_local_data(session_factory, factory: PayloadFactory, rows: int) -> None:
+    from common.case_stats import rebuild_case_counters
+    from scripts.db_init import Case, CaseStatusEnum, PersonLost
+
+    rng = factory.rng
+    now = datetime.utcnow()
+    with session_factory() as db:
+        for start in range(0, rows, 500):
+            persons = []
+            for _ in range(min(500, rows - start)):
+                payload = factory.report()
+                birth = date.fromisoformat(payload["birth_date"])
+                persons.append(
+                    PersonLost(
+                        first_name=payload["first_name"],
+                        last_name=payload["last_name"],
+                        gender=payload["gender"],
+                        birth_date=birth,
+                        age=(now.date() - birth).days // 365,
+                        lost_timestamp=now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                        lost_location=payload["lost_location"],
+                        details=payload["details"],
+                        status="active",
+                    )
+                )
+            db.add_all(persons)
+            db.flush()
+            for person in persons:
+                status = CaseStatusEnum(rng.choice(CASE_STATUSES))
+                resolved_at = None
+                if status == CaseStatusEnum.RESOLVED:
+                    resolved_at = person.lost_timestamp + timedelta(hours=rng.randint(1, 96))
+                db.add(
+                    Case(
+                        person_id=person.person_id,
+                        status=status,
+                        reported_at=person.lost_timestamp,
+                        resolved_at=resolved_at,
+                        created_at=person.lost_timestamp,
+                        updated_at=person.lost_timestamp,
+                        is_priority=False,
+                    )
+                )
+            db.commit()
+        rebuild_case_counters(db)
+        db.commit()
+
+
+def build_local_app(target: str, database_url: Optional[str], seed_rows: int, factory: PayloadFactory):
+    """Import the target service and point it at a local SQLite database.
+
+    Returns ``(app, token, engine)``. Nothing from the docker stack is needed:
+    the schema is created from ``scripts.db_init`` and a JWT is minted with
+    the shared secret.
+    """
+    from jose import jwt
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    os.environ.setdefault("DB_ASYNC_MODE", "false")
+    # Make the dashboard's case-manager proxy fail fast and use its local fallback.
+    os.environ.setdefault("CASE_MANAGER_URL", "http://127.0.0.1:9")
+
+    from common.security import AUTH_ALGORITHM, AUTH_SECRET_KEY
+    from scripts.db_init import Base
+
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp(prefix='lpm-load-')) / 'load.db'}"
+    engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 30})
+    _install_sqlite_shims(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    if target != "producer" and seed_rows:
+        _seed_local_data(session_factory, factory, seed_rows)
+
+    if target == "producer":
+        from producer.database import get_db
+        from producer.main import app
+    elif target == "case_manager":
+        from case_manager.database import get_db
+        from case_manager.main import app
+    else:
+        # The dashboard mounts templates/static with paths relative to the repo root.
+        os.chdir(ROOT_DIR)
+        from dashboard.database import SessionLocal, get_db
+        from dashboard.main import app
+
+        # The case-manager fallbacks open their own sessions.
+        SessionLocal.configure(bind=engine)
+
+    def _get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _get_db
+    token = jwt.encode(
+        {
+            "sub": "1",
+            "username": "loadtest",
+            "permissions": ["report", "dashboard", "case_manager", "pdf_reports", "manage_users"],
+        },
+        AUTH_SECRET_KEY,
+        algorithm=AUTH_ALGORITHM,
+    )
+    return app, token, engine
+
+
+# --- Measurement -----------------------------------------------------------
+
+@dataclass
+class Sample:
+    offset_s: float
+    endpoint: str
+    latency_ms: float
+    status: int  # 0 = transport error
+
+
+@dataclass
+class RunState:
+    started: float
+    warmup_until: float
+    stop_at: float
+    rate: float
+    max_requests: Optional[int]
+    issued: int = 0
+    samples: List[Sample] = field(default_factory=list)
+
+    def next_slot(self) -> Optional[float]:
+        """Reserve the scheduled start time of the next request, or None to stop."""
+        if self.max_requests is not None and self.issued >= self.max_requests:
+            return None
+        if self.rate > 0:
+            slot = self.started + self.issued / self.rate
+        else:
+            slot = time.perf_counter()
+        if slot >= self.stop_at:
+            return None
+        self.issued += 1
+        return slot
+
+
+def _summarize(samples: List[Sample], elapsed_s: float) -> dict:
+    latencies = [sample.latency_ms for sample in samples]
+    status_codes: Dict[str, int] = {}
+    for sample in samples:
+        status_codes[str(sample.status)] = status_codes.get(str(sample.status), 0) + 1
+    errors = sum(1 for sample in samples if sample.status == 0 or sample.status >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed_s, 2) if elapsed_s else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies), 2) if latencies else 0.0,
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        },
+        "status_codes": status_codes,
+    }
+
+
+def _histogram(samples: List[Sample]) -> List[dict]:
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for sample in samples:
+        index = next(
+            (idx for idx, bound in enumerate(LATENCY_BUCKETS_MS) if sample.latency_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        counts[index] += 1
+    return [{"le_ms": bound, "count": count} for bound, count in zip(LATENCY_BUCKETS_MS + [None], counts)]
+
+
+def _timeline(samples: List[Sample], interval_s: float) -> List[dict]:
+    buckets: Dict[int, List[Sample]] = {}
+    for sample in samples:
+        buckets.setdefault(int(sample.offset_s // interval_s), []).append(sample)
+    timeline = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        latencies = [sample.latency_ms for sample in bucket]
+        timeline.append(
+            {
+                "t_s": round(index * interval_s, 3),
+                "requests": len(bucket),
+                "rps": round(len(bucket) / interval_s, 2),
+                "errors": sum(1 for sample in bucket if sample.status == 0 or sample.status >= 400),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+            }
+        )
+    return timeline
+
+
+async def _worker(client: httpx.AsyncClient, state: RunState, build_request: Callable[[], RequestSpec]) -> None:
+    while True:
+        slot = state.next_slot()
+        if slot is None:
+            return
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint, method, path, kwargs = build_request()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        finished = time.perf_counter()
+        if slot >= state.warmup_until:
+            state.samples.append(
+                Sample(
+                    offset_s=slot - state.warmup_until,
+                    endpoint=endpoint,
+                    latency_ms=(finished - slot) * 1000,
+                    status=status,
+                )
+            )
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    factory = PayloadFactory(rng, args.sensitive_ratio)
+    build_request = SCENARIOS[args.target](factory)
+
+    token = args.token
+    transport = None
+    engine = None
+    base_url = args.base_url or DEFAULT_BASE_URLS[args.target]
+    if args.local:
+        app, token, engine = build_local_app(args.target, args.local_db, args.seed_rows, factory)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://local"
+
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits, timeout=args.timeout, transport=transport
+    ) as client:
+        started = time.perf_counter()
+        state = RunState(
+            started=started,
+            warmup_until=started + args.warmup,
+            stop_at=started + args.warmup + args.duration,
+            rate=args.rate,
+            max_requests=args.requests,
+        )
+        await asyncio.gather(*(_worker(client, state, build_request) for _ in range(args.concurrency)))
+        finished = time.perf_counter()
+
+    if engine is not None:
+        engine.dispose()
+
+    measured_s = max(finished - state.warmup_until, 1e-9)
+    by_endpoint: Dict[str, List[Sample]] = {}
+    for sample in state.samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+    return {
+        "target": args.target,
+        "base_url": "local" if args.local else base_url,
+        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "config": {
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "requests": args.requests,
+            "sensitive_ratio": args.sensitive_ratio,
+            "seed": args.seed,
+            "local_db": args.local_db if args.local else None,
+        },
+        "summary": _summarize(state.samples, measured_s),
+        "endpoints": {name: _summarize(samples, measured_s) for name, samples in sorted(by_endpoint.items())},
+        "histogram": _histogram(state.samples),
+        "timeline": _timeline(state.samples, args.timeline_interval),
+    }
+
+
+def _print_report(result: dict) -> None:
+    summary = result["summary"]
+    latency = summary["latency_ms"]
+    print(
+        f"{result['target']} @ {result['base_url']}: {summary['requests']} req, "
+        f"{summary['throughput_rps']} req/s, errors={summary['errors']}"
+    )
+    print(
+        f"  latency ms  p50={latency['p50']}  p90={latency['p90']}  "
+        f"p99={latency['p99']}  max={latency['max']}"
+    )
+    for name, stats in result["endpoints"].items():
+        print(f"  {name:32s} {stats['requests']:>7d} req  p50={stats['latency_ms']['p50']:>8.2f}  p99={stats['latency_ms']['p99']:>8.2f}")
 
 
 def main() -> None:
-    payload = PAYLOAD_TEMPLATE | {"last_name": uuid.uuid4().hex[:8]}
-    resp = httpx.post("http://localhost:40140/report_person/", json=payload, timeout=10)
-    resp.raise_for_status()
-    print(resp.json())
+    parser = argparse.ArgumentParser(description="Generador de carga para producer, case manager y stats del dashboard.")
+    parser.add_argument("--target", choices=sorted(SCENARIOS), default="producer")
+    parser.add_argument("--base-url", help="URL base del servicio (por defecto el puerto publicado en docker-compose).")
+    parser.add_argument("--token", default=os.getenv("LPM_TOKEN", ""), help="JWT con los permisos del escenario.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Clientes concurrentes.")
+    parser.add_argument("--rate", type=float, default=0.0, help="Peticiones por segundo objetivo (0 = sin límite).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de medición tras el calentamiento.")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Segundos de calentamiento descartados.")
+    parser.add_argument("--requests", type=int, help="Tope opcional de peticiones (incluye calentamiento).")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--sensitive-ratio", type=float, default=0.3, help="Fracción de reportes con términos sensibles.")
+    parser.add_argument("--seed", type=int, help="Semilla para reproducir los payloads.")
+    parser.add_argument("--timeline-interval", type=float, default=1.0, help="Resolución de la serie de throughput (s).")
+    parser.add_argument("--local", action="store_true", help="Levanta la app en el proceso sobre SQLite, sin docker.")
+    parser.add_argument("--local-db", help="URL SQLAlchemy para --local (por defecto un SQLite temporal).")
+    parser.add_argument("--seed-rows", type=int, default=2000, help="Casos sembrados en --local para escenarios de lectura.")
+    parser.add_argument("--output", help="Ruta del JSON con los resultados.")
+    args = parser.parse_args()
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    result = asyncio.run(run_load(args))
+    _print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
 
 
 if __name__ == "__main__":